@@ -0,0 +1,26 @@
+"""Arrêt de montée des réservations (bookings.id_boarding_stop)
+
+Revision ID: f3a9c2d7b104
+Revises: ee6f7bf5f5a8
+Create Date: 2026-10-20 09:12:41.507233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c2d7b104'
+down_revision: Union[str, None] = 'ee6f7bf5f5a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('bookings', sa.Column('id_boarding_stop', sa.UUID(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('bookings', 'id_boarding_stop')
@@ -1,14 +1,15 @@
 # app/api/booking_route.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 
+from app.core.etag import etag_matches, not_modified, set_etag
 from app.db.database import get_db
 from app.db.schemas.booking import BookingCreate, BookingResponse
 from app.services.booking_service import (create_booking,get_booking_by_user,get_passengers_by_trip,)
 from app.db.schemas.booking import (    BookingCreate, BookingResponse,  BookingCancelRequest, BookingCancelResponse,  CompleteByTripRequest, CompleteByTripResponse,)
-from app.services.booking_service import (create_booking,get_booking_by_user,get_passengers_by_trip,get_booking_by_id,list_bookings_by_driver,cancel_booking,complete_by_trip,create_booking_pending,confirm_booking_after_payment,)
+from app.services.booking_service import (create_booking,get_booking_by_user,get_passengers_by_trip,get_booking_by_id,list_bookings_by_driver,cancel_booking,complete_by_trip,create_booking_pending,confirm_booking_after_payment,booking_etag,get_booking_etag,)
 
 router = APIRouter()
 
@@ -33,8 +34,17 @@ async def create_booking_endpoint(data: BookingCreate, db: AsyncSession = Depend
     return await create_booking(db, data)
 
 @router.get("/get_booking_by_id/{booking_id}", response_model=BookingResponse)
-async def get_booking_by_id_endpoint(booking_id: UUID, db: AsyncSession = Depends(get_db)):
-    return await get_booking_by_id(db, booking_id)
+async def get_booking_by_id_endpoint(booking_id: UUID, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    # If-None-Match : 304 après une lecture de 3 colonnes, sans hydratation ni sérialisation
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await get_booking_etag(db, booking_id)
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    booking = await get_booking_by_id(db, booking_id)
+    set_etag(response, booking_etag(booking.id, booking.updated_at, booking.created_at, booking.status))
+    return booking
 
 @router.get("/get_booking_by_user_id/{user_id}", response_model=List[BookingResponse])
 async def get_booking_by_user_endpoint(user_id: UUID, db: AsyncSession = Depends(get_db)):
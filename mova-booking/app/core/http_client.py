@@ -0,0 +1,30 @@
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+# ✅ Registre du client HTTP : un seul pool de connexions keep-alive par processus
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Retourne le client HTTP partagé (créé paresseusement)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=settings.HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Ferme les connexions du client (arrêt du service)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,50 @@
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.core.amqp import amqp_client
+from app.core.config import settings
+from app.core.http_client import close_http_client, get_http_client
+from app.core.tracing import shutdown_tracing
+from app.db.database import dispose_engine, get_engine, warm_engine
+from app.db.migrate import ensure_schema_is_current
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Prêt uniquement entre la fin du préchauffage et le début de l'arrêt."""
+
+    def __init__(self):
+        self.ready = False
+
+
+readiness = Readiness()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 🚀 Démarrage : schéma, pool SQL, connexion RabbitMQ, client HTTP vers le trip service
+    if settings.SCHEMA_CHECK_ON_STARTUP:
+        await ensure_schema_is_current(get_engine())
+    await warm_engine(settings.DB_POOL_WARM_SIZE)
+
+    if settings.RABBITMQ_URL:
+        await amqp_client.connect()
+    else:
+        logger.warning("RABBITMQ_URL non défini : publications désactivées")
+    get_http_client()
+
+    readiness.ready = True
+    logger.info("✅ Booking service prêt")
+    try:
+        yield
+    finally:
+        # 🛑 Arrêt : plus de nouveau trafic, fermeture des pools
+        readiness.ready = False
+        await close_http_client()
+        await amqp_client.close(timeout=settings.SHUTDOWN_TIMEOUT)
+        await dispose_engine()
+        shutdown_tracing()
+        logger.info("🔴 Booking service arrêté")
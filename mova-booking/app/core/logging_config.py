@@ -0,0 +1,111 @@
+"""
+Logs du service : configurés une seule fois par processus (`setup_logging()`).
+
+- les appels `logger.info(...)` déposent l'enregistrement dans une file en
+  mémoire (QueueHandler) : aucune écriture disque/console sur la boucle asyncio ;
+- un thread (QueueListener) formate en JSON (une ligne par log) et écrit sur
+  stdout, et dans LOG_FILE si défini ;
+- les logs INFO/DEBUG de quelques loggers bavards (LOG_SAMPLED_LOGGERS : clients
+  réseau tiers, jamais les services ni les consumers) peuvent être échantillonnés
+  (LOG_SAMPLE_RATE < 1, tout est conservé par défaut) ; WARNING et au-delà le sont toujours.
+
+Module commun aux services : original dans shared/core/logging_config.py, recopié dans
+chaque app/core/ par `python shared/sync_core.py` (ne pas modifier une copie).
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.core.config import settings
+
+SERVICE_NAME = settings.SERVICE_NAME
+
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "service": SERVICE_NAME,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        # Champs passés via `extra={...}`
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Ne garde qu'une fraction des logs < WARNING des loggers échantillonnés."""
+
+    def __init__(self, loggers: set[str], rate: float):
+        super().__init__()
+        self.loggers = loggers
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        if not any(record.name == name or record.name.startswith(name + ".") for name in self.loggers):
+            return True
+        return random.random() < self.rate
+
+
+class _LocalQueueHandler(QueueHandler):
+    # Même processus : inutile de pré-formater/copier l'enregistrement dans prepare()
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging() -> None:
+    """Configure le logger racine (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = (
+        JsonFormatter() if settings.LOG_JSON
+        else logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+    )
+    handlers: list[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if settings.LOG_FILE:
+        handlers.append(logging.FileHandler(settings.LOG_FILE))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _LocalQueueHandler(log_queue)
+    sampled = {name.strip() for name in settings.LOG_SAMPLED_LOGGERS.split(",") if name.strip()}
+    queue_handler.addFilter(SamplingFilter(sampled, settings.LOG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Vide la file puis arrête le thread d'écriture."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,56 +1,92 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import asyncio
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_SECONDS
+from app.core.sql_instrumentation import instrument_engine
+from app.db.base import Base  # Base unique des modèles (réexportée pour main.py / alembic)
 
 DATABASE_URL = settings.DATABASE_URL
 
-# ✅ Créer un moteur async avec pool étendu
-engine = create_async_engine(
-    DATABASE_URL,
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Pool async standard qui mesure l'attente d'une connexion (métrique Prometheus)."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+# ✅ Options du pool async : c'est le seul moteur du service
+ENGINE_OPTIONS = dict(
+    poolclass=TimedQueuePool,
     pool_size=20,        # ← augmente le nombre de connexions simultanées
     max_overflow=50,     # ← tolérance temporaire supplémentaire
     pool_timeout=30,     # ← temps max pour attendre une connexion
-    echo=False           # ← mets à True pour debug SQL
+    echo=False,          # ← mets à True pour debug SQL
 )
 
-# ✅ Créer une session async
-async_session = sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
-    autocommit=False,
-)
+# ✅ Registre du moteur : créé à la première utilisation, jamais à l'import
+_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[sessionmaker] = None
 
-# ✅ Base des modèles
-Base = declarative_base()
 
-# ✅ Dépendance pour FastAPI (async)
-async def get_db():
-    async with async_session() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+def get_engine() -> AsyncEngine:
+    """Retourne l'unique moteur async du service (créé paresseusement)."""
+    global _engine, _session_factory
+    if _engine is None:
+        _engine = create_async_engine(DATABASE_URL, **ENGINE_OPTIONS)
+        if settings.SQL_INSTRUMENTATION:
+            instrument_engine(_engine.sync_engine)
+        _session_factory = sessionmaker(
+            bind=_engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+            autoflush=False,
+            autocommit=False,
+        )
+    return _engine
 
 
+def async_session() -> AsyncSession:
+    """Ouvre une nouvelle session async sur le moteur du registre."""
+    if _session_factory is None:
+        get_engine()
+    return _session_factory()
 
 
+async def warm_engine(connections: int) -> None:
+    """Ouvre `connections` connexions en parallèle pour qu'elles restent dans le pool."""
+    engine = get_engine()
 
-# from sqlalchemy.ext.declarative import declarative_base
-# from sqlalchemy.orm import sessionmaker
-# from sqlalchemy import create_engine
-# from app.core.config import settings
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
 
+    await asyncio.gather(*(ping() for _ in range(connections)))
 
-# engine = create_engine(settings.DATABASE_URL,pool_size=10,
-#     max_overflow=20)
-# SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-# Base = declarative_base()
 
-# def get_db():
-#     db = SessionLocal()
-#     try:
-#         yield db
-#     finally:
-#         db.close()
+async def dispose_engine() -> None:
+    """Ferme toutes les connexions du pool (arrêt du service)."""
+    global _engine, _session_factory
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _session_factory = None
+
+
+# ✅ Dépendance pour FastAPI (async)
+async def get_db():
+    async with async_session() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -30,6 +30,7 @@ class Booking(Base):
     id_user   = Column(UUID(as_uuid=True), nullable=False)
     id_trip   = Column(UUID(as_uuid=True), nullable=False)
     id_stop   = Column(UUID(as_uuid=True), nullable=True)
+    id_boarding_stop = Column(UUID(as_uuid=True), nullable=True)  # arrêt de montée (None = départ du trajet)
     id_driver = Column(UUID(as_uuid=True), nullable=False)   # snapshot simple du chauffeur
 
     # Quantités & prix (snapshot)
@@ -9,7 +9,8 @@ class BookingCreate(BaseModel):
     # clés
     id_user: UUID
     id_trip: UUID
-    id_stop: Optional[UUID] = None
+    id_stop: Optional[UUID] = None           # arrêt de descente (None = destination finale)
+    id_boarding_stop: Optional[UUID] = None  # arrêt de montée (None = départ)
     id_driver: UUID
 
     # quantités & prix unitaires
@@ -36,6 +37,7 @@ class BookingResponse(BaseModel):
     id_user: UUID
     id_trip: UUID
     id_stop: Optional[UUID]
+    id_boarding_stop: Optional[UUID] = None
     id_driver: UUID
 
     number_of_seats: int
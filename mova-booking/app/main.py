@@ -1,20 +1,29 @@
-from fastapi import FastAPI
-from app.db.database import Base, engine
+from fastapi import FastAPI, HTTPException
 from app.api.booking_route import router as booking_router
+from app.core.lifespan import lifespan, readiness
+from app.core.logging_config import setup_logging
+from app.core.metrics import setup_metrics
+from app.core.sql_instrumentation import setup_sql_instrumentation
+from app.core.tracing import setup_tracing
 
 
 
 from fastapi.middleware.cors import CORSMiddleware
 
-# Création des tables dans la base de données
+# Initialisation de l'application FastAPI
+app = FastAPI(title="booking System API", lifespan=lifespan)
 
-async def init_models():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    print("✅ Base de données initialisée avec succès.")
+# 📝 Logs JSON via une file (configurés une fois par processus)
+setup_logging()
 
-# Initialisation de l'application FastAPI
-app = FastAPI(title="booking System API")
+# 📊 Métriques Prometheus (GET /metrics)
+setup_metrics(app)
+
+# 🔎 Instrumentation SQL par requête (opt-in : SQL_INSTRUMENTATION)
+setup_sql_instrumentation(app)
+
+# 🔭 Traces distribuées HTTP/RabbitMQ (opt-in : TRACING_ENABLED)
+setup_tracing(app)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +33,14 @@ app.add_middleware(
     allow_headers=["*"],  # Permet tous les headers
 )
 
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Prêt seulement une fois le pool SQL et RabbitMQ préchauffés (503 au démarrage/à l'arrêt)."""
+    if not readiness.ready:
+        raise HTTPException(status_code=503, detail="Service non prêt")
+    return {"status": "ready"}
+
 # Enregistrement des routes
 app.include_router(booking_router, prefix="/bk", tags=["bookings"])
 
@@ -2,16 +2,19 @@
 import os, json, logging, traceback, uuid
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-import aio_pika
-import httpx
 from dotenv import load_dotenv
+from opentelemetry.trace import SpanKind
 
+from app.core.amqp import amqp_client
+from app.core.etag import make_etag
+from app.core.http_client import get_http_client
+from app.core.tracing import inject_headers, tracer
 from app.db.models.booking import Booking, BookingStatus
 from app.db.schemas.booking import BookingCreate, BookingResponse
 
@@ -60,41 +63,50 @@ def _compute_amounts(
         "driver_collected_cash": driver_cash,
     }
 
-async def _notify_trip_reduce_seats(trip_id: str, booking_id: str, number_of_seats: int):
+async def _notify_trip_reduce_seats(
+    trip_id: str, booking_id: str, number_of_seats: int,
+    stop_id: Optional[str] = None, from_stop_id: Optional[str] = None,
+):
     if not RABBITMQ_URL:
         logger.warning("RABBITMQ_URL non défini, skip publish.")
         return
-    connection = await aio_pika.connect_robust(RABBITMQ_URL)
-    async with connection:
-        channel = await channel_with_queue(connection)
-        message_body = {
-            "action": "decrease_available_seats",
-            "trip_id": trip_id,
-            "booking_id": booking_id,
-            "number_of_seats": number_of_seats,
-        }
-        msg = aio_pika.Message(
-            body=json.dumps(message_body).encode("utf-8"),
-            content_type="application/json",
-            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-        )
-        await channel.default_exchange.publish(msg, routing_key=QUEUE_NAME)
-        logger.info(f"[RabbitMQ] published {message_body}")
-
-async def channel_with_queue(connection):
-    channel = await connection.channel()
-    await channel.declare_queue(QUEUE_NAME, durable=True)
-    return channel
+    message_body = {
+        "action": "decrease_available_seats",
+        "trip_id": trip_id,
+        "booking_id": booking_id,
+        "number_of_seats": number_of_seats,
+        # tronçons de l'arrêt de montée (None = départ) à l'arrêt de descente (None = destination)
+        "stop_id": stop_id,
+        "from_stop_id": from_stop_id,
+    }
+    await amqp_client.publish(QUEUE_NAME, message_body)
+    logger.info(f"[RabbitMQ] published {message_body}")
 
 async def _get_trip_details(trip_id: str) -> dict:
     if not TRIP_SERVICE_URL:
         raise HTTPException(status_code=500, detail="TRIP_SERVICE_URL manquant.")
     url = f"{TRIP_SERVICE_URL}/tp/get_trip_by_id/{trip_id}"
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        resp = await client.get(url)
-        if resp.status_code != 200:
-            raise HTTPException(status_code=404, detail="Trajet introuvable.")
-        return resp.json()
+    with tracer.start_as_current_span("GET trip-service /tp/get_trip_by_id", kind=SpanKind.CLIENT) as span:
+        resp = await get_http_client().get(url, headers=inject_headers())
+        span.set_attribute("http.status_code", resp.status_code)
+    if resp.status_code != 200:
+        raise HTTPException(status_code=404, detail="Trajet introuvable.")
+    return resp.json()
+
+def _stop_param(stop_id) -> Optional[str]:
+    return str(stop_id) if stop_id else None
+
+
+async def _get_seats_between_stops(trip_id: str, from_stop_id: Optional[str], stop_id: Optional[str]) -> int:
+    """Places vendables de l'arrêt de montée à l'arrêt de descente (inventaire par tronçon du trip service)."""
+    url = f"{TRIP_SERVICE_URL}/tp/trip/{trip_id}/available_seats"
+    params = {name: value for name, value in (("from_stop_id", from_stop_id), ("to_stop_id", stop_id)) if value}
+    with tracer.start_as_current_span("GET trip-service /tp/trip/available_seats", kind=SpanKind.CLIENT) as span:
+        resp = await get_http_client().get(url, params=params, headers=inject_headers())
+        span.set_attribute("http.status_code", resp.status_code)
+    if resp.status_code != 200:
+        raise HTTPException(status_code=400, detail="Arrêt invalide pour ce trajet.")
+    return int(resp.json().get("available_seats", 0))
 
 # ---------- services ----------
 
@@ -120,6 +132,11 @@ async def create_booking(db: AsyncSession, data: BookingCreate) -> BookingRespon
 
         # d) disponibilité sièges
         available_seats = int(trip.get("available_seats", 0))
+        if data.id_stop or data.id_boarding_stop:
+            # Montée / descente à un arrêt : seuls les tronçons parcourus comptent
+            available_seats = await _get_seats_between_stops(
+                str(data.id_trip), _stop_param(data.id_boarding_stop), _stop_param(data.id_stop)
+            )
         if available_seats < int(data.number_of_seats):
             raise HTTPException(status_code=400, detail="Nombre de places insuffisant.")
 
@@ -146,6 +163,7 @@ async def create_booking(db: AsyncSession, data: BookingCreate) -> BookingRespon
             id_user=data.id_user,
             id_trip=data.id_trip,
             id_stop=data.id_stop,
+            id_boarding_stop=data.id_boarding_stop,
             id_driver=data.id_driver,
 
             number_of_seats=data.number_of_seats,
@@ -181,6 +199,8 @@ async def create_booking(db: AsyncSession, data: BookingCreate) -> BookingRespon
                 trip_id=str(data.id_trip),
                 booking_id=str(booking.id),
                 number_of_seats=int(data.number_of_seats),
+                stop_id=_stop_param(data.id_stop),
+                from_stop_id=_stop_param(data.id_boarding_stop),
             )
         except Exception as e:
             logger.error(f"[RabbitMQ] erreur publish: {e}")
@@ -228,26 +248,24 @@ from app.db.schemas.booking import (
 
 # ---------- RabbitMQ helpers (ajoute ce publish pour +seats) ----------
 
-async def _notify_trip_increase_seats(trip_id: str, booking_id: str, number_of_seats: int):
+async def _notify_trip_increase_seats(
+    trip_id: str, booking_id: str, number_of_seats: int,
+    stop_id: Optional[str] = None, from_stop_id: Optional[str] = None,
+):
     if not RABBITMQ_URL:
         logger.warning("RABBITMQ_URL non défini, skip publish (+seats).")
         return
-    connection = await aio_pika.connect_robust(RABBITMQ_URL)
-    async with connection:
-        channel = await channel_with_queue(connection)
-        message_body = {
-            "action": "increase_available_seats",
-            "trip_id": trip_id,
-            "booking_id": booking_id,
-            "number_of_seats": number_of_seats,
-        }
-        msg = aio_pika.Message(
-            body=json.dumps(message_body).encode("utf-8"),
-            content_type="application/json",
-            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-        )
-        await channel.default_exchange.publish(msg, routing_key=QUEUE_NAME)
-        logger.info(f"[RabbitMQ] published {message_body}")
+    message_body = {
+        "action": "increase_available_seats",
+        "trip_id": trip_id,
+        "booking_id": booking_id,
+        "number_of_seats": number_of_seats,
+        # tronçons de l'arrêt de montée (None = départ) à l'arrêt de descente (None = destination)
+        "stop_id": stop_id,
+        "from_stop_id": from_stop_id,
+    }
+    await amqp_client.publish(QUEUE_NAME, message_body)
+    logger.info(f"[RabbitMQ] published {message_body}")
 
 # ---------- Reads ----------
 
@@ -258,6 +276,17 @@ async def get_booking_by_id(db: AsyncSession, booking_id:uuid. UUID) -> BookingR
         raise HTTPException(status_code=404, detail="Réservation introuvable.")
     return BookingResponse.model_validate(bk)
 
+def booking_etag(booking_id, updated_at, created_at, status) -> str:
+    """ETag d'une réservation : updated_at (created_at tant qu'elle n'a jamais été modifiée) + statut."""
+    return make_etag(booking_id, updated_at or created_at, getattr(status, "value", status))
+
+async def get_booking_etag(db: AsyncSession, booking_id: uuid.UUID) -> Optional[str]:
+    """Lecture étroite pour If-None-Match ; None si la réservation n'existe pas."""
+    row = (await db.execute(
+        select(Booking.updated_at, Booking.created_at, Booking.status).where(Booking.id == booking_id)
+    )).first()
+    return booking_etag(booking_id, *row) if row else None
+
 async def list_bookings_by_driver(db: AsyncSession, driver_id: uuid.UUID) -> List[BookingResponse]:
     res = await db.execute(
         select(Booking).where(Booking.id_driver == driver_id).order_by(Booking.created_at.desc())
@@ -328,6 +357,8 @@ async def cancel_booking(
                 trip_id=str(bk.id_trip),
                 booking_id=str(bk.id),
                 number_of_seats=seats_to_give_back,
+                stop_id=_stop_param(bk.id_stop),
+                from_stop_id=_stop_param(bk.id_boarding_stop),
             )
         except Exception as e:
             logger.error(f"[RabbitMQ] erreur publish (+seats): {e}")
@@ -391,6 +422,11 @@ async def create_booking_pending(db: AsyncSession, data: BookingCreate) -> Booki
 
         # d) disponibilité sièges - VÉRIFICATION CRITIQUE
         available_seats = int(trip.get("available_seats", 0))
+        if data.id_stop or data.id_boarding_stop:
+            # Montée / descente à un arrêt : seuls les tronçons parcourus comptent
+            available_seats = await _get_seats_between_stops(
+                str(data.id_trip), _stop_param(data.id_boarding_stop), _stop_param(data.id_stop)
+            )
         if available_seats < int(data.number_of_seats):
             raise HTTPException(status_code=400, detail="Nombre de places insuffisant.")
 
@@ -417,6 +453,7 @@ async def create_booking_pending(db: AsyncSession, data: BookingCreate) -> Booki
             id_user=data.id_user,
             id_trip=data.id_trip,
             id_stop=data.id_stop,
+            id_boarding_stop=data.id_boarding_stop,
             id_driver=data.id_driver,
 
             number_of_seats=data.number_of_seats,
@@ -494,6 +531,8 @@ async def confirm_booking_after_payment(db: AsyncSession, booking_id: uuid.UUID)
                 trip_id=str(booking.id_trip),
                 booking_id=str(booking.id),
                 number_of_seats=int(booking.number_of_seats),
+                stop_id=_stop_param(booking.id_stop),
+                from_stop_id=_stop_param(booking.id_boarding_stop),
             )
             logger.info(f"✅ Places décrémentées pour booking {booking.id}: -{booking.number_of_seats} places")
         except Exception as e:
@@ -0,0 +1,38 @@
+"""Micro-benchmarks : création (pending) et annulation de réservations (voir conftest.py)."""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.db.schemas.booking import BookingCancelRequest, BookingCreate
+from app.services.booking_service import cancel_booking, create_booking_pending
+
+
+def bench_create_booking_pending(benchmark, call, dataset, trip_service_stub):
+    trip = next(iter(dataset["trips"].values()))
+
+    # Un nouveau passager à chaque round : jamais de 409 (doublon)
+    def create():
+        data = BookingCreate(
+            id_user=uuid.uuid4(),
+            id_trip=trip["id"],
+            id_driver=trip["driver_id"],
+            number_of_seats=1,
+            price_per_seat=str(trip["total_price"]),
+            reservation_fee_per_seat="2.50",
+            chauffeur_payment_method="virement",
+            free_cancellation_until=datetime.now(timezone.utc) + timedelta(days=7),
+        )
+        return call(create_booking_pending, data)
+
+    booking = benchmark(create)
+    assert booking.status == "pending"
+
+
+def bench_cancel_booking(benchmark, call, insert_confirmed_booking):
+    body = BookingCancelRequest(cancelled_at=datetime.now(timezone.utc))
+
+    # Chaque round annule une réservation confirmée insérée hors mesure
+    def setup():
+        return (cancel_booking, insert_confirmed_booking(), body), {}
+
+    result = benchmark.pedantic(call, setup=setup, rounds=50, warmup_rounds=1)
+    assert result.booking.status == "cancelled"
@@ -0,0 +1,155 @@
+"""
+Micro-benchmarks de la couche service (pytest-benchmark), sous le niveau HTTP.
+
+La base est lue dans BENCH_DATABASE_URL (défaut : fichier SQLite local via aiosqlite).
+Elle remplace DATABASE_URL avant l'import de `app` ; ses tables sont vidées puis
+ré-alimentées à chaque run. Une base PostgreSQL doit être dédiée (« bench » dans son nom)
+et reçoit les migrations Alembic, donc les mêmes index qu'en production.
+
+L'appel HTTP au trip service (_get_trip_details) est remplacé par le trajet du jeu de
+données : seul le travail du booking service est mesuré.
+
+Depuis mova-booking/ :
+    python -m pytest bench --bench-size 5000 --benchmark-save=baseline
+    python -m pytest bench --bench-size 5000 --benchmark-compare   # échoue si régression > seuil (pytest.ini)
+"""
+import asyncio
+import os
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite+aiosqlite:///./bench.sqlite3")
+if not BENCH_DATABASE_URL.startswith("sqlite") and "bench" not in BENCH_DATABASE_URL.rsplit("/", 1)[-1]:
+    raise pytest.UsageError("BENCH_DATABASE_URL doit viser une base dédiée (nom contenant « bench »)")
+
+os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+os.environ["RABBITMQ_URL"] = ""  # aucune publication pendant les mesures
+
+from app.db.base import Base  # noqa: E402
+from app.db.database import async_session, dispose_engine, get_engine  # noqa: E402
+from app.db.models.booking import Booking, BookingStatus  # noqa: E402
+from app.services import booking_service  # noqa: E402
+from app.services.booking_service import _compute_amounts  # noqa: E402
+
+BOOKINGS_PER_TRIP = 5
+BATCH = 1000
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-size", type=int, default=int(os.getenv("BENCH_SIZE", 1000)),
+        help="nombre de réservations du jeu de données",
+    )
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Exécute une coroutine sur l'unique boucle du bench (le pool SQL y est attaché)."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.run_until_complete(dispose_engine())
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def call(run, dataset):
+    """call(service_fn, *args) : une session neuve par appel, comme get_db() dans une requête."""
+
+    def call(fn, *args, **kwargs):
+        async def go():
+            async with async_session() as db:
+                return await fn(db, *args, **kwargs)
+
+        return run(go())
+
+    return call
+
+
+async def reset_schema() -> None:
+    engine = get_engine()
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        return
+
+    from app.db.migrate import upgrade
+
+    await asyncio.to_thread(upgrade, "head")
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+
+
+async def insert(rows: list) -> None:
+    for start in range(0, len(rows), BATCH):
+        async with async_session() as db:
+            db.add_all(rows[start:start + BATCH])
+            await db.commit()
+
+
+def make_booking(trip: dict, user_id: uuid.UUID, method: str, status=BookingStatus.confirmed) -> Booking:
+    price, fee, tax_rate = Decimal(str(trip["total_price"])), Decimal("2.50"), Decimal("0.15")
+    amounts = _compute_amounts(1, price, fee, tax_rate, method)
+    return Booking(
+        id=uuid.uuid4(), id_user=user_id, id_trip=uuid.UUID(trip["id"]), id_driver=uuid.UUID(trip["driver_id"]),
+        number_of_seats=1, price_per_seat=price, reservation_fee_per_seat=fee,
+        currency="CAD", tax_rate=tax_rate, tax_region="HST-NB",
+        chauffeur_payment_method=method, payment_method_used="card",
+        free_cancellation_until=datetime.now(timezone.utc) + timedelta(days=7),
+        status=status, **amounts,
+    )
+
+
+@pytest.fixture(scope="session")
+def dataset(run, request) -> dict:
+    """Réservations confirmées, BOOKINGS_PER_TRIP par trajet, passagers distincts."""
+    size = request.config.getoption("--bench-size")
+    rng = random.Random(42)
+
+    trips = [
+        {
+            "id": str(uuid.uuid4()),
+            "driver_id": str(uuid.uuid4()),
+            "status": "pending",
+            "departure_date": (date.today() + timedelta(days=rng.randint(1, 14))).isoformat(),
+            "available_seats": 10_000,
+            "total_price": round(rng.uniform(15, 80), 2),
+        }
+        for _ in range(max(1, size // BOOKINGS_PER_TRIP))
+    ]
+    rows = [make_booking(rng.choice(trips), uuid.uuid4(), rng.choice(["cash", "virement"])) for _ in range(size)]
+
+    async def seed():
+        await reset_schema()
+        await insert(rows)
+
+    run(seed())
+    return {"trips": {t["id"]: t for t in trips}}
+
+
+@pytest.fixture
+def trip_service_stub(monkeypatch, dataset):
+    """Réponse du trip service lue dans le jeu de données (pas d'appel réseau mesuré)."""
+
+    async def get_trip_details(trip_id: str) -> dict:
+        return dataset["trips"][trip_id]
+
+    monkeypatch.setattr(booking_service, "_get_trip_details", get_trip_details)
+
+
+@pytest.fixture(scope="session")
+def insert_confirmed_booking(run, dataset):
+    """Insère (hors mesure) une réservation confirmée sur un trajet du jeu de données ; renvoie son id."""
+    trip = next(iter(dataset["trips"].values()))
+
+    def insert_one() -> uuid.UUID:
+        booking = make_booking(trip, uuid.uuid4(), "virement")
+        run(insert([booking]))
+        return booking.id
+
+    return insert_one
@@ -10,10 +10,13 @@ from app.services.payment_service import (
 )
 from app.db.models.payment import Payment, PaymentStatus
 from app.core.config import settings
+import logging
 import stripe
 import uuid
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
@@ -86,11 +89,11 @@ async def create_payment_intent(payload: PaymentCreate, db: AsyncSession = Depen
         }
 
     except stripe.error.StripeError as e:
-        print(f"❌ Erreur Stripe: {e}")
+        logger.error(f"❌ Erreur Stripe: {e}")
         raise HTTPException(status_code=500, detail=f"Erreur Stripe: {str(e)}")
     
     except Exception as e:
-        print(f"❌ Erreur création paiement: {e}")
+        logger.error(f"❌ Erreur création paiement: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # @router.post("/webhook")
@@ -133,43 +136,33 @@ async def stripe_webhook(request: Request, db: AsyncSession = Depends(get_db)):
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature")
 
-    print("\n==============================")
-    print("📩 Webhook Stripe reçu")
-    print("==============================")
-    print("Payload brut :", payload.decode("utf-8")[:300])  # affiche les 300 premiers caractères
-    print("==============================\n")
-
+    # Le payload (données de paiement) n'est jamais journalisé : seulement le type et l'identifiant
     try:
         event = stripe.Webhook.construct_event(
             payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
         )
-        print("✅ Signature Stripe vérifiée.")
     except stripe.error.SignatureVerificationError:
-        print("❌ Signature Stripe invalide — clé webhook incorrecte.")
+        logger.warning("❌ Webhook Stripe : signature invalide")
         raise HTTPException(status_code=400, detail="Signature Stripe invalide")
 
     event_type = event["type"]
     data = event["data"]["object"]
 
-    print(f"🎯 Type d'événement : {event_type}")
+    logger.info("📩 Webhook Stripe reçu", extra={"event_type": event_type, "event_id": event.get("id")})
 
     # Gestion selon le type d'événement Stripe
     if event_type == "payment_intent.succeeded":
-        print("💰 Paiement réussi détecté !")
         await handle_payment_succeeded(data, db)
 
     elif event_type == "payment_intent.payment_failed":
-        print("❌ Paiement échoué détecté.")
         await handle_payment_failed(data, db)
 
     elif event_type == "charge.refunded":
-        print("💸 Paiement remboursé détecté.")
         await handle_payment_refunded(data, db)
 
     else:
-        print(f"⚠️ Événement ignoré : {event_type}")
+        logger.info(f"⚠️ Événement Stripe ignoré : {event_type}")
 
-    print("✅ Fin du traitement webhook.\n")
     return {"status": "success"}
 
 
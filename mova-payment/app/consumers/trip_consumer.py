@@ -2,11 +2,16 @@
 import asyncio
 import json
 import logging
+import signal
 import aio_pika
 import os
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import async_session
+from app.core.amqp import QueueConsumer, amqp_client
+from app.core.config import settings
+from app.core.logging_config import setup_logging
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.db.database import async_session, dispose_engine, warm_engine
 from app.services.driver_earning_service import mark_trip_earnings_payable
 
 logger = logging.getLogger(__name__)
@@ -15,11 +20,6 @@ RABBITMQ_URL = os.getenv("RABBITMQ_URL")
 QUEUE_NAME_TRIP_COMPLETED = "trip_completed_queue"
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("trip_consumer.log"), logging.StreamHandler()]
-)
 
 async def process_message(message: aio_pika.IncomingMessage):
     """
@@ -33,27 +33,51 @@ async def process_message(message: aio_pika.IncomingMessage):
             
 
             if not trip_id:
-                logging.warning(f"Message invalide : {data}")
+                logger.warning(f"Message invalide : {data}")
                 return
 
-            logging.info(f"📩 Message reçu : {data}")
+            logger.info(f"📩 Message reçu : {data}")
 
             async with async_session() as db:
                 if event == "trip.completed":
                     await mark_trip_earnings_payable(db, trip_id)
                 
                 else:
-                    logging.warning(f"Action inconnue : {event}")
+                    logger.warning(f"Action inconnue : {event}")
 
         except Exception as e:
-            logging.error(f"❌ Erreur lors du traitement du message : {e}")
+            logger.error(f"❌ Erreur lors du traitement du message : {e}")
 
-async def start_rabbitmq_consumer():
-    """🎧 Écoute en continu la file RabbitMQ"""
-    connection = await aio_pika.connect_robust(RABBITMQ_URL)
-    channel = await connection.channel()
-    queue = await channel.declare_queue(QUEUE_NAME_TRIP_COMPLETED, durable=True)
+async def start_rabbitmq_consumer() -> QueueConsumer:
+    """🎧 Écoute la file RabbitMQ sur la connexion partagée (arrêtée par `amqp_client.close()`)"""
+    consumer = await amqp_client.consume(
+        QUEUE_NAME_TRIP_COMPLETED, process_message, prefetch_count=settings.CONSUMER_CONCURRENCY
+    )
+    logger.info(f"🟢 [PAYMENT Service] En écoute sur RabbitMQ ({QUEUE_NAME_TRIP_COMPLETED})...")
+    return consumer
 
-    logging.info(f"🟢 [PAYMENT Service] En écoute sur RabbitMQ ({QUEUE_NAME_TRIP_COMPLETED})...")
-    await queue.consume(process_message)
-    await asyncio.Future()  # garde la boucle active
+
+async def run_consumer_worker() -> None:
+    """
+    🏭 Worker dédié : consomme la file sans servir de HTTP, jusqu'à SIGTERM/SIGINT.
+    Lancement : `python -m app.consumers.trip_consumer` (avec RUN_CONSUMERS_IN_API=false côté API).
+    """
+    setup_logging()
+    setup_tracing()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    await warm_engine(min(settings.DB_POOL_WARM_SIZE, settings.CONSUMER_CONCURRENCY))
+    await start_rabbitmq_consumer()
+    try:
+        await stop.wait()
+    finally:
+        await amqp_client.close(timeout=settings.SHUTDOWN_TIMEOUT)
+        await dispose_engine()
+        shutdown_tracing()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_consumer_worker())
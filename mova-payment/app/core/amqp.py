@@ -0,0 +1,224 @@
+"""
+Client RabbitMQ du processus (AmqpClient) : publications, consumers, diffusions fanout.
+
+Module commun aux services : original dans shared/core/amqp.py, recopié dans
+chaque app/core/ par `python shared/sync_core.py` (ne pas modifier une copie).
+"""
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+import aio_pika
+from opentelemetry.trace import SpanKind
+from aio_pika.pool import Pool
+
+from app.core.config import settings
+from app.core.metrics import AMQP_CONSUMER_LAG_SECONDS, AMQP_PROCESSING_SECONDS, AMQP_PUBLISH_SECONDS
+from app.core.tracing import extract_context, inject_headers, tracer
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[aio_pika.abc.AbstractIncomingMessage], Awaitable[None]]
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Le timestamp AMQP est à la seconde et peut arriver sans fuseau
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class QueueConsumer:
+    """
+    Consommation d'une file sur un canal dédié.
+
+    `stop()` annule l'abonnement (plus aucune livraison), attend la fin des
+    messages en cours de traitement puis ferme le canal : les messages
+    préchargés mais non acquittés sont remis en file par RabbitMQ.
+    """
+
+    def __init__(self, channel: aio_pika.abc.AbstractChannel, queue: aio_pika.abc.AbstractQueue, handler: MessageHandler):
+        self.channel = channel
+        self.queue = queue
+        self.handler = handler
+        self._consumer_tag: Optional[str] = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def _on_message(self, message: aio_pika.abc.AbstractIncomingMessage) -> None:
+        task = asyncio.current_task()
+        self._inflight.add(task)
+        queue_name = self.queue.name
+        if message.timestamp is not None:
+            AMQP_CONSUMER_LAG_SECONDS.labels(queue_name).observe(
+                max((datetime.now(timezone.utc) - _as_utc(message.timestamp)).total_seconds(), 0.0)
+            )
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            # Span rattaché à celui du publieur via les en-têtes du message
+            with tracer.start_as_current_span(
+                f"process {queue_name}",
+                context=extract_context(message.headers),
+                kind=SpanKind.CONSUMER,
+                attributes={"messaging.system": "rabbitmq", "messaging.destination": queue_name},
+            ):
+                await self.handler(message)
+            outcome = "ok"
+        finally:
+            AMQP_PROCESSING_SECONDS.labels(queue_name, outcome).observe(time.perf_counter() - start)
+            self._inflight.discard(task)
+
+    async def start(self) -> None:
+        self._consumer_tag = await self.queue.consume(self._on_message)
+        logger.info(f"[AMQP] 🟢 En écoute sur {self.queue.name}")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        if self._consumer_tag is not None:
+            await self.queue.cancel(self._consumer_tag)
+            self._consumer_tag = None
+
+        if self._inflight:
+            done, pending = await asyncio.wait(set(self._inflight), timeout=timeout)
+            if pending:
+                logger.warning(f"[AMQP] ⚠️ {len(pending)} message(s) interrompus à l'arrêt ({self.queue.name})")
+                for task in pending:
+                    task.cancel()
+
+        if not self.channel.is_closed:
+            await self.channel.close()
+        logger.info(f"[AMQP] 🔴 Consumer arrêté ({self.queue.name})")
+
+
+class AmqpClient:
+    """
+    Connexion RabbitMQ partagée par le processus.
+
+    - une seule connexion robuste, ouverte au démarrage (ou à la première publication) ;
+    - un pool de canaux pour les publications, les files déclarées une seule fois ;
+    - un canal dédié par consumer ;
+    - échanges fanout pour les diffusions éphémères vers tous les processus.
+    """
+
+    def __init__(self, url: Optional[str], channel_pool_size: int = 4):
+        self.url = url
+        self.channel_pool_size = channel_pool_size
+        self._connection: Optional[aio_pika.abc.AbstractRobustConnection] = None
+        self._channel_pool: Optional[Pool] = None
+        self._declared_queues: set[str] = set()
+        self._declared_exchanges: set[str] = set()
+        self._consumers: list[QueueConsumer] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed
+
+    async def _get_channel(self) -> aio_pika.abc.AbstractChannel:
+        return await self._connection.channel()
+
+    async def connect(self) -> None:
+        """Ouvre la connexion et un premier canal (idempotent)."""
+        async with self._lock:
+            if self._connection is not None:
+                return
+            if not self.url:
+                raise RuntimeError("RABBITMQ_URL non défini")
+
+            self._connection = await aio_pika.connect_robust(self.url)
+            self._channel_pool = Pool(self._get_channel, max_size=self.channel_pool_size)
+            async with self._channel_pool.acquire():
+                pass
+            logger.info(f"[AMQP] 🟢 Connecté ({self.channel_pool_size} canaux de publication)")
+
+    async def publish(self, queue_name: str, payload: dict) -> None:
+        """Publie un message JSON persistant ; lève une exception en cas d'échec."""
+        await self.connect()
+        start = time.perf_counter()
+        with tracer.start_as_current_span(
+            f"publish {queue_name}",
+            kind=SpanKind.PRODUCER,
+            attributes={"messaging.system": "rabbitmq", "messaging.destination": queue_name},
+        ):
+            async with self._channel_pool.acquire() as channel:
+                if queue_name not in self._declared_queues:
+                    await channel.declare_queue(queue_name, durable=True)
+                    self._declared_queues.add(queue_name)
+
+                message = aio_pika.Message(
+                    body=json.dumps(payload, default=str).encode("utf-8"),
+                    content_type="application/json",
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                    timestamp=datetime.now(timezone.utc),
+                    headers=inject_headers(),
+                )
+                await channel.default_exchange.publish(message, routing_key=queue_name)
+        AMQP_PUBLISH_SECONDS.labels(queue_name).observe(time.perf_counter() - start)
+
+    async def publish_fanout(self, exchange_name: str, payload: dict) -> None:
+        """Diffusion non persistante : chaque processus abonné (subscribe_fanout) reçoit le message."""
+        await self.connect()
+        start = time.perf_counter()
+        with tracer.start_as_current_span(
+            f"publish {exchange_name}",
+            kind=SpanKind.PRODUCER,
+            attributes={"messaging.system": "rabbitmq", "messaging.destination": exchange_name},
+        ):
+            async with self._channel_pool.acquire() as channel:
+                if exchange_name not in self._declared_exchanges:
+                    await channel.declare_exchange(exchange_name, aio_pika.ExchangeType.FANOUT)
+                    self._declared_exchanges.add(exchange_name)
+                exchange = await channel.get_exchange(exchange_name, ensure=False)
+
+                message = aio_pika.Message(
+                    body=json.dumps(payload, default=str).encode("utf-8"),
+                    content_type="application/json",
+                    timestamp=datetime.now(timezone.utc),
+                    headers=inject_headers(),
+                )
+                await exchange.publish(message, routing_key="")
+        AMQP_PUBLISH_SECONDS.labels(exchange_name).observe(time.perf_counter() - start)
+
+    async def subscribe_fanout(self, exchange_name: str, handler: MessageHandler) -> QueueConsumer:
+        """File exclusive propre au processus, liée à l'échange et supprimée à la déconnexion."""
+        await self.connect()
+        channel = await self._connection.channel()
+        exchange = await channel.declare_exchange(exchange_name, aio_pika.ExchangeType.FANOUT)
+        queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+        await queue.bind(exchange)
+        consumer = QueueConsumer(channel, queue, handler)
+        await consumer.start()
+        self._consumers.append(consumer)
+        return consumer
+
+    async def consume(self, queue_name: str, handler: MessageHandler, prefetch_count: int = 10) -> QueueConsumer:
+        """Au plus `prefetch_count` messages non acquittés, donc traités en parallèle."""
+        await self.connect()
+        channel = await self._connection.channel()
+        await channel.set_qos(prefetch_count=prefetch_count)
+        queue = await channel.declare_queue(queue_name, durable=True)
+        consumer = QueueConsumer(channel, queue, handler)
+        await consumer.start()
+        self._consumers.append(consumer)
+        return consumer
+
+    async def stop_consumers(self, timeout: float = 10.0) -> None:
+        await asyncio.gather(*(c.stop(timeout) for c in self._consumers), return_exceptions=True)
+        self._consumers = []
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Arrête les consumers (drain) puis ferme canaux et connexion."""
+        await self.stop_consumers(timeout)
+        async with self._lock:
+            if self._connection is None:
+                return
+            await self._channel_pool.close()
+            await self._connection.close()
+            self._connection = None
+            self._channel_pool = None
+            self._declared_queues.clear()
+            self._declared_exchanges.clear()
+            logger.info("[AMQP] 🔴 Connexion fermée")
+
+
+amqp_client = AmqpClient(settings.RABBITMQ_URL, channel_pool_size=settings.RABBITMQ_CHANNEL_POOL_SIZE)
@@ -6,12 +6,46 @@ import os
 load_dotenv()
 
 class Settings(BaseSettings):
+    SERVICE_NAME: str = "mova-payment"  # traces et logs (modules communs de app/core)
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     STRIPE_SECRET_KEY: str = os.getenv("STRIPE_SECRET_KEY")
     STRIPE_WEBHOOK_SECRET: str = os.getenv("STRIPE_WEBHOOK_SECRET")
-    RABBITMQ_URL: str = os.getenv("RABBITMQ_URL")   
-    
-    
+    RABBITMQ_URL: str = os.getenv("RABBITMQ_URL")
+    RABBITMQ_CHANNEL_POOL_SIZE: int = 4
+
+    # Consumers : messages traités en parallèle (prefetch) et exécution dans le
+    # process HTTP ou dans un worker dédié (`python -m app.consumers.<module>`)
+    CONSUMER_CONCURRENCY: int = 10
+    RUN_CONSUMERS_IN_API: bool = True
+
+    # Démarrage : vérifie la révision Alembic (les migrations sont appliquées
+    # une fois par déploiement avec `python -m app.db.migrate`)
+    SCHEMA_CHECK_ON_STARTUP: bool = True
+
+    # Cycle de vie (lifespan) : préchauffage au démarrage, drain à l'arrêt
+    DB_POOL_WARM_SIZE: int = 5
+    SHUTDOWN_TIMEOUT: float = 10.0
+
+    # Instrumentation SQL (app/core/sql_instrumentation.py) : en-têtes X-DB-* en dev
+    SQL_INSTRUMENTATION: bool = False
+    SQL_STATS_HEADERS: bool = False
+    SQL_SLOW_QUERY_MS: float = 100.0
+    SQL_QUERY_BUDGET: int = 10
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 5
+
+    # Traces distribuées OpenTelemetry (app/core/tracing.py) : otlp ou file
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "otlp"
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACE_FILE: str = "payment_traces.jsonl"
+
+    # Logs JSON non bloquants (app/core/logging_config.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_FILE: str = ""
+    # Loggers bavards (clients réseau) échantillonnables ; 1.0 = tous les logs conservés
+    LOG_SAMPLED_LOGGERS: str = "aiormq,aio_pika"
+    LOG_SAMPLE_RATE: float = 1.0
 
     class Config:
         env_file = ".env"
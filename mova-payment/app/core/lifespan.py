@@ -0,0 +1,50 @@
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.consumers.trip_consumer import start_rabbitmq_consumer
+from app.core.amqp import amqp_client
+from app.core.config import settings
+from app.core.tracing import shutdown_tracing
+from app.db.database import dispose_engine, get_engine, warm_engine
+from app.db.migrate import ensure_schema_is_current
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Prêt uniquement entre la fin du préchauffage et le début de l'arrêt."""
+
+    def __init__(self):
+        self.ready = False
+
+
+readiness = Readiness()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 🚀 Démarrage : schéma, pool SQL, connexion RabbitMQ, consumer trip.completed
+    if settings.SCHEMA_CHECK_ON_STARTUP:
+        await ensure_schema_is_current(get_engine())
+    await warm_engine(settings.DB_POOL_WARM_SIZE)
+
+    if settings.RABBITMQ_URL:
+        await amqp_client.connect()
+        if settings.RUN_CONSUMERS_IN_API:
+            await start_rabbitmq_consumer()
+    else:
+        logger.warning("RABBITMQ_URL non défini : consumer désactivé")
+
+    readiness.ready = True
+    logger.info("✅ Payment service prêt")
+    try:
+        yield
+    finally:
+        # 🛑 Arrêt : plus de nouveau trafic, drain des messages en cours, fermeture des pools
+        readiness.ready = False
+        await amqp_client.close(timeout=settings.SHUTDOWN_TIMEOUT)
+        await dispose_engine()
+        shutdown_tracing()
+        logger.info("🔴 Payment service arrêté")
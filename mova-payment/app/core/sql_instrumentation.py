@@ -0,0 +1,158 @@
+"""
+Instrumentation SQL (opt-in : SQL_INSTRUMENTATION=true).
+
+Branchée sur les événements `before/after_cursor_execute` du moteur, elle relève
+pour chaque requête HTTP : le nombre de requêtes SQL, le temps passé en base,
+les requêtes lentes (avec la forme des paramètres, jamais leurs valeurs) et les
+instructions répétées (N+1). Au-delà de SQL_QUERY_BUDGET, la requête est signalée.
+
+- dev  (SQL_STATS_HEADERS=true) : en-têtes X-DB-* sur chaque réponse ;
+- prod : histogrammes/compteurs Prometheus (app.core.metrics).
+
+Module commun aux services : original dans shared/core/sql_instrumentation.py, recopié dans
+chaque app/core/ par `python shared/sync_core.py` (ne pas modifier une copie).
+"""
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    DB_QUERY_BUDGET_EXCEEDED,
+    DB_SLOW_QUERIES,
+    DB_TIME_PER_REQUEST_SECONDS,
+    route_template,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    db_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def most_repeated(self) -> tuple[Optional[str], int]:
+        if not self.statements:
+            return None, 0
+        return self.statements.most_common(1)[0]
+
+
+# Statistiques de la requête HTTP en cours (None hors requête : workers, scripts)
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+def _param_shape(parameters) -> str:
+    """Types des paramètres liés, sans les valeurs (ex. {'id_1': 'UUID', 'param_1': 'int'})."""
+    if isinstance(parameters, dict):
+        return str({k: type(v).__name__ for k, v in parameters.items()})
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"{len(parameters)} × {_param_shape(parameters[0])}"
+        return str([type(v).__name__ for v in parameters])
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.db_time += elapsed
+        stats.statements[statement] += 1
+
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        DB_SLOW_QUERIES.inc()
+        logger.warning(
+            "🐢 Requête SQL lente",
+            extra={
+                "duration_ms": round(elapsed * 1000, 1),
+                "statement": " ".join(statement.split())[:500],
+                "params": _param_shape(parameters),
+            },
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Branche les écouteurs sur le moteur synchrone sous-jacent (AsyncEngine.sync_engine)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SqlStatsMiddleware:
+    """Middleware ASGI : ouvre un QueryStats par requête HTTP et publie le résultat."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and settings.SQL_STATS_HEADERS:
+                _, repeats = stats.most_repeated()
+                headers = list(message.get("headers", []))
+                headers += [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.db_time * 1000:.1f}".encode()),
+                    (b"x-db-max-repeat", str(repeats).encode()),
+                ]
+                if stats.count > settings.SQL_QUERY_BUDGET:
+                    headers.append((b"x-db-budget-exceeded", b"1"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+            self._report(scope, stats)
+
+    @staticmethod
+    def _report(scope, stats: QueryStats) -> None:
+        route = route_template(scope)
+        DB_QUERIES_PER_REQUEST.labels(route).observe(stats.count)
+        DB_TIME_PER_REQUEST_SECONDS.labels(route).observe(stats.db_time)
+
+        statement, repeats = stats.most_repeated()
+        if stats.count > settings.SQL_QUERY_BUDGET:
+            DB_QUERY_BUDGET_EXCEEDED.labels(route).inc()
+            logger.warning(
+                "⚠️ Budget de requêtes SQL dépassé",
+                extra={
+                    "route": route,
+                    "query_count": stats.count,
+                    "budget": settings.SQL_QUERY_BUDGET,
+                    "db_time_ms": round(stats.db_time * 1000, 1),
+                },
+            )
+        if repeats >= settings.SQL_REPEATED_STATEMENT_THRESHOLD:
+            logger.warning(
+                "🔁 Requête SQL répétée (N+1 probable)",
+                extra={"route": route, "repeats": repeats, "statement": " ".join(statement.split())[:500]},
+            )
+
+
+def setup_sql_instrumentation(app) -> None:
+    """Ajoute le middleware si l'instrumentation est activée (le moteur est instrumenté à sa création)."""
+    if settings.SQL_INSTRUMENTATION:
+        app.add_middleware(SqlStatsMiddleware)
@@ -0,0 +1,96 @@
+"""
+Migrations Alembic du service.
+
+- au démarrage des workers : `ensure_schema_is_current()` compare la révision
+  de la base (une requête sur alembic_version) à la tête des migrations du code
+  et échoue immédiatement si le schéma est en retard ;
+- une fois par déploiement : `python -m app.db.migrate` applique les migrations
+  (`python -m app.db.migrate check` vérifie seulement).
+"""
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+SERVICE_ROOT = Path(__file__).resolve().parents[2]
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaNotCurrentError(RuntimeError):
+    """La base n'est pas à la révision attendue par le code."""
+
+
+def alembic_config() -> Config:
+    config = Config(str(SERVICE_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(SERVICE_ROOT / "alembic"))
+    return config
+
+
+def get_head_revisions() -> set[str]:
+    """Révision(s) de tête connues du code (lecture des fichiers de versions, sans base)."""
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+async def get_current_revisions(engine: AsyncEngine) -> set[str]:
+    """Révision(s) appliquée(s) en base, en une seule requête."""
+    async with engine.connect() as conn:
+        try:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+        except Exception as e:
+            raise SchemaNotCurrentError(
+                "Table alembic_version absente : lancer `python -m app.db.migrate`"
+            ) from e
+        return {row[0] for row in result}
+
+
+async def ensure_schema_is_current(engine: AsyncEngine) -> None:
+    """Échoue immédiatement si la base n'est pas à la tête des migrations."""
+    heads = get_head_revisions()
+    current = await get_current_revisions(engine)
+    if current != heads:
+        raise SchemaNotCurrentError(
+            f"Schéma en retard (base={sorted(current) or 'vide'}, code={sorted(heads)}) : "
+            "lancer `python -m app.db.migrate` avant de démarrer les workers"
+        )
+    logger.info(f"✅ Schéma à jour (révision {', '.join(sorted(heads))})")
+
+
+def upgrade(revision: str = "head") -> None:
+    command.upgrade(alembic_config(), revision)
+
+
+async def _check() -> None:
+    from app.db.database import dispose_engine, get_engine
+
+    try:
+        await ensure_schema_is_current(get_engine())
+    finally:
+        await dispose_engine()
+
+
+def main(argv: list[str]) -> int:
+    action = argv[0] if argv else "upgrade"
+    if action == "upgrade":
+        upgrade(argv[1] if len(argv) > 1 else "head")
+        return 0
+    if action == "check":
+        try:
+            asyncio.run(_check())
+        except SchemaNotCurrentError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        print("✅ Schéma à jour")
+        return 0
+    print("usage: python -m app.db.migrate [upgrade [revision] | check]", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
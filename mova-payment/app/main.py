@@ -1,22 +1,27 @@
 # app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.payment_route import router as payment_router
 from app.api.driver_earning_route import router as driver_earning_router
+from app.core.lifespan import lifespan, readiness
+from app.core.logging_config import setup_logging
+from app.core.metrics import setup_metrics
+from app.core.sql_instrumentation import setup_sql_instrumentation
+from app.core.tracing import setup_tracing
 
-import asyncio
-import logging
+app = FastAPI(title="Payment Service", version="1.0.0", lifespan=lifespan)
 
-from app.db.base import Base 
-from app.db.database import engine
-from app.consumers.trip_consumer import  start_rabbitmq_consumer
+# 📝 Logs JSON via une file (configurés une fois par processus)
+setup_logging()
 
-app = FastAPI(title="Payment Service", version="1.0.0")
+# 📊 Métriques Prometheus (GET /metrics)
+setup_metrics(app)
 
-async def init_models():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+# 🔎 Instrumentation SQL par requête (opt-in : SQL_INSTRUMENTATION)
+setup_sql_instrumentation(app)
 
+# 🔭 Traces distribuées HTTP/RabbitMQ (opt-in : TRACING_ENABLED)
+setup_tracing(app)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,17 +32,17 @@ app.add_middleware(
 )
 
 
-@app.on_event("startup")
-async def startup_event():
-    await init_models()
-    logging.info("🚀 Démarrage du consumer RabbitMQ...")
-    asyncio.create_task(start_rabbitmq_consumer())
-    logging.info("✅ Consumer RabbitMQ démarré avec succès.")
-
-
 @app.get("/")
 async def root():
     return {"message": "Payment Service en ligne ✅"}
 
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Prêt seulement une fois le pool SQL et RabbitMQ préchauffés (503 au démarrage/à l'arrêt)."""
+    if not readiness.ready:
+        raise HTTPException(status_code=503, detail="Service non prêt")
+    return {"status": "ready"}
+
 app.include_router(payment_router, prefix="/payments", tags=["Payments"])
 app.include_router(driver_earning_router, tags=["Driver Earnings"])
@@ -225,4 +225,4 @@ async def handle_payment_refunded(data, db):
     if payment:
         payment.status = PaymentStatus.REFUNDED
         await db.commit()
-        print(f"💸 Paiement remboursé {charge_id}")
+        logger.info(f"💸 Paiement remboursé {charge_id}")
@@ -0,0 +1,22 @@
+"""Micro-benchmarks : résumé des gains chauffeur et demande d'encaissement (voir conftest.py)."""
+import uuid
+
+from app.db.schemas.payout_requests import PayoutRequestCreate
+from app.services.driver_earning_service import create_payout_request, get_driver_earnings_summary
+
+
+def bench_get_driver_earnings_summary(benchmark, call, dataset):
+    summary = benchmark(call, get_driver_earnings_summary, dataset["drivers"][0])
+    assert summary["count_payable"] >= 0
+
+
+def bench_create_payout_request(benchmark, call, insert_payable_earnings):
+    driver_id = uuid.uuid4()
+
+    # Chaque round encaisse 5 gains PAYABLE insérés hors mesure
+    def setup():
+        data = PayoutRequestCreate(driver_id=driver_id, earning_ids=insert_payable_earnings(driver_id, 5))
+        return (create_payout_request, data), {}
+
+    payout = benchmark.pedantic(call, setup=setup, rounds=50, warmup_rounds=1)
+    assert payout.status == "requested"
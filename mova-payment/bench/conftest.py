@@ -0,0 +1,130 @@
+"""
+Micro-benchmarks de la couche service (pytest-benchmark), sous le niveau HTTP.
+
+La base est lue dans BENCH_DATABASE_URL (défaut : fichier SQLite local via aiosqlite).
+Elle remplace DATABASE_URL avant l'import de `app` ; ses tables sont vidées puis
+ré-alimentées à chaque run. Une base PostgreSQL doit être dédiée (« bench » dans son nom)
+et reçoit les migrations Alembic, donc les mêmes index qu'en production.
+
+Depuis mova-payment/ :
+    python -m pytest bench --bench-size 5000 --benchmark-save=baseline
+    python -m pytest bench --bench-size 5000 --benchmark-compare   # échoue si régression > seuil (pytest.ini)
+"""
+import asyncio
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite+aiosqlite:///./bench.sqlite3")
+if not BENCH_DATABASE_URL.startswith("sqlite") and "bench" not in BENCH_DATABASE_URL.rsplit("/", 1)[-1]:
+    raise pytest.UsageError("BENCH_DATABASE_URL doit viser une base dédiée (nom contenant « bench »)")
+
+os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+os.environ["RABBITMQ_URL"] = ""  # aucune publication pendant les mesures
+
+from app.db.base import Base  # noqa: E402
+from app.db.database import async_session, dispose_engine, get_engine  # noqa: E402
+from app.db.models.driver_earning import DriverEarning, EarningStatus  # noqa: E402
+from app.db.models.payout_requests import PayoutRequest  # noqa: E402,F401  (table liée par FK)
+
+EARNINGS_PER_DRIVER = 50
+BATCH = 1000
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-size", type=int, default=int(os.getenv("BENCH_SIZE", 1000)),
+        help="nombre de gains chauffeur du jeu de données",
+    )
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Exécute une coroutine sur l'unique boucle du bench (le pool SQL y est attaché)."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.run_until_complete(dispose_engine())
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def call(run, dataset):
+    """call(service_fn, *args) : une session neuve par appel, comme get_db() dans une requête."""
+
+    def call(fn, *args, **kwargs):
+        async def go():
+            async with async_session() as db:
+                return await fn(db, *args, **kwargs)
+
+        return run(go())
+
+    return call
+
+
+async def reset_schema() -> None:
+    engine = get_engine()
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        return
+
+    from app.db.migrate import upgrade
+
+    await asyncio.to_thread(upgrade, "head")
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+
+
+async def insert(rows: list) -> None:
+    for start in range(0, len(rows), BATCH):
+        async with async_session() as db:
+            db.add_all(rows[start:start + BATCH])
+            await db.commit()
+
+
+def make_earning(driver_id: uuid.UUID, status: EarningStatus, trip_date: datetime) -> DriverEarning:
+    return DriverEarning(
+        id=uuid.uuid4(), driver_id=driver_id, booking_id=uuid.uuid4(), trip_id=uuid.uuid4(),
+        amount=Decimal("42.50"), currency="CAD", status=status, trip_date=trip_date,
+        created_at=datetime.utcnow(), passenger_name="Bench", route="montreal → quebec",
+    )
+
+
+@pytest.fixture(scope="session")
+def dataset(run, request) -> dict:
+    """Gains répartis sur 60 jours, EARNINGS_PER_DRIVER par chauffeur, tous statuts confondus."""
+    size = request.config.getoption("--bench-size")
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    statuses = [EarningStatus.PENDING_TRIP, EarningStatus.PAYABLE, EarningStatus.REQUESTED, EarningStatus.PAID]
+
+    drivers = [uuid.uuid4() for _ in range(max(1, size // EARNINGS_PER_DRIVER))]
+    rows = [
+        make_earning(drivers[i % len(drivers)], rng.choice(statuses), now - timedelta(days=rng.randint(0, 60)))
+        for i in range(size)
+    ]
+
+    async def seed():
+        await reset_schema()
+        await insert(rows)
+
+    run(seed())
+    return {"drivers": drivers}
+
+
+@pytest.fixture(scope="session")
+def insert_payable_earnings(run, dataset):
+    """Insère (hors mesure) `n` gains PAYABLE pour un chauffeur ; renvoie leurs ids."""
+
+    def insert_payable(driver_id: uuid.UUID, n: int) -> list[uuid.UUID]:
+        rows = [make_earning(driver_id, EarningStatus.PAYABLE, datetime.utcnow()) for _ in range(n)]
+        run(insert(rows))
+        return [e.id for e in rows]
+
+    return insert_payable
@@ -31,10 +31,13 @@ from app.db.base import Base
 from app.db.models.trip import Trip
 from app.db.models.stop import Stop
 from app.db.models.preference import Preference
+from app.db.models.trip_search import TripSearch
+from app.db.models.trip_segment import TripSegment
 
 load_dotenv()
 config = context.config
-config.set_main_option("sqlalchemy.url", os.getenv("DATABASE_URL"))
+# URL asynchrone du backend → pilote synchrone pour Alembic (comme mova-booking)
+config.set_main_option("sqlalchemy.url", os.getenv("DATABASE_URL").replace("asyncpg", "psycopg2"))
 fileConfig(config.config_file_name)
 
 # C'est ce que Alembic va utiliser pour détecter les tables
@@ -0,0 +1,85 @@
+"""table trip_search (modèle de lecture de la recherche)
+
+Revision ID: 7c1e4a9b2d30
+Revises: 324a6157b222
+Create Date: 2026-10-19 14:05:12.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4a9b2d30'
+down_revision: Union[str, None] = '324a6157b222'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Colonnes communes aux deux tronçons (mêmes bits que app.db.models.trip_search)
+_COMMON = """
+    t.driver_id,
+    lower(trim(t.departure_city)),
+    t.departure_date,
+    t.departure_date + t.departure_time,
+    t.available_seats,
+    (CASE WHEN p.baggage THEN 1 ELSE 0 END)
+      | (CASE WHEN p.pets_allowed THEN 2 ELSE 0 END)
+      | (CASE WHEN p.smoking_allowed THEN 4 ELSE 0 END)
+      | (CASE WHEN p.air_conditioning THEN 8 ELSE 0 END)
+      | (CASE WHEN p.bike_support THEN 16 ELSE 0 END)
+      | (CASE WHEN p.ski_support THEN 32 ELSE 0 END),
+    p.mode_payment,
+    (SELECT count(*) FROM stops c WHERE c.trip_id = t.id),
+    COALESCE(t.status, 'pending')
+"""
+
+_COLUMNS = """
+    id, trip_id, stop_id, destination_city, price,
+    driver_id, departure_city, departure_date, departure_at, available_seats,
+    preference_flags, mode_payment, stop_count, status
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'trip_search',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('trip_id', sa.UUID(), nullable=False),
+        sa.Column('stop_id', sa.UUID(), nullable=True),
+        sa.Column('driver_id', sa.UUID(), nullable=False),
+        sa.Column('departure_city', sa.String(), nullable=False),
+        sa.Column('destination_city', sa.String(), nullable=False),
+        sa.Column('departure_date', sa.Date(), nullable=False),
+        sa.Column('departure_at', sa.DateTime(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('available_seats', sa.Integer(), nullable=False),
+        sa.Column('preference_flags', sa.Integer(), nullable=False),
+        sa.Column('mode_payment', sa.String(), nullable=True),
+        sa.Column('stop_count', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_trip_search_lookup', 'trip_search', ['departure_date', 'departure_city', 'destination_city'], unique=False)
+    op.create_index(op.f('ix_trip_search_trip_id'), 'trip_search', ['trip_id'], unique=False)
+
+    # Remplissage à partir des trajets existants : destination finale puis arrêts
+    op.execute(f"""
+        INSERT INTO trip_search ({_COLUMNS})
+        SELECT t.id, t.id, NULL, lower(trim(t.destination_city)), t.total_price, {_COMMON}
+        FROM trips t LEFT JOIN preferences p ON p.trip_id = t.id
+    """)
+    op.execute(f"""
+        INSERT INTO trip_search ({_COLUMNS})
+        SELECT s.id, t.id, s.id, lower(trim(s.destination_city)), s.price, {_COMMON}
+        FROM stops s JOIN trips t ON t.id = s.trip_id LEFT JOIN preferences p ON p.trip_id = t.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_trip_search_trip_id'), table_name='trip_search')
+    op.drop_index('ix_trip_search_lookup', table_name='trip_search')
+    op.drop_table('trip_search')
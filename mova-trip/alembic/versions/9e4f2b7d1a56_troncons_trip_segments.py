@@ -0,0 +1,68 @@
+"""tronçons trip_segments et ordre des arrêts
+
+Revision ID: 9e4f2b7d1a56
+Revises: 7c1e4a9b2d30
+Create Date: 2026-10-19 16:42:37.205914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4f2b7d1a56'
+down_revision: Union[str, None] = '7c1e4a9b2d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('stops', sa.Column('stop_order', sa.Integer(), nullable=True))
+    # Trajets existants : l'ordre de passage n'était pas saisi, le prix du tronçon croît avec la distance
+    op.execute("""
+        UPDATE stops s SET stop_order = o.position
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY trip_id ORDER BY price, id) AS position
+            FROM stops
+        ) o
+        WHERE o.id = s.id
+    """)
+
+    op.create_table(
+        'trip_segments',
+        sa.Column('trip_id', sa.UUID(), nullable=False),
+        sa.Column('segment_index', sa.Integer(), nullable=False),
+        sa.Column('from_city', sa.String(), nullable=False),
+        sa.Column('to_city', sa.String(), nullable=False),
+        sa.Column('stop_id', sa.UUID(), nullable=True),
+        sa.Column('seats', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('trip_id', 'segment_index'),
+    )
+
+    # Tronçons se terminant à un arrêt, puis tronçon final vers la destination
+    op.execute("""
+        INSERT INTO trip_segments (trip_id, segment_index, from_city, to_city, stop_id, seats)
+        SELECT s.trip_id, s.stop_order - 1,
+               COALESCE(LAG(s.destination_city) OVER (PARTITION BY s.trip_id ORDER BY s.stop_order), t.departure_city),
+               s.destination_city, s.id, t.available_seats
+        FROM stops s JOIN trips t ON t.id = s.trip_id
+    """)
+    op.execute("""
+        INSERT INTO trip_segments (trip_id, segment_index, from_city, to_city, stop_id, seats)
+        SELECT t.id,
+               (SELECT count(*) FROM stops c WHERE c.trip_id = t.id),
+               COALESCE(
+                   (SELECT c.destination_city FROM stops c WHERE c.trip_id = t.id ORDER BY c.stop_order DESC LIMIT 1),
+                   t.departure_city
+               ),
+               t.destination_city, NULL, t.available_seats
+        FROM trips t
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('trip_segments')
+    op.drop_column('stops', 'stop_order')
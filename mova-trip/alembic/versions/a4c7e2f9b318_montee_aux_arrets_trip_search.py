@@ -0,0 +1,57 @@
+"""montée aux arrêts : trip_search.from_stop_id et tronçons arrêt → arrêt / destination
+
+Revision ID: a4c7e2f9b318
+Revises: e6b1f4a8c259
+Create Date: 2026-10-20 09:31:05.912448
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session, selectinload
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e2f9b318'
+down_revision: Union[str, None] = 'e6b1f4a8c259'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH = 500
+
+
+def upgrade() -> None:
+    op.add_column('trip_search', sa.Column('from_stop_id', sa.UUID(), nullable=True))
+
+    # Réécriture des lignes de chaque trajet (mêmes règles que le trip service :
+    # une ligne par paire de villes, places = minimum des tronçons parcourus)
+    from app.db.models.trip import Trip
+    from app.db.models.trip_search import TripSearch
+    from app.db.models.trip_segment import TripSegment
+    from app.services.trip_search_service import build_search_rows
+
+    session = Session(bind=op.get_bind())
+    trip_ids = session.scalars(sa.select(Trip.id).order_by(Trip.id)).all()
+    for start in range(0, len(trip_ids), BATCH):
+        batch = trip_ids[start:start + BATCH]
+        trips = session.scalars(
+            sa.select(Trip).options(selectinload(Trip.preferences), selectinload(Trip.stops)).where(Trip.id.in_(batch))
+        ).all()
+        segments = {}
+        for segment in session.scalars(
+            sa.select(TripSegment).where(TripSegment.trip_id.in_(batch)).order_by(TripSegment.segment_index)
+        ):
+            segments.setdefault(segment.trip_id, []).append(segment)
+
+        session.execute(sa.delete(TripSearch).where(TripSearch.trip_id.in_(batch)))
+        for trip in trips:
+            session.add_all(build_search_rows(trip, trip.preferences, trip.stops, segments.get(trip.id)))
+        session.flush()
+        session.expunge_all()
+    session.commit()
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM trip_search WHERE from_stop_id IS NOT NULL")
+    op.drop_column('trip_search', 'from_stop_id')
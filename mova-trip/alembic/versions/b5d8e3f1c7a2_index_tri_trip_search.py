@@ -0,0 +1,44 @@
+"""index couvrants de tri sur trip_search
+
+Revision ID: b5d8e3f1c7a2
+Revises: 9e4f2b7d1a56
+Create Date: 2026-10-19 18:20:44.561208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d8e3f1c7a2'
+down_revision: Union[str, None] = '9e4f2b7d1a56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_LOOKUP = ['departure_date', 'departure_city', 'destination_city', 'status']
+_COVERED = ['stop_id', 'price', 'available_seats', 'preference_flags', 'stop_count', 'mode_payment']
+
+
+def upgrade() -> None:
+    # Un index par mode de tri : égalités, clé de tri, colonnes des filtres en INCLUDE
+    for name, sort_keys in (
+        ('ix_trip_search_earliest', ['departure_at', 'trip_id']),
+        ('ix_trip_search_cheapest', ['price', 'departure_at', 'trip_id']),
+        ('ix_trip_search_fewest_stops', ['stop_count', 'departure_at', 'trip_id']),
+    ):
+        op.create_index(
+            name, 'trip_search', _LOOKUP + sort_keys, unique=False,
+            postgresql_include=[c for c in _COVERED if c not in sort_keys],
+        )
+    # Préfixe de ix_trip_search_earliest : devenu redondant
+    op.drop_index('ix_trip_search_lookup', table_name='trip_search')
+
+
+def downgrade() -> None:
+    op.create_index('ix_trip_search_lookup', 'trip_search', ['departure_date', 'departure_city', 'destination_city'], unique=False)
+    op.drop_index('ix_trip_search_fewest_stops', table_name='trip_search')
+    op.drop_index('ix_trip_search_cheapest', table_name='trip_search')
+    op.drop_index('ix_trip_search_earliest', table_name='trip_search')
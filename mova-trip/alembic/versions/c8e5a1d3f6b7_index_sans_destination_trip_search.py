@@ -0,0 +1,43 @@
+"""index de tri des recherches sans destination sur trip_search
+
+Revision ID: c8e5a1d3f6b7
+Revises: a4c7e2f9b318
+Create Date: 2026-10-19 20:31:08.417263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e5a1d3f6b7'
+down_revision: Union[str, None] = 'a4c7e2f9b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_LOOKUP = ['departure_date', 'departure_city', 'status']
+_COVERED = ['stop_id', 'price', 'available_seats', 'preference_flags', 'stop_count', 'mode_payment']
+_INDEXES = (
+    ('ix_trip_search_any_earliest', ['departure_at', 'trip_id']),
+    ('ix_trip_search_any_cheapest', ['price', 'departure_at', 'trip_id']),
+    ('ix_trip_search_any_fewest_stops', ['stop_count', 'departure_at', 'trip_id']),
+)
+
+
+def upgrade() -> None:
+    # Sans destination, destination_city (au milieu des index de tri) n'est pas une égalité :
+    # index partiels sur les lignes destination finale, clé de tri après la ville de départ
+    for name, sort_keys in _INDEXES:
+        op.create_index(
+            name, 'trip_search', _LOOKUP + sort_keys, unique=False,
+            postgresql_include=[c for c in _COVERED if c not in sort_keys],
+            postgresql_where=sa.text('stop_id IS NULL'),
+        )
+
+
+def downgrade() -> None:
+    for name, _ in reversed(_INDEXES):
+        op.drop_index(name, table_name='trip_search')
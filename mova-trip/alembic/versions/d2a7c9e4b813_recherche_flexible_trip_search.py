@@ -0,0 +1,36 @@
+"""recherche flexible : heure de départ et index (ville, date, heure) sur trip_search
+
+Revision ID: d2a7c9e4b813
+Revises: b5d8e3f1c7a2
+Create Date: 2026-10-19 19:02:13.840577
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7c9e4b813'
+down_revision: Union[str, None] = 'b5d8e3f1c7a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('trip_search', sa.Column('departure_time', sa.Time(), nullable=True))
+    op.execute("UPDATE trip_search SET departure_time = departure_at::time")
+    op.alter_column('trip_search', 'departure_time', nullable=False)
+    op.create_index(
+        'ix_trip_search_window', 'trip_search', ['departure_city', 'departure_date', 'departure_time'], unique=False,
+        postgresql_include=[
+            'destination_city', 'status', 'departure_at', 'trip_id',
+            'stop_id', 'price', 'available_seats', 'preference_flags', 'stop_count', 'mode_payment',
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trip_search_window', table_name='trip_search')
+    op.drop_column('trip_search', 'departure_time')
@@ -0,0 +1,50 @@
+"""proximité : coordonnées des trajets et arrêts, geohash sur trip_search
+
+Revision ID: e6b1f4a8c259
+Revises: d2a7c9e4b813
+Create Date: 2026-10-19 19:41:27.306114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b1f4a8c259'
+down_revision: Union[str, None] = 'd2a7c9e4b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GEO_COLUMNS = ['trip_id', 'stop_id', 'departure_lat', 'departure_lon', 'destination_lat', 'destination_lon', 'available_seats']
+
+
+def upgrade() -> None:
+    # Colonnes optionnelles : les trajets existants restent sans coordonnées (NULL)
+    for column in ('departure_lat', 'departure_lon', 'destination_lat', 'destination_lon'):
+        op.add_column('trips', sa.Column(column, sa.Float(), nullable=True))
+    for column in ('destination_lat', 'destination_lon'):
+        op.add_column('stops', sa.Column(column, sa.Float(), nullable=True))
+
+    for prefix in ('departure', 'destination'):
+        op.add_column('trip_search', sa.Column(f'{prefix}_lat', sa.Float(), nullable=True))
+        op.add_column('trip_search', sa.Column(f'{prefix}_lon', sa.Float(), nullable=True))
+        op.add_column('trip_search', sa.Column(f'{prefix}_geohash', sa.String(12, collation='C'), nullable=True))
+    # Index après les colonnes : chacun couvre les coordonnées des deux extrémités
+    for prefix in ('departure', 'destination'):
+        op.create_index(
+            f'ix_trip_search_{prefix}_geo', 'trip_search', ['departure_date', 'status', f'{prefix}_geohash'],
+            unique=False, postgresql_include=GEO_COLUMNS,
+        )
+
+
+def downgrade() -> None:
+    for prefix in ('departure', 'destination'):
+        op.drop_index(f'ix_trip_search_{prefix}_geo', table_name='trip_search')
+        for suffix in ('geohash', 'lon', 'lat'):
+            op.drop_column('trip_search', f'{prefix}_{suffix}')
+    for column in ('destination_lon', 'destination_lat'):
+        op.drop_column('stops', column)
+    for column in ('destination_lon', 'destination_lat', 'departure_lon', 'departure_lat'):
+        op.drop_column('trips', column)
@@ -28,35 +28,44 @@ RABBITMQ_URL = os.getenv("RABBITMQ_URL")
 router = APIRouter()
 app = FastAPI()
 
-# Configurer le logger
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_, func
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
-from datetime import date
+from datetime import date, time
+import asyncio
+import json
 import logging
 import os
 from dotenv import load_dotenv
 
-from app.db.database import get_db
+from app.core.config import settings
+from app.core.etag import etag_matches, not_modified, set_etag
+from app.core.trip_events import trip_events
+from app.db.database import async_session, get_db
 from app.db.models.trip import Trip
 from app.db.models.stop import Stop
 from app.db.schemas.trip import (
     TripCreate, TripResponse, StatusTripUpdate,
-    TripReserveSeat, TripCancelSeat
+    TripReserveSeat, TripCancelSeat, TripSeatsAvailability,
+    TripRecurringCreate, TripRecurringResponse, TripFlexibleSearchResponse, TripNearbyResponse,
 )
+from app.services.trip_serializer import json_response, raw_json, trip_json, trips_json
 from app.services.trip_service import (
     create_trip_service, get_trip_by_id_service, get_all_trips_service,
     get_trip_by_status_service, get_trip_by_driver_id_service,
     get_trips_with_stop_service, update_trip_status_service,
     get_upcoming_trips_by_driver_service, get_trips_by_stop_city_service,
     get_today_trips_service, get_driver_trip_history_service,
-    reserve_seat_service, cancel_seat_reservation_service
+    reserve_seat_service, cancel_seat_reservation_service,
+    cached_search_trips_service, get_available_seats_between_service,
+    get_trip_etag_service, trip_etag, get_trip_snapshots_service,
+    create_recurring_trips_service, search_trips_by_day_service, search_trips_nearby_service,
 )
 
 # ------------------------------------------------------------
@@ -66,8 +75,6 @@ router = APIRouter()
 load_dotenv()
 RABBITMQ_URL = os.getenv("RABBITMQ_URL")
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger("trip_router")
 
 # ------------------------------------------------------------
 # ROUTES DE BASE
@@ -77,25 +84,42 @@ logger = logging.getLogger("trip_router")
 async def create_trip_endpoint(trip_data: TripCreate, db: AsyncSession = Depends(get_db)):
     trip = await create_trip_service(db, trip_data)
     logger.info(f"Voyage créé avec succès : {trip.id}")
-    return trip
+    return trip_json(trip)
+
+
+@router.post("/create_recurring_trips", response_model=TripRecurringResponse)
+async def create_recurring_trips_endpoint(data: TripRecurringCreate, db: AsyncSession = Depends(get_db)):
+    """Trajets domicile-travail : toutes les occurrences d'un calendrier en une requête"""
+    result = await create_recurring_trips_service(db, data)
+    logger.info(f"Série de {result.count} voyage(s) créée")
+    return result
 
 
 @router.get("/get_trip_by_id/{trip_id}", response_model=TripResponse)
-async def get_trip_by_id_endpoint(trip_id: UUID, db: AsyncSession = Depends(get_db)):
+async def get_trip_by_id_endpoint(trip_id: UUID, request: Request, db: AsyncSession = Depends(get_db)):
+    """Détail d'un trajet ; avec If-None-Match, 304 sans chargement ni sérialisation si inchangé."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await get_trip_etag_service(db, trip_id)
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
     trip = await get_trip_by_id_service(db, trip_id)
-    return trip
+    response = trip_json(trip)
+    set_etag(response, trip_etag(trip.id, trip.updated_at, trip.available_seats, trip.status))
+    return response
 
 
 @router.get("/get_all_trips", response_model=List[TripResponse])
 async def get_all_trips_endpoint(db: AsyncSession = Depends(get_db)):
     trips = await get_all_trips_service(db)
-    return trips
+    return trips_json(trips)
 
 
 @router.get("/get_trip_by_status/{status}", response_model=List[TripResponse])
 async def get_trip_by_status_endpoint(status: str, db: AsyncSession = Depends(get_db)):
     trips = await get_trip_by_status_service(db, status)
-    return trips
+    return trips_json(trips)
 
 
 # ------------------------------------------------------------
@@ -116,71 +140,124 @@ async def search_trips_endpoint(
     bike_space: Optional[bool] = None,
     ski_space: Optional[bool] = None,
     payment_method: Optional[str] = None,
+    sort: Literal["earliest", "cheapest", "fewest_stops", "best_match"] = "earliest",
+    preferred: Optional[List[str]] = Query(None),
     skip: int = 0,
     limit: int = 100,
     db: AsyncSession = Depends(get_db)
 ):
-    """Recherche de trajets avec filtres"""
-    try:
-        from sqlalchemy.orm import joinedload
-
-        # ✅ Charger relations proprement
-        query = (
-            select(Trip)
-            .options(joinedload(Trip.preferences), joinedload(Trip.stops))
-            .filter(Trip.status == status, Trip.departure_date == departure_date)
-        )
-
-        if departure_city:
-            query = query.filter(Trip.departure_city.ilike(f"%{departure_city}%"))
-
-        if destination_city:
-            # ✅ Corrigé : utiliser "Trip.stops.any(Stop.destination_city.ilike(...))" sans annotation
-            query = query.filter(
-                or_(
-                    Trip.destination_city.ilike(f"%{destination_city}%"),
-                    Trip.id.in_(
-                        select(Stop.trip_id).where(Stop.destination_city.ilike(f"%{destination_city}%"))
-                    )
-                )
-            )
-
-        result = await db.execute(query.offset(skip).limit(limit))
-        trips = result.scalars().unique().all()
-
-        # Filtres mémoire
-        filtered = []
-        for trip in trips:
-            if passenger_count and trip.available_seats < passenger_count:
-                continue
-            if price_limit and trip.total_price > price_limit:
-                continue
-            if max_two_stops and len(trip.stops or []) > 2:
-                continue
-
-            prefs = trip.preferences
-            if prefs:
-                if smoking_allowed is not None and prefs.smoking_allowed != smoking_allowed:
-                    continue
-                if pets_allowed is not None and prefs.pets_allowed != pets_allowed:
-                    continue
-                if ac_available is not None and prefs.air_conditioning != ac_available:
-                    continue
-                if bike_space is not None and prefs.bike_support != bike_space:
-                    continue
-                if ski_space is not None and prefs.ski_support != ski_space:
-                    continue
-                if payment_method and prefs.mode_payment != payment_method:
-                    continue
-
-            filtered.append(trip)
-
-        logger.info(f"✅ {len(filtered)} trajets trouvés.")
-        return filtered
-
-    except Exception as e:
-        logger.error(f"Erreur recherche trajets : {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    """
+    Recherche de trajets avec filtres, classée côté serveur (modèle de lecture trip_search,
+    réponses en cache). `preferred` (baggage, pets_allowed, …) sert au tri best_match.
+    """
+    payload = await cached_search_trips_service(
+        db,
+        departure_city=departure_city,
+        destination_city=destination_city,
+        departure_date=departure_date,
+        status=status,
+        skip=skip,
+        limit=limit,
+        passenger_count=passenger_count,
+        price_limit=price_limit,
+        max_two_stops=bool(max_two_stops),
+        smoking_allowed=smoking_allowed,
+        pets_allowed=pets_allowed,
+        ac_available=ac_available,
+        bike_space=bike_space,
+        ski_space=ski_space,
+        payment_method=payment_method,
+        sort=sort,
+        preferred=sorted(set(preferred)) if preferred else None,
+    )
+    # JSON déjà encodé (éventuellement servi par le cache)
+    return raw_json(payload)
+
+
+@router.get("/search_trips_flexible", response_model=TripFlexibleSearchResponse)
+async def search_trips_flexible_endpoint(
+    departure_city: str,
+    date_from: date,
+    date_to: date,
+    time_from: Optional[time] = None,
+    time_to: Optional[time] = None,
+    destination_city: Optional[str] = None,
+    status: str = "pending",
+    per_day: int = Query(20, ge=1, le=100),
+    passenger_count: Optional[int] = Query(None, ge=1, le=5),
+    price_limit: Optional[float] = Query(None, ge=0),
+    max_two_stops: Optional[bool] = False,
+    smoking_allowed: Optional[bool] = None,
+    pets_allowed: Optional[bool] = None,
+    ac_available: Optional[bool] = None,
+    bike_space: Optional[bool] = None,
+    ski_space: Optional[bool] = None,
+    payment_method: Optional[str] = None,
+    sort: Literal["earliest", "cheapest", "fewest_stops", "best_match"] = "earliest",
+    preferred: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Recherche sur une plage de dates (± jours, week-end) et un créneau horaire
+    (time_from > time_to : passe minuit), groupée par jour avec le nombre de trajets.
+    """
+    result = await search_trips_by_day_service(
+        db,
+        departure_city=departure_city,
+        date_from=date_from,
+        date_to=date_to,
+        time_from=time_from,
+        time_to=time_to,
+        destination_city=destination_city,
+        status=status,
+        per_day=per_day,
+        passenger_count=passenger_count,
+        price_limit=price_limit,
+        max_two_stops=bool(max_two_stops),
+        smoking_allowed=smoking_allowed,
+        pets_allowed=pets_allowed,
+        ac_available=ac_available,
+        bike_space=bike_space,
+        ski_space=ski_space,
+        payment_method=payment_method,
+        sort=sort,
+        preferred=preferred,
+    )
+    return json_response(result)
+
+
+@router.get("/search_trips_nearby", response_model=List[TripNearbyResponse])
+async def search_trips_nearby_endpoint(
+    departure_date: date,
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    destination_lat: Optional[float] = Query(None, ge=-90, le=90),
+    destination_lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(15.0, gt=0),
+    nearest: Optional[int] = Query(None, ge=1, le=100),
+    status: str = "pending",
+    passenger_count: Optional[int] = Query(None, ge=1, le=5),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Trajets dont le départ (lat/lon) et/ou l'arrivée (destination_lat/destination_lon)
+    sont à moins de `radius_km`, du plus proche au plus éloigné ; `nearest` : les N plus proches.
+    """
+    trips = await search_trips_nearby_service(
+        db,
+        departure_date=departure_date,
+        lat=lat,
+        lon=lon,
+        destination_lat=destination_lat,
+        destination_lon=destination_lon,
+        radius_km=radius_km,
+        nearest=nearest,
+        status=status,
+        passenger_count=passenger_count,
+        limit=limit,
+    )
+    return json_response(trips)
 
 # ------------------------------------------------------------
 # RÉSERVATION / ANNULATION
@@ -199,46 +276,158 @@ async def cancel_reservation_endpoint(data: TripCancelSeat, db: AsyncSession = D
     return {"message": "Annulation réussie", "trip": trip}
 
 
+@router.get("/trip/{trip_id}/available_seats", response_model=TripSeatsAvailability)
+async def get_available_seats_between_endpoint(
+    trip_id: UUID,
+    from_city: Optional[str] = None,
+    to_city: Optional[str] = None,
+    to_stop_id: Optional[UUID] = None,
+    from_stop_id: Optional[UUID] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Places vendables entre deux points de l'itinéraire (inventaire par tronçon)"""
+    return await get_available_seats_between_service(db, trip_id, from_city, to_city, to_stop_id, from_stop_id)
+
+
 # ------------------------------------------------------------
 # AUTRES ROUTES MÉTIERS
 # ------------------------------------------------------------
 @router.get("/get_trip_by_driver_id/{driver_id}", response_model=List[TripResponse])
 async def get_trip_by_driver_id_endpoint(driver_id: UUID, db: AsyncSession = Depends(get_db)):
     trips = await get_trip_by_driver_id_service(db, driver_id)
-    return trips
+    return trips_json(trips)
 
 
 @router.get("/trips/with_stops/{city}", response_model=List[TripResponse])
 async def get_trips_with_stop_endpoint(city: str, db: AsyncSession = Depends(get_db)):
     trips = await get_trips_with_stop_service(db, city)
-    return trips
+    return trips_json(trips)
 
 
 @router.put("/trip/{trip_id}/status", response_model=TripResponse)
 async def update_trip_status_endpoint(trip_id: UUID, data: StatusTripUpdate, db: AsyncSession = Depends(get_db)):
     trip = await update_trip_status_service(db, trip_id, data.new_status)
-    return trip
+    return trip_json(trip)
 
 
 @router.get("/trips/upcoming/driver/{driver_id}", response_model=List[TripResponse])
 async def get_upcoming_trips_by_driver_endpoint(driver_id: UUID, db: AsyncSession = Depends(get_db)):
     trips = await get_upcoming_trips_by_driver_service(db, driver_id)
-    return trips
+    return trips_json(trips)
 
 
 @router.get("/trips/passenger-access/{stop_city}", response_model=List[TripResponse])
 async def get_trips_by_stop_city_endpoint(stop_city: str, db: AsyncSession = Depends(get_db)):
     trips = await get_trips_by_stop_city_service(db, stop_city)
-    return trips
+    return trips_json(trips)
 
 
 @router.get("/trips/today", response_model=List[TripResponse])
 async def get_today_trips_endpoint(db: AsyncSession = Depends(get_db)):
     trips = await get_today_trips_service(db)
-    return trips
+    return trips_json(trips)
 
 
 @router.get("/trips/history/driver/{driver_id}", response_model=List[TripResponse])
 async def get_driver_trip_history_endpoint(driver_id: UUID, db: AsyncSession = Depends(get_db)):
     trips = await get_driver_trip_history_service(db, driver_id)
-    return trips
+    return trips_json(trips)
+
+
+# ------------------------------------------------------------
+# TEMPS RÉEL : PLACES ET STATUT (WebSocket / SSE)
+# ------------------------------------------------------------
+def _parse_trip_ids(values) -> List[UUID]:
+    return [UUID(str(value)) for value in values or []]
+
+
+async def _subscribe(subscription, trip_ids: List[UUID]) -> None:
+    """Abonne puis pousse l'état courant : le client n'a plus besoin d'un premier GET."""
+    if len(subscription.trip_ids | {str(t) for t in trip_ids}) > settings.TRIP_EVENTS_MAX_SUBSCRIPTIONS:
+        raise ValueError(f"Au plus {settings.TRIP_EVENTS_MAX_SUBSCRIPTIONS} trajets suivis par connexion")
+    subscription.subscribe(str(t) for t in trip_ids)
+    async with async_session() as db:
+        for snapshot in await get_trip_snapshots_service(db, trip_ids):
+            subscription.push(snapshot)
+
+
+@router.websocket("/ws/trips")
+async def trip_updates_websocket(websocket: WebSocket):
+    """
+    Messages client : {"action": "subscribe" | "unsubscribe", "trip_ids": [...]}.
+    Messages serveur : {"type": "trip.update", "trip_id", "available_seats", "status", "updated_at"}
+    à chaque changement commité (et à l'abonnement), ou {"type": "error", "detail"}.
+    """
+    await websocket.accept()
+    subscription = trip_events.open()
+
+    async def receive():
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            # Un message mal formé (JSON invalide, binaire, pas un objet) reçoit une erreur,
+            # la connexion et ses abonnements restent ouverts
+            try:
+                message = json.loads(frame.get("text") or frame.get("bytes") or "")
+                if not isinstance(message, dict):
+                    raise ValueError("Message attendu : objet JSON {action, trip_ids}")
+                trip_ids = _parse_trip_ids(message.get("trip_ids"))
+                if message.get("action") == "unsubscribe":
+                    subscription.unsubscribe(str(t) for t in trip_ids)
+                else:
+                    await _subscribe(subscription, trip_ids)
+            except (ValueError, TypeError, AttributeError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+
+    async def send():
+        while (event := await subscription.next()) is not None:
+            await websocket.send_json(event)
+
+    tasks = [asyncio.create_task(receive()), asyncio.create_task(send())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+                logger.warning(f"[TripEvents] ⚠️ WebSocket fermé sur erreur : {task.exception()}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
+    if websocket.client_state.name == "CONNECTED":
+        await websocket.close()
+
+
+@router.get("/trips/events")
+async def trip_updates_sse(trip_ids: List[UUID] = Query(...)):
+    """
+    Flux SSE (text/event-stream) des trajets `trip_ids` : état courant puis un
+    événement `trip` par changement commité ; commentaire « ping » toutes les
+    TRIP_EVENTS_HEARTBEAT secondes pour garder la connexion ouverte.
+    """
+    subscription = trip_events.open()
+    try:
+        await _subscribe(subscription, trip_ids)
+    except ValueError as e:
+        subscription.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def stream():
+        try:
+            while True:
+                try:
+                    event = await subscription.next(timeout=settings.TRIP_EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if event is None:
+                    return
+                yield f"event: trip\ndata: {json.dumps(event)}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,8 +1,13 @@
 import asyncio
 import json
 import logging
+import signal
 import aio_pika
-from app.db.database import async_session 
+from app.core.amqp import QueueConsumer, amqp_client
+from app.core.config import settings
+from app.core.logging_config import setup_logging
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.db.database import async_session, dispose_engine, warm_engine 
 from app.services.trip_service import update_available_seats
 import os
 from dotenv import load_dotenv
@@ -11,11 +16,8 @@ load_dotenv()
 RABBITMQ_URL = os.getenv("RABBITMQ_URL")
 QUEUE_NAME = os.getenv("TRIP_QUEUE_NAME", "trip_update_queue")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("trip_consumer.log"), logging.StreamHandler()]
-)
+logger = logging.getLogger(__name__)
+
 
 async def process_message(message: aio_pika.IncomingMessage):
     """
@@ -27,30 +29,57 @@ async def process_message(message: aio_pika.IncomingMessage):
             action = data.get("action")
             trip_id = data.get("trip_id")
             number_of_seats = int(data.get("number_of_seats", 0))
+            # tronçons de l'arrêt de montée (None = départ) à l'arrêt de descente (None = destination)
+            stop_id = data.get("stop_id")
+            from_stop_id = data.get("from_stop_id")
 
             if not trip_id or number_of_seats <= 0:
-                logging.warning(f"Message invalide : {data}")
+                logger.warning(f"Message invalide : {data}")
                 return
 
-            logging.info(f"📩 Message reçu : {data}")
+            logger.info(f"📩 Message reçu : {data}")
 
             async with async_session() as db:
                 if action == "decrease_available_seats":
-                    await update_available_seats(db, trip_id, -number_of_seats)
+                    await update_available_seats(db, trip_id, -number_of_seats, stop_id=stop_id, from_stop_id=from_stop_id)
                 elif action == "increase_available_seats":
-                    await update_available_seats(db, trip_id, number_of_seats)
+                    await update_available_seats(db, trip_id, number_of_seats, stop_id=stop_id, from_stop_id=from_stop_id)
                 else:
-                    logging.warning(f"Action inconnue : {action}")
+                    logger.warning(f"Action inconnue : {action}")
 
         except Exception as e:
-            logging.error(f"❌ Erreur lors du traitement du message : {e}")
+            logger.error(f"❌ Erreur lors du traitement du message : {e}")
+
+async def start_rabbitmq_consumer() -> QueueConsumer:
+    """🎧 Écoute la file RabbitMQ sur la connexion partagée (arrêtée par `amqp_client.close()`)"""
+    consumer = await amqp_client.consume(
+        QUEUE_NAME, process_message, prefetch_count=settings.CONSUMER_CONCURRENCY
+    )
+    logger.info(f"🟢 [Trip Service] En écoute sur RabbitMQ ({QUEUE_NAME})...")
+    return consumer
+
+
+async def run_consumer_worker() -> None:
+    """
+    🏭 Worker dédié : consomme la file sans servir de HTTP, jusqu'à SIGTERM/SIGINT.
+    Lancement : `python -m app.consumers.rabbitmq_consumer` (avec RUN_CONSUMERS_IN_API=false côté API).
+    """
+    setup_logging()
+    setup_tracing()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    await warm_engine(min(settings.DB_POOL_WARM_SIZE, settings.CONSUMER_CONCURRENCY))
+    await start_rabbitmq_consumer()
+    try:
+        await stop.wait()
+    finally:
+        await amqp_client.close(timeout=settings.SHUTDOWN_TIMEOUT)
+        await dispose_engine()
+        shutdown_tracing()
 
-async def start_rabbitmq_consumer():
-    """🎧 Écoute en continu la file RabbitMQ"""
-    connection = await aio_pika.connect_robust(RABBITMQ_URL)
-    channel = await connection.channel()
-    queue = await channel.declare_queue(QUEUE_NAME, durable=True)
 
-    logging.info(f"🟢 [Trip Service] En écoute sur RabbitMQ ({QUEUE_NAME})...")
-    await queue.consume(process_message)
-    await asyncio.Future()  # garde la boucle active
+if __name__ == "__main__":
+    asyncio.run(run_consumer_worker())
@@ -2,15 +2,65 @@ from pydantic_settings import BaseSettings
 
 from dotenv import load_dotenv
 import os
+from typing import Optional
 
 load_dotenv()
 
 class Settings(BaseSettings):
+    SERVICE_NAME: str = "mova-trip"  # traces et logs (modules communs de app/core)
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     SECRET_KEY: str = "supersecretkey"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    
+    RABBITMQ_URL: Optional[str] = None  # optionnel : sans broker, publications ignorées
+    RABBITMQ_CHANNEL_POOL_SIZE: int = 4
+
+    # Consumers : messages traités en parallèle (prefetch) et exécution dans le
+    # process HTTP ou dans un worker dédié (`python -m app.consumers.<module>`)
+    CONSUMER_CONCURRENCY: int = 10
+    RUN_CONSUMERS_IN_API: bool = True
+
+    # Démarrage : vérifie la révision Alembic (les migrations sont appliquées
+    # une fois par déploiement avec `python -m app.db.migrate`)
+    SCHEMA_CHECK_ON_STARTUP: bool = True
+
+    # Cycle de vie (lifespan) : préchauffage au démarrage, drain à l'arrêt
+    DB_POOL_WARM_SIZE: int = 5
+    SHUTDOWN_TIMEOUT: float = 10.0
+
+    # Instrumentation SQL (app/core/sql_instrumentation.py) : en-têtes X-DB-* en dev
+    SQL_INSTRUMENTATION: bool = False
+    SQL_STATS_HEADERS: bool = False
+    SQL_SLOW_QUERY_MS: float = 100.0
+    SQL_QUERY_BUDGET: int = 10
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 5
+
+    # Traces distribuées OpenTelemetry (app/core/tracing.py) : otlp ou file
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "otlp"
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACE_FILE: str = "trip_traces.jsonl"
+
+    # Logs JSON non bloquants (app/core/logging_config.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_FILE: str = ""
+    # Loggers bavards (clients réseau) échantillonnables ; 1.0 = tous les logs conservés
+    LOG_SAMPLED_LOGGERS: str = "aiormq,aio_pika"
+    LOG_SAMPLE_RATE: float = 1.0
+
+    # Cache des recherches (app/core/search_cache.py) : memory, redis ou off
+    SEARCH_CACHE_BACKEND: str = "memory"
+    SEARCH_CACHE_TTL: float = 30.0
+    SEARCH_CACHE_MAX_ENTRIES: int = 2048
+    SEARCH_CACHE_EXCHANGE: str = "trip_search_cache"  # invalidations du backend memory entre processus
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Places/statut en temps réel (app/core/trip_events.py) : WebSocket /tp/ws/trips, SSE /tp/trips/events
+    TRIP_EVENTS_EXCHANGE: str = "trip_events"
+    TRIP_EVENTS_QUEUE_SIZE: int = 100
+    TRIP_EVENTS_MAX_SUBSCRIPTIONS: int = 50
+    TRIP_EVENTS_HEARTBEAT: float = 15.0
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,38 @@
+"""
+ETag forts et GET conditionnels (If-None-Match → 304).
+
+L'ETag est dérivé des colonnes de version d'une ligne (updated_at, statut, places…),
+jamais de la réponse sérialisée : la route lit ces quelques colonnes, compare avec
+If-None-Match et ne charge/sérialise l'objet complet que s'il a changé.
+"""
+import hashlib
+from typing import Optional
+
+from starlette.responses import Response
+
+# Le client garde la réponse mais doit la revalider à chaque fois
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b("|".join(str(p) for p in parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible d'If-None-Match (RFC 9110) : liste d'ETags, W/ ignoré, « * »."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (c.strip() for c in if_none_match.split(","))
+    return etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
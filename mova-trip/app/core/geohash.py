@@ -0,0 +1,96 @@
+"""
+Geohash (sans PostGIS) pour la recherche de proximité.
+
+Un point (lat, lon) devient une chaîne base32 dont chaque caractère divise la
+cellule précédente en 32 : deux points proches partagent un préfixe. Rangées dans
+un index B-tree (collation « C »), les cellules d'un préfixe sont un intervalle
+contigu : une recherche dans un rayon = quelques parcours d'intervalle
+(`geohash >= préfixe AND geohash < next_prefix(préfixe)`) sur les cellules couvrant
+le cercle, puis la distance exacte (haversine) sur ce seul jeu candidat.
+"""
+import math
+from typing import Set, Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9          # ≈ 5 m × 5 m : précision stockée
+MAX_COVER_CELLS = 16           # cellules au plus par recherche (parcours d'intervalle)
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+
+
+def encode(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        middle = (rng[0] + rng[1]) / 2
+        if coord >= middle:
+            value = (value << 1) | 1
+            rng[0] = middle
+        else:
+            value <<= 1
+            rng[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(hauteur, largeur) d'une cellule en degrés."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _steps(start: float, end: float, step: float) -> list:
+    """Points de start à end tous les `step` (end compris) : touchent chaque cellule traversée."""
+    points, value = [], start
+    while value < end:
+        points.append(value)
+        value += step
+    points.append(end)
+    return points
+
+
+def next_prefix(cell: str) -> str:
+    """
+    Borne haute exclusive des geohash commençant par `cell` (ordre binaire, collation « C ») :
+    dernier caractère + 1. Des bornes plutôt qu'un LIKE : un plan générique (paramètres liés)
+    en fait un parcours d'intervalle de l'index.
+    """
+    return cell[:-1] + chr(ord(cell[-1]) + 1)
+
+
+def covering_cells(lat: float, lon: float, radius_km: float) -> Set[str]:
+    """
+    Préfixes couvrant le cercle (rayon_km autour du point) : la précision la plus fine
+    pour laquelle le rectangle englobant tient dans MAX_COVER_CELLS cellules.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    south, north = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    west, east = lon - dlon, lon + dlon
+
+    precision = GEOHASH_PRECISION
+    while precision > 1:
+        height, width = cell_size(precision)
+        if (math.ceil((north - south) / height) + 1) * (math.ceil((east - west) / width) + 1) <= MAX_COVER_CELLS:
+            break
+        precision -= 1
+
+    height, width = cell_size(precision)
+    return {
+        encode(la, (lo + 180.0) % 360.0 - 180.0, precision)
+        for la in _steps(south, north, height)
+        for lo in _steps(west, east, width)
+    }
@@ -0,0 +1,58 @@
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.consumers.rabbitmq_consumer import start_rabbitmq_consumer
+from app.core.amqp import amqp_client
+from app.core.config import settings
+from app.core.search_cache import search_cache
+from app.core.trip_events import trip_events
+from app.core.tracing import shutdown_tracing
+from app.db.database import dispose_engine, get_engine, warm_engine
+from app.db.migrate import ensure_schema_is_current
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Prêt uniquement entre la fin du préchauffage et le début de l'arrêt."""
+
+    def __init__(self):
+        self.ready = False
+
+
+readiness = Readiness()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 🚀 Démarrage : schéma, pool SQL, connexion RabbitMQ, consumer
+    if settings.SCHEMA_CHECK_ON_STARTUP:
+        await ensure_schema_is_current(get_engine())
+    await warm_engine(settings.DB_POOL_WARM_SIZE)
+
+    if settings.RABBITMQ_URL:
+        await amqp_client.connect()
+        if settings.RUN_CONSUMERS_IN_API:
+            await start_rabbitmq_consumer()
+        # Événements places/statut de tous les processus → clients WebSocket/SSE de celui-ci
+        await trip_events.start()
+        # Invalidations du cache de recherche faites par les autres processus (API ou consumer)
+        await search_cache.start()
+    else:
+        logger.warning("RABBITMQ_URL non défini : consumer et publications désactivés")
+
+    readiness.ready = True
+    logger.info("✅ Trip service prêt")
+    try:
+        yield
+    finally:
+        # 🛑 Arrêt : plus de nouveau trafic, drain des messages en cours, fermeture des pools
+        readiness.ready = False
+        trip_events.close()
+        await amqp_client.close(timeout=settings.SHUTDOWN_TIMEOUT)
+        await dispose_engine()
+        await search_cache.close()
+        shutdown_tracing()
+        logger.info("🔴 Trip service arrêté")
@@ -0,0 +1,163 @@
+"""
+Métriques Prometheus du service, exposées sur GET /metrics.
+
+- HTTP : durée des requêtes par méthode, route (gabarit FastAPI) et statut ;
+- pool SQL : attente d'une connexion (histogramme) et connexions utilisées/libres ;
+- requêtes SQL par requête HTTP, temps en base, requêtes lentes (app.core.sql_instrumentation) ;
+- RabbitMQ : durée des publications, retard des messages consommés (lag)
+  et durée de traitement.
+
+Les métriques propres à un service sont déclarées dans leur module
+(ex. app.core.search_cache du trip service) et exposées par la même route.
+
+Les valeurs sont par processus : avec plusieurs workers uvicorn, Prometheus
+agrège les cibles (ou utiliser le mode multiprocess de prometheus_client).
+
+Module commun aux services : original dans shared/core/metrics.py, recopié dans
+chaque app/core/ par `python shared/sync_core.py` (ne pas modifier une copie).
+"""
+import time
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from starlette.requests import Request
+from starlette.responses import Response
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Durée des requêtes HTTP",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requêtes HTTP en cours",
+    ["method"],
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Attente pour obtenir une connexion du pool SQL",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Nombre de requêtes SQL par requête HTTP (SQL_INSTRUMENTATION)",
+    ["route"],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_TIME_PER_REQUEST_SECONDS = Histogram(
+    "db_time_per_request_seconds",
+    "Temps passé en base par requête HTTP (SQL_INSTRUMENTATION)",
+    ["route"],
+)
+DB_QUERY_BUDGET_EXCEEDED = Counter(
+    "db_query_budget_exceeded_total",
+    "Requêtes HTTP au-delà de SQL_QUERY_BUDGET requêtes SQL",
+    ["route"],
+)
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries_total",
+    "Requêtes SQL plus lentes que SQL_SLOW_QUERY_MS",
+)
+AMQP_PUBLISH_SECONDS = Histogram(
+    "amqp_publish_duration_seconds",
+    "Durée d'une publication RabbitMQ",
+    ["queue"],
+)
+AMQP_CONSUMER_LAG_SECONDS = Histogram(
+    "amqp_consumer_lag_seconds",
+    "Délai entre la publication d'un message et le début de son traitement",
+    ["queue"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+AMQP_PROCESSING_SECONDS = Histogram(
+    "amqp_message_processing_seconds",
+    "Durée de traitement d'un message consommé",
+    ["queue", "outcome"],
+)
+
+
+class DbPoolCollector:
+    """Lit l'état du pool du moteur unique à chaque scrape."""
+
+    def describe(self):
+        # Pas de collect() à l'enregistrement : le moteur reste créé à la première utilisation
+        return []
+
+    def collect(self):
+        from app.db import database
+
+        if database._engine is None:
+            return
+        pool = database._engine.sync_engine.pool
+        connections = GaugeMetricFamily("db_pool_connections", "Connexions du pool SQL", labels=["state"])
+        connections.add_metric(["in_use"], pool.checkedout())
+        connections.add_metric(["idle"], pool.checkedin())
+        connections.add_metric(["overflow"], max(pool.overflow(), 0))
+        yield connections
+        yield GaugeMetricFamily("db_pool_size", "Taille configurée du pool SQL", value=pool.size())
+
+
+def route_template(scope) -> str:
+    """
+    Gabarit complet de la route reconnue (/tp/get_trip_by_id/{trip_id}), préfixe du routeur compris.
+    Un routeur inclus garde son chemin relatif (`scope["route"].path` = /get_trip_by_id/{trip_id}) :
+    le préfixe est la partie de l'URL qui précède ce que reconnaît le gabarit.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    path, regex = scope["path"], getattr(route, "path_regex", None)
+    if regex is None or regex.match(path):
+        return route.path
+    for position, char in enumerate(path):
+        if char == "/" and position and regex.match(path[position:]):
+            return path[:position] + route.path
+    return route.path
+
+
+class PrometheusMiddleware:
+    """Middleware ASGI : le label `route` est le gabarit (route_template), pas l'URL."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.labels(method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_template(scope)
+            HTTP_REQUEST_SECONDS.labels(method, route, str(status)).observe(time.perf_counter() - start)
+            HTTP_REQUESTS_IN_PROGRESS.labels(method).dec()
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+_pool_collector: Optional[DbPoolCollector] = None
+
+
+def setup_metrics(app) -> None:
+    """Branche le middleware HTTP, la route /metrics et le collecteur du pool SQL."""
+    global _pool_collector
+    if _pool_collector is None:
+        _pool_collector = DbPoolCollector()
+        REGISTRY.register(_pool_collector)
+    app.add_middleware(PrometheusMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
@@ -0,0 +1,235 @@
+"""
+Cache des résultats de recherche (GET /tp/search_trips).
+
+L'essentiel du trafic de recherche porte sur quelques paires de villes pour les
+prochains jours : les réponses sont gardées SEARCH_CACHE_TTL secondes, sous une clé
+normalisée (villes, date, statut, filtres, page).
+
+Invalidation par (date, ville) : une recherche est étiquetée par sa date et sa ville
+de départ (« * » si la recherche n'en précise pas). Création, changement de statut
+ou mouvement de places d'un trajet invalide (date, ville de départ) et (date, *).
+
+Backends (SEARCH_CACHE_BACKEND) :
+- memory : LRU en mémoire, par processus ; les invalidations sont diffusées sur
+  l'échange fanout SEARCH_CACHE_EXCHANGE à tous les processus abonnés (workers de
+  l'API, quel que soit celui — ou le worker consumer — qui a fait l'écriture) ;
+- redis : partagé entre workers (REDIS_URL, une instance locale suffit) ;
+- off : pas de cache.
+
+Les valeurs sont les réponses JSON déjà encodées : un hit est renvoyé tel quel.
+Une panne du backend n'est jamais une erreur de requête : lecture = miss,
+écriture/invalidation = log.
+"""
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date
+from typing import Iterable, Optional
+
+import aio_pika
+from prometheus_client import Counter
+
+from app.core.amqp import amqp_client
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_REQUESTS = Counter(
+    "search_cache_requests_total",
+    "Lectures du cache de recherche",
+    ["result"],
+)
+SEARCH_CACHE_INVALIDATIONS = Counter(
+    "search_cache_invalidations_total",
+    "Étiquettes (date, ville) invalidées dans le cache de recherche",
+)
+
+KEY_PREFIX = "trip-search:"
+ANY_CITY = "*"
+
+
+def search_key(params: dict) -> str:
+    """Clé normalisée : villes en minuscules, filtres None ignorés, ordre des paramètres indifférent."""
+    normalized = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if name in ("departure_city", "destination_city"):
+            value = value.strip().lower()
+        normalized[name] = value
+    return KEY_PREFIX + json.dumps(normalized, sort_keys=True, default=str)
+
+
+def search_tag(departure_date: date, departure_city: Optional[str]) -> str:
+    city = departure_city.strip().lower() if departure_city else ANY_CITY
+    return f"{departure_date.isoformat()}|{city}"
+
+
+def trip_tags(departure_date: date, departure_city: str) -> list[str]:
+    """Étiquettes à invalider quand un trajet change."""
+    return [search_tag(departure_date, departure_city), search_tag(departure_date, None)]
+
+
+class MemorySearchCache:
+    """LRU borné à `max_entries`, expiration à la lecture ; index étiquette → clés."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str, bytes]] = OrderedDict()  # clé → (expiration, étiquette, valeur)
+        self._tags: dict[str, set[str]] = {}
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._tags.get(entry[1])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[entry[1]]
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    async def set(self, key: str, tag: str, value: bytes) -> None:
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl, tag, value)
+        self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._drop(key)
+
+    async def close(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+
+class RedisSearchCache:
+    """Valeurs en SETEX ; chaque étiquette est un SET Redis des clés à supprimer."""
+
+    def __init__(self, url: str, ttl: float):
+        import redis.asyncio as redis  # dépendance optionnelle, seulement avec SEARCH_CACHE_BACKEND=redis
+
+        self.ttl = max(int(ttl), 1)
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, tag: str, value: bytes) -> None:
+        tag_key = f"{KEY_PREFIX}tag:{tag}"
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.set(key, value, ex=self.ttl)
+            pipe.sadd(tag_key, key)
+            pipe.expire(tag_key, self.ttl)
+            await pipe.execute()
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            tag_key = f"{KEY_PREFIX}tag:{tag}"
+            keys = await self._redis.smembers(tag_key)
+            await self._redis.delete(tag_key, *keys)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class SearchCache:
+    """Façade : métriques hit/miss et tolérance aux pannes autour du backend configuré."""
+
+    def __init__(self):
+        self._backend = None
+        self._configured = False
+        self._origin = uuid.uuid4().hex  # ignore l'écho de ses propres diffusions
+
+    def _get_backend(self):
+        if not self._configured:
+            self._configured = True
+            backend = settings.SEARCH_CACHE_BACKEND
+            if backend == "memory":
+                self._backend = MemorySearchCache(settings.SEARCH_CACHE_TTL, settings.SEARCH_CACHE_MAX_ENTRIES)
+            elif backend == "redis":
+                self._backend = RedisSearchCache(settings.REDIS_URL, settings.SEARCH_CACHE_TTL)
+            elif backend != "off":
+                logger.warning(f"[SearchCache] ⚠️ Backend inconnu « {backend} », cache désactivé")
+        return self._backend
+
+    async def get(self, key: str) -> Optional[bytes]:
+        backend = self._get_backend()
+        if backend is None:
+            return None
+        try:
+            value = await backend.get(key)
+        except Exception as e:
+            logger.warning(f"[SearchCache] ⚠️ Lecture impossible : {e}")
+            value = None
+        SEARCH_CACHE_REQUESTS.labels("miss" if value is None else "hit").inc()
+        return value
+
+    async def set(self, key: str, tag: str, value: bytes) -> None:
+        backend = self._get_backend()
+        if backend is None:
+            return
+        try:
+            await backend.set(key, tag, value)
+        except Exception as e:
+            logger.warning(f"[SearchCache] ⚠️ Écriture impossible : {e}")
+
+    def _is_local(self) -> bool:
+        return isinstance(self._get_backend(), MemorySearchCache)
+
+    async def _invalidate_backend(self, tags: list[str]) -> None:
+        try:
+            await self._backend.invalidate(tags)
+            SEARCH_CACHE_INVALIDATIONS.inc(len(tags))
+        except Exception as e:
+            logger.warning(f"[SearchCache] ⚠️ Invalidation impossible ({tags}) : {e}")
+
+    async def invalidate(self, tags: list[str]) -> None:
+        """
+        Après commit. Cache par processus : invalidation locale immédiate (le processus
+        relit ses propres écritures), puis diffusion aux autres processus.
+        """
+        if self._get_backend() is None:
+            return
+        await self._invalidate_backend(tags)
+        if self._is_local() and settings.RABBITMQ_URL:
+            try:
+                await amqp_client.publish_fanout(
+                    settings.SEARCH_CACHE_EXCHANGE, {"origin": self._origin, "tags": list(tags)}
+                )
+            except Exception as e:
+                logger.warning(f"[SearchCache] ⚠️ Diffusion de l'invalidation impossible ({tags}) : {e}")
+
+    async def _on_message(self, message: aio_pika.abc.AbstractIncomingMessage) -> None:
+        async with message.process():
+            data = json.loads(message.body.decode())
+            if data.get("origin") != self._origin:
+                await self._invalidate_backend(data["tags"])
+
+    async def start(self) -> None:
+        """Cache par processus : abonne le processus aux invalidations diffusées (connexion RabbitMQ ouverte)."""
+        if self._is_local():
+            await amqp_client.subscribe_fanout(settings.SEARCH_CACHE_EXCHANGE, self._on_message)
+
+    async def close(self) -> None:
+        if self._backend is not None:
+            await self._backend.close()
+        self._backend = None
+        self._configured = False
+
+
+search_cache = SearchCache()
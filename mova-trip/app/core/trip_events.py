@@ -0,0 +1,120 @@
+"""
+Diffusion temps réel des places et du statut des trajets (WebSocket / SSE).
+
+Après le commit d'un mouvement de places ou d'un changement de statut, le trip
+service publie un événement sur l'échange fanout TRIP_EVENTS_EXCHANGE. Chaque
+processus (API ou worker consumer) y a sa file exclusive et relaie les événements
+aux clients connectés chez lui et abonnés au trajet.
+
+Sans RabbitMQ, l'événement est remis directement aux abonnés du processus.
+
+Un client lent ne bloque personne : sa file est bornée et, pleine, perd le plus
+ancien événement (seul le dernier état d'un trajet compte).
+"""
+import asyncio
+import json
+import logging
+from typing import Iterable, Optional
+
+import aio_pika
+from prometheus_client import Gauge
+
+from app.core.amqp import amqp_client
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRIP_EVENT_SUBSCRIBERS = Gauge(
+    "trip_event_subscribers",
+    "Connexions WebSocket/SSE ouvertes sur les événements de trajets",
+)
+
+
+def trip_event(trip_id, available_seats: int, status, updated_at=None) -> dict:
+    return {
+        "type": "trip.update",
+        "trip_id": str(trip_id),
+        "available_seats": available_seats,
+        "status": str(getattr(status, "value", status)),
+        "updated_at": updated_at.isoformat() if updated_at else None,
+    }
+
+
+class Subscription:
+    """Abonnements d'une connexion client et file de ses événements."""
+
+    def __init__(self, hub: "TripEventHub", maxsize: int):
+        self._hub = hub
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.trip_ids: set[str] = set()
+
+    def subscribe(self, trip_ids: Iterable[str]) -> None:
+        for trip_id in trip_ids:
+            self.trip_ids.add(trip_id)
+            self._hub._subscribers.setdefault(trip_id, set()).add(self)
+
+    def unsubscribe(self, trip_ids: Iterable[str]) -> None:
+        for trip_id in trip_ids:
+            self.trip_ids.discard(trip_id)
+            subscribers = self._hub._subscribers.get(trip_id)
+            if subscribers is not None:
+                subscribers.discard(self)
+                if not subscribers:
+                    del self._hub._subscribers[trip_id]
+
+    def push(self, event: Optional[dict]) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Prochain événement ; lève asyncio.TimeoutError après `timeout`, None à l'arrêt du service."""
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+    def close(self) -> None:
+        self.unsubscribe(list(self.trip_ids))
+        if self in self._hub._open:
+            self._hub._open.discard(self)
+            TRIP_EVENT_SUBSCRIBERS.dec()
+
+
+class TripEventHub:
+    def __init__(self):
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._open: set[Subscription] = set()
+
+    def open(self) -> Subscription:
+        subscription = Subscription(self, maxsize=settings.TRIP_EVENTS_QUEUE_SIZE)
+        self._open.add(subscription)
+        TRIP_EVENT_SUBSCRIBERS.inc()
+        return subscription
+
+    def dispatch(self, event: dict) -> None:
+        for subscription in list(self._subscribers.get(event.get("trip_id"), ())):
+            subscription.push(event)
+
+    async def _on_message(self, message: aio_pika.abc.AbstractIncomingMessage) -> None:
+        async with message.process():
+            self.dispatch(json.loads(message.body.decode()))
+
+    async def start(self) -> None:
+        """Abonne le processus à l'échange fanout (à appeler une fois la connexion RabbitMQ ouverte)."""
+        await amqp_client.subscribe_fanout(settings.TRIP_EVENTS_EXCHANGE, self._on_message)
+
+    async def publish(self, event: dict) -> None:
+        """Après commit ; une panne de diffusion est journalisée, jamais remontée à l'écriture."""
+        try:
+            if settings.RABBITMQ_URL:
+                await amqp_client.publish_fanout(settings.TRIP_EVENTS_EXCHANGE, event)
+            else:
+                self.dispatch(event)
+        except Exception as e:
+            logger.warning(f"[TripEvents] ⚠️ Diffusion impossible ({event.get('trip_id')}) : {e}")
+
+    def close(self) -> None:
+        """Arrêt du service : termine les flux WebSocket/SSE ouverts."""
+        for subscription in list(self._open):
+            subscription.push(None)
+
+
+trip_events = TripEventHub()
@@ -1,21 +1,11 @@
 from sqlalchemy import Column, Integer, String, ForeignKey,Float,Date,Time,Boolean
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship,sessionmaker
+from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base 
-from sqlalchemy import create_engine, inspect
-from dotenv import load_dotenv
 from datetime import datetime
 from enum import Enum
 from app.db.base import Base
-import os
-
-load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL doit être défini dans le fichier .env")
-engine = create_engine(DATABASE_URL)
-# Configurer la session
-Session = sessionmaker(bind=engine)
+
 
 class ModePayment(Enum):
     cash = "cash"
@@ -0,0 +1,125 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Date, DateTime, Index, Time, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+
+
+# Bits de TripSearch.preference_flags (une colonne au lieu d'une jointure sur preferences)
+PREF_BAGGAGE = 1
+PREF_PETS = 2
+PREF_SMOKING = 4
+PREF_AIR_CONDITIONING = 8
+PREF_BIKE = 16
+PREF_SKI = 32
+
+# Colonnes des filtres de recherche, incluses dans les index de tri (parcours index-only)
+COVERED_COLUMNS = ("stop_id", "price", "available_seats", "preference_flags", "stop_count", "mode_payment")
+
+
+# Colonnes lues par la recherche de proximité (distance exacte et filtre de places)
+GEO_COLUMNS = ["trip_id", "stop_id", "departure_lat", "departure_lon", "destination_lat", "destination_lon", "available_seats"]
+
+
+# Lignes d'une recherche sans destination (apply_filters) : index partiels ix_trip_search_any_*
+ANY_DESTINATION = text("stop_id IS NULL")
+
+
+# Collation « C » sous PostgreSQL : un préfixe geohash = un intervalle de l'index B-tree
+GEOHASH_TYPE = String(12).with_variant(String(12, collation="C"), "postgresql")
+
+
+def covered_except(*keys: str) -> list:
+    """Colonnes INCLUDE d'un index, hors celles déjà dans sa clé."""
+    return [c for c in COVERED_COLUMNS if c not in keys]
+
+
+class TripSearch(Base):
+    """
+    Modèle de lecture de la recherche : une ligne par tronçon vendable (départ ou
+    arrêt de montée → arrêt ou destination finale), une seule par paire de villes
+    d'un trajet. Maintenu par les écritures du trip service (app.services.trip_search_service).
+    """
+    __tablename__ = "trip_search"
+    # trip.id / stop.id depuis le départ, uuid5 depuis un arrêt de montée (trip_search_service.leg_id)
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    trip_id = Column(UUID(as_uuid=True), ForeignKey("trips.id", ondelete="CASCADE"), nullable=False, index=True)
+    from_stop_id = Column(UUID(as_uuid=True), nullable=True)  # arrêt de montée (None = départ du trajet)
+    stop_id = Column(UUID(as_uuid=True), nullable=True)       # arrêt de descente (None = destination finale)
+    driver_id = Column(UUID(as_uuid=True), nullable=False)
+
+    departure_city = Column(String, nullable=False)      # normalisé (minuscules)
+    destination_city = Column(String, nullable=False)    # normalisé (minuscules)
+    departure_date = Column(Date, nullable=False)
+    departure_at = Column(DateTime, nullable=False)
+    departure_time = Column(Time, nullable=False)        # fenêtre horaire (recherche sur plusieurs jours)
+
+    # Proximité (app.core.geohash) : coordonnées et geohash des deux extrémités du tronçon,
+    # NULL si le conducteur n'a pas placé le point.
+    departure_lat = Column(Float, nullable=True)
+    departure_lon = Column(Float, nullable=True)
+    departure_geohash = Column(GEOHASH_TYPE, nullable=True)
+    destination_lat = Column(Float, nullable=True)
+    destination_lon = Column(Float, nullable=True)
+    destination_geohash = Column(GEOHASH_TYPE, nullable=True)
+
+    price = Column(Float, nullable=False)                # prix du tronçon
+    available_seats = Column(Integer, nullable=False)
+    preference_flags = Column(Integer, nullable=False, default=0)
+    mode_payment = Column(String, nullable=True)
+    stop_count = Column(Integer, nullable=False, default=0)
+    status = Column(String, nullable=False)
+
+    # Un index couvrant par mode de tri (app.services.trip_search_service.SORT_MODES) et par
+    # forme de recherche (avec / sans destination) : égalités (date, villes, statut) puis clé
+    # de tri, colonnes des filtres en INCLUDE.
+    # Le top-k d'un trajet est lu dans l'ordre de l'index, sans tri ni accès à la table.
+    __table_args__ = (
+        Index(
+            "ix_trip_search_earliest",
+            "departure_date", "departure_city", "destination_city", "status", "departure_at", "trip_id",
+            postgresql_include=covered_except(),
+        ),
+        Index(
+            "ix_trip_search_cheapest",
+            "departure_date", "departure_city", "destination_city", "status", "price", "departure_at", "trip_id",
+            postgresql_include=covered_except("price"),
+        ),
+        Index(
+            "ix_trip_search_fewest_stops",
+            "departure_date", "departure_city", "destination_city", "status", "stop_count", "departure_at", "trip_id",
+            postgresql_include=covered_except("stop_count"),
+        ),
+        # Sans destination : destination_city n'est plus une égalité, la clé de tri suit
+        # directement la ville de départ (lignes destination finale seulement)
+        Index(
+            "ix_trip_search_any_earliest",
+            "departure_date", "departure_city", "status", "departure_at", "trip_id",
+            postgresql_include=covered_except(), postgresql_where=ANY_DESTINATION,
+        ),
+        Index(
+            "ix_trip_search_any_cheapest",
+            "departure_date", "departure_city", "status", "price", "departure_at", "trip_id",
+            postgresql_include=covered_except("price"), postgresql_where=ANY_DESTINATION,
+        ),
+        Index(
+            "ix_trip_search_any_fewest_stops",
+            "departure_date", "departure_city", "status", "stop_count", "departure_at", "trip_id",
+            postgresql_include=covered_except("stop_count"), postgresql_where=ANY_DESTINATION,
+        ),
+        # Recherche flexible : plage de dates et fenêtre horaire depuis une ville
+        Index(
+            "ix_trip_search_window",
+            "departure_city", "departure_date", "departure_time",
+            postgresql_include=["destination_city", "status", "departure_at", "trip_id", *COVERED_COLUMNS],
+        ),
+        # Proximité : cellules geohash autour du point de départ ou d'arrivée, pour une date
+        Index(
+            "ix_trip_search_departure_geo",
+            "departure_date", "status", "departure_geohash",
+            postgresql_include=GEO_COLUMNS,
+        ),
+        Index(
+            "ix_trip_search_destination_geo",
+            "departure_date", "status", "destination_geohash",
+            postgresql_include=GEO_COLUMNS,
+        ),
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+
+
+class TripSegment(Base):
+    """
+    Inventaire des places par tronçon : départ → arrêt 1 → … → destination.
+    Une réservation jusqu'à un arrêt ne consomme que les tronçons 0..k ;
+    Trip.available_seats reste le minimum sur tout l'itinéraire.
+    """
+    __tablename__ = "trip_segments"
+    trip_id = Column(UUID(as_uuid=True), ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True)
+    segment_index = Column(Integer, primary_key=True)
+    from_city = Column(String, nullable=False)
+    to_city = Column(String, nullable=False)
+    stop_id = Column(UUID(as_uuid=True), nullable=True)  # arrêt d'arrivée (None = destination finale)
+    seats = Column(Integer, nullable=False)
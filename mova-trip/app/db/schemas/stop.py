@@ -7,6 +7,8 @@ class StopBase(BaseModel):
     destination_city: str = Field(..., max_length=100)
     price: float
     stop_order: Optional[int] = 1
+    destination_lat: Optional[float] = Field(None, ge=-90, le=90)
+    destination_lon: Optional[float] = Field(None, ge=-180, le=180)
 
     class Config:
         orm_mode = True
@@ -24,6 +26,9 @@ class StopResponse(BaseModel):
     id: UUID
     destination_city: str = Field(..., max_length=100)
     price: float
+    stop_order: Optional[int] = None
+    destination_lat: Optional[float] = None
+    destination_lon: Optional[float] = None
 
     class Config:
         orm_mode = True
\ No newline at end of file
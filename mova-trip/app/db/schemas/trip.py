@@ -28,6 +28,10 @@ class TripBase(BaseModel):
     available_seats: int
     message: Optional[str] = None
     status: TripStatus = TripStatus.pending
+    departure_lat: Optional[float] = Field(None, ge=-90, le=90)
+    departure_lon: Optional[float] = Field(None, ge=-180, le=180)
+    destination_lat: Optional[float] = Field(None, ge=-90, le=90)
+    destination_lon: Optional[float] = Field(None, ge=-180, le=180)
 
     class Config:
         orm_mode = True
@@ -49,10 +53,14 @@ class StatusTripUpdate(BaseModel):
 class TripReserveSeat(BaseModel):
     trip_id:UUID
     seats:int
+    stop_id: Optional[UUID] = None  # arrêt de descente (None = destination finale)
+    from_stop_id: Optional[UUID] = None  # arrêt de montée (None = départ)
 
 class TripCancelSeat(BaseModel):
     trip_id:UUID
     seats:int
+    stop_id: Optional[UUID] = None  # arrêt de descente (None = destination finale)
+    from_stop_id: Optional[UUID] = None  # arrêt de montée (None = départ)
     
 class TripResponse(TripBase):
     id: UUID
@@ -60,4 +68,74 @@ class TripResponse(TripBase):
     created_at: datetime
     updated_at: datetime
     preferences: Optional[PreferenceResponse]     
-    stops: Optional[List[StopResponse]] 
+    stops: Optional[List[StopResponse]]
+
+
+class TripSeatsAvailability(BaseModel):
+    trip_id: UUID
+    from_city: Optional[str]
+    from_stop_id: Optional[UUID] = None
+    to_city: Optional[str]
+    to_stop_id: Optional[UUID]
+    available_seats: int 
+
+
+class TripRecurringCreate(BaseModel):
+    """Trajet type répété chaque jour de `weekdays` (0 = lundi … 6 = dimanche) entre start_date et end_date."""
+    driver_id: UUID
+    car_id: UUID
+    departure_city: str = Field(..., max_length=100)
+    destination_city: str = Field(..., max_length=100)
+    departure_place: str = Field(..., max_length=100)
+    destination_place: str = Field(..., max_length=100)
+    departure_time: time
+    total_price: float
+    available_seats: int
+    message: Optional[str] = None
+    departure_lat: Optional[float] = Field(None, ge=-90, le=90)
+    departure_lon: Optional[float] = Field(None, ge=-180, le=180)
+    destination_lat: Optional[float] = Field(None, ge=-90, le=90)
+    destination_lon: Optional[float] = Field(None, ge=-180, le=180)
+    preferences: PreferenceCreate
+    stops: Optional[List[StopCreate]] = None
+
+    start_date: date
+    end_date: date
+    weekdays: List[int] = Field(..., min_items=1)
+
+    @validator("weekdays")
+    def check_weekdays(cls, value):
+        if any(day < 0 or day > 6 for day in value):
+            raise ValueError("weekdays : entiers de 0 (lundi) à 6 (dimanche)")
+        return sorted(set(value))
+
+    @validator("end_date")
+    def check_date_range(cls, value, values):
+        if "start_date" in values and value < values["start_date"]:
+            raise ValueError("end_date doit être postérieure à start_date")
+        return value
+
+
+class TripOccurrence(BaseModel):
+    id: UUID
+    departure_date: date
+
+
+class TripRecurringResponse(BaseModel):
+    count: int
+    trips: List[TripOccurrence]
+
+
+class TripSearchDay(BaseModel):
+    date: date
+    count: int
+    trips: List[TripResponse]
+
+
+class TripFlexibleSearchResponse(BaseModel):
+    total: int
+    days: List[TripSearchDay]
+
+
+class TripNearbyResponse(TripResponse):
+    distance_km: float  # départ (et arrivée, si demandée) : somme des distances aux points recherchés
@@ -1,17 +1,25 @@
-import asyncio
-import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.database import Base, engine
 from app.api.trip_route import router as trip_router
-from app.consumers.rabbitmq_consumer import start_rabbitmq_consumer
+from app.core.lifespan import lifespan, readiness
+from app.core.logging_config import setup_logging
+from app.core.metrics import setup_metrics
+from app.core.sql_instrumentation import setup_sql_instrumentation
+from app.core.tracing import setup_tracing
 
-# Création tables (sync)
-async def init_models():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+app = FastAPI(title="MoVa Trip Service", version="1.0.0", lifespan=lifespan)
 
-app = FastAPI(title="MoVa Trip Service", version="1.0.0")
+# 📝 Logs JSON via une file (configurés une fois par processus)
+setup_logging()
+
+# 📊 Métriques Prometheus (GET /metrics)
+setup_metrics(app)
+
+# 🔎 Instrumentation SQL par requête (opt-in : SQL_INSTRUMENTATION)
+setup_sql_instrumentation(app)
+
+# 🔭 Traces distribuées HTTP/RabbitMQ (opt-in : TRACING_ENABLED)
+setup_tracing(app)
 
 app.add_middleware(
     CORSMiddleware,
@@ -21,15 +29,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-async def startup_event():
-    await init_models()
-    logging.info("🚀 Démarrage du consumer RabbitMQ...")
-    asyncio.create_task(start_rabbitmq_consumer())
-    logging.info("✅ Consumer RabbitMQ démarré avec succès.")
-
 @app.get("/")
 async def root():
     return {"message": "Trip service en ligne ✅"}
 
+@app.get("/health/ready")
+async def readiness_check():
+    """Prêt seulement une fois le pool SQL et RabbitMQ préchauffés (503 au démarrage/à l'arrêt)."""
+    if not readiness.ready:
+        raise HTTPException(status_code=503, detail="Service non prêt")
+    return {"status": "ready"}
+
 app.include_router(trip_router, prefix="/tp", tags=["trips"])
@@ -0,0 +1,173 @@
+"""
+Inventaire des places par tronçon (trip_segments).
+
+Un trajet départ → A → B → destination a trois tronçons (0, 1, 2). Un passager
+qui descend en A ne consomme que le tronçon 0 : la place se revend de A à la
+destination (montée à l'arrêt A, `from_stop_id`). Une réservation sur les tronçons
+i..j est un seul UPDATE conditionnel (`seats >= n` sur chaque ligne) : si un tronçon
+manque de places, une erreur est levée et l'appelant annule sa transaction.
+
+Après chaque mouvement, les places des lignes trip_search (minimum des tronçons de
+chaque ligne) sont recalculées ; Trip.available_seats garde le minimum sur tout l'itinéraire.
+"""
+import logging
+import uuid
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.trip_segment import TripSegment
+from app.services.trip_search_service import leg_id, normalize_city, sellable_legs, sync_leg_seats
+
+logger = logging.getLogger(__name__)
+
+
+def order_stops(stops) -> list:
+    """Arrêts dans l'ordre de l'itinéraire (stop_order, puis ordre de saisie)."""
+    return sorted(stops, key=lambda s: s.stop_order if s.stop_order is not None else 0)
+
+
+def build_segments(trip, stops) -> List[TripSegment]:
+    """Tronçons d'un nouveau trajet, tous à trip.available_seats."""
+    ordered = order_stops(stops)
+    cities = [trip.departure_city, *(s.destination_city for s in ordered), trip.destination_city]
+    arrivals = [s.id for s in ordered] + [None]
+    return [
+        TripSegment(
+            trip_id=trip.id,
+            segment_index=i,
+            from_city=cities[i],
+            to_city=cities[i + 1],
+            stop_id=arrivals[i],
+            seats=trip.available_seats,
+        )
+        for i in range(len(arrivals))
+    ]
+
+
+async def get_segments(db: AsyncSession, trip_id) -> List[TripSegment]:
+    # populate_existing : les UPDATE groupés ci-dessous ne passent pas par l'identity map
+    result = await db.execute(
+        select(TripSegment)
+        .where(TripSegment.trip_id == trip_id)
+        .order_by(TripSegment.segment_index)
+        .execution_options(populate_existing=True)
+    )
+    return list(result.scalars().all())
+
+
+def segment_range(
+    segments: List[TripSegment],
+    from_city: Optional[str] = None,
+    to_city: Optional[str] = None,
+    to_stop_id: Optional[uuid.UUID] = None,
+    from_stop_id: Optional[uuid.UUID] = None,
+) -> Tuple[int, int]:
+    """
+    (premier, dernier) tronçon entre deux points de l'itinéraire.
+    Par défaut : du départ à la destination finale.
+    """
+    if not segments:
+        raise HTTPException(status_code=404, detail="Itinéraire du trajet introuvable")
+
+    first, last = 0, len(segments) - 1
+    if from_stop_id:
+        # Montée à un arrêt : premier tronçon après celui qui y arrive
+        arrival = next((s.segment_index for s in segments if s.stop_id == from_stop_id), None)
+        first = None if arrival is None else arrival + 1
+    elif from_city:
+        wanted = normalize_city(from_city)
+        first = next((s.segment_index for s in segments if normalize_city(s.from_city) == wanted), None)
+    if to_stop_id:
+        last = next((s.segment_index for s in segments if s.stop_id == to_stop_id), None)
+    elif to_city:
+        wanted = normalize_city(to_city)
+        last = next((s.segment_index for s in segments if normalize_city(s.to_city) == wanted), None)
+
+    if first is None or last is None or first > last:
+        raise HTTPException(status_code=400, detail="Tronçon invalide pour ce trajet")
+    return first, last
+
+
+async def reserve_segments(db: AsyncSession, trip_id, first: int, last: int, seats: int) -> None:
+    """
+    Retire `seats` places sur les tronçons first..last en un seul UPDATE. Si un tronçon
+    manque de places : HTTPException 400, l'appelant annule la transaction (rien n'est décompté).
+    """
+    result = await db.execute(
+        update(TripSegment)
+        .where(
+            TripSegment.trip_id == trip_id,
+            TripSegment.segment_index.between(first, last),
+            TripSegment.seats >= seats,
+        )
+        .values(seats=TripSegment.seats - seats)
+        .returning(TripSegment.segment_index)
+        .execution_options(synchronize_session=False)
+    )
+    if len(result.all()) != last - first + 1:
+        logger.warning(f"[SeatInventory] ⚠️ Places insuffisantes sur {trip_id} (tronçons {first}..{last}, {seats} place(s))")
+        raise HTTPException(status_code=400, detail="Pas assez de places disponibles")
+
+
+async def release_segments(db: AsyncSession, trip_id, first: int, last: int, seats: int) -> None:
+    """Rend `seats` places sur les tronçons first..last."""
+    await db.execute(
+        update(TripSegment)
+        .where(TripSegment.trip_id == trip_id, TripSegment.segment_index.between(first, last))
+        .values(seats=TripSegment.seats + seats)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def refresh_availability(db: AsyncSession, trip_id) -> int:
+    """
+    Recalcule les places des lignes trip_search (minimum des tronçons de chaque ligne)
+    et renvoie le minimum sur tout l'itinéraire, à reporter dans Trip.available_seats.
+    """
+    segments = await get_segments(db, trip_id)
+    cities = [normalize_city(segments[0].from_city), *(normalize_city(s.to_city) for s in segments)]
+    stop_ids = [None, *(s.stop_id for s in segments)]  # point j : arrêt d'arrivée du tronçon j - 1
+    seats_by_row = {
+        leg_id(trip_id, stop_ids[i], stop_ids[j]): min(s.seats for s in segments[i:j])
+        for i, j in sellable_legs(cities)
+    }
+
+    await sync_leg_seats(db, seats_by_row)
+    return min(s.seats for s in segments)
+
+
+async def change_seats(
+    db: AsyncSession,
+    trip_id,
+    delta: int,
+    to_stop_id: Optional[uuid.UUID] = None,
+    from_stop_id: Optional[uuid.UUID] = None,
+) -> int:
+    """
+    Applique un mouvement de places (delta < 0 : réservation) de `from_stop_id`
+    (ou le départ) jusqu'à `to_stop_id` (ou la destination). Renvoie les places
+    restantes sur le trajet complet ; commit et rollback restent à l'appelant.
+    """
+    first, last = segment_range(await get_segments(db, trip_id), to_stop_id=to_stop_id, from_stop_id=from_stop_id)
+    if delta < 0:
+        await reserve_segments(db, trip_id, first, last, -delta)
+    elif delta > 0:
+        await release_segments(db, trip_id, first, last, delta)
+    return await refresh_availability(db, trip_id)
+
+
+async def available_seats_between(
+    db: AsyncSession,
+    trip_id,
+    from_city: Optional[str] = None,
+    to_city: Optional[str] = None,
+    to_stop_id: Optional[uuid.UUID] = None,
+    from_stop_id: Optional[uuid.UUID] = None,
+) -> int:
+    """Places vendables entre deux points de l'itinéraire (minimum des tronçons couverts)."""
+    segments = await get_segments(db, trip_id)
+    first, last = segment_range(segments, from_city, to_city, to_stop_id, from_stop_id)
+    return min(s.seats for s in segments[first:last + 1])
@@ -0,0 +1,426 @@
+"""
+Modèle de lecture `trip_search` : une ligne par tronçon vendable (départ ou arrêt de
+montée → arrêt ou destination finale, une par paire de villes) avec prix du tronçon,
+places, préférences en masque de bits, nombre d'arrêts et horodatage de départ.
+
+Il est mis à jour dans la même transaction que les écritures du trajet
+(création, places, statut) : une recherche devient un parcours d'index
+(departure_date, departure_city, destination_city, status, clé de tri), sans
+jointure, sans filtre Python et sans tri du jeu candidat (SORT_MODES).
+La recherche de proximité passe par les geohash des deux extrémités (app.core.geohash).
+"""
+import logging
+import uuid
+from datetime import date, datetime, time
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.geohash import covering_cells, encode, haversine_km, next_prefix
+from app.db.models.trip_search import (
+    PREF_AIR_CONDITIONING,
+    PREF_BAGGAGE,
+    PREF_BIKE,
+    PREF_PETS,
+    PREF_SKI,
+    PREF_SMOKING,
+    TripSearch,
+)
+
+logger = logging.getLogger(__name__)
+
+# Préférences filtrables / classables → bit de TripSearch.preference_flags
+PREFERENCE_BITS = {
+    "baggage": PREF_BAGGAGE,
+    "pets_allowed": PREF_PETS,
+    "smoking_allowed": PREF_SMOKING,
+    "air_conditioning": PREF_AIR_CONDITIONING,
+    "bike_support": PREF_BIKE,
+    "ski_support": PREF_SKI,
+}
+
+# Modes de tri → clé ORDER BY ; chacun suit un index couvrant de TripSearch.
+# best_match classe d'abord par nombre de préférences souhaitées présentes, puis au plus tôt.
+SORT_MODES = {
+    "earliest": (TripSearch.departure_at, TripSearch.trip_id),
+    "cheapest": (TripSearch.price, TripSearch.departure_at, TripSearch.trip_id),
+    "fewest_stops": (TripSearch.stop_count, TripSearch.departure_at, TripSearch.trip_id),
+    "best_match": (TripSearch.departure_at, TripSearch.trip_id),
+}
+
+
+def normalize_city(city: str) -> str:
+    return city.strip().lower()
+
+
+def preference_flags(preferences) -> int:
+    """Préférences d'un trajet → masque de bits (0 si pas de préférences)."""
+    if preferences is None:
+        return 0
+    flags = 0
+    for name, bit in PREFERENCE_BITS.items():
+        if getattr(preferences, name):
+            flags |= bit
+    return flags
+
+
+def point_columns(prefix: str, lat: Optional[float], lon: Optional[float]) -> dict:
+    """Colonnes <prefix>_lat / _lon / _geohash d'une extrémité (NULL si le point n'est pas placé)."""
+    placed = lat is not None and lon is not None
+    return {
+        f"{prefix}_lat": lat if placed else None,
+        f"{prefix}_lon": lon if placed else None,
+        f"{prefix}_geohash": encode(lat, lon) if placed else None,
+    }
+
+
+def leg_id(trip_id: uuid.UUID, from_stop_id: Optional[uuid.UUID], to_stop_id: Optional[uuid.UUID]) -> uuid.UUID:
+    """
+    Clé d'une ligne trip_search : trip.id (trajet complet) ou stop.id depuis le départ,
+    identifiant déterministe depuis un arrêt de montée (recalculable par refresh_availability).
+    """
+    if from_stop_id is None:
+        return to_stop_id or trip_id
+    return uuid.uuid5(from_stop_id, str(to_stop_id or trip_id))
+
+
+def sellable_legs(cities: List[str]) -> List[Tuple[int, int]]:
+    """
+    Tronçons vendables (i, j) entre les points de l'itinéraire (0 = départ, 1..n = arrêts
+    dans l'ordre, n + 1 = destination), villes normalisées. Une seule ligne par paire de
+    villes : le trajet complet s'il la dessert, sinon le plus court tronçon (montée au plus
+    près de la descente) — une recherche (départ, destination) ne voit jamais deux fois un trajet.
+    """
+    last = len(cities) - 1
+    chosen = {(cities[0], cities[last]): (0, last)}
+    for i in range(last):
+        for j in range(i + 1, last + 1):
+            key = (cities[i], cities[j])
+            best = chosen.get(key)
+            if best is None or (best != (0, last) and j - i < best[1] - best[0]):
+                chosen[key] = (i, j)
+    return sorted(chosen.values())
+
+
+def build_search_rows(trip, preferences, stops, segments=None) -> List[TripSearch]:
+    """
+    Lignes de recherche d'un trajet : une par tronçon vendable (sellable_legs), du départ
+    ou d'un arrêt de montée jusqu'à un arrêt ou la destination. Prix du tronçon : écart
+    des prix depuis le départ. Places : minimum des `segments` parcourus (trip_segments,
+    dans l'ordre), sinon trip.available_seats (nouveau trajet).
+    """
+    ordered = sorted(stops, key=lambda s: s.stop_order if s.stop_order is not None else 0)
+    points = [(trip.departure_city, None, 0.0, trip.departure_lat, trip.departure_lon)]
+    points += [(s.destination_city, s.id, s.price, s.destination_lat, s.destination_lon) for s in ordered]
+    points += [(trip.destination_city, None, trip.total_price, trip.destination_lat, trip.destination_lon)]
+
+    common = dict(
+        trip_id=trip.id,
+        driver_id=trip.driver_id,
+        departure_date=trip.departure_date,
+        departure_at=datetime.combine(trip.departure_date, trip.departure_time),
+        departure_time=trip.departure_time,
+        preference_flags=preference_flags(preferences),
+        mode_payment=preferences.mode_payment if preferences is not None else None,
+        stop_count=len(stops),
+        status=str(getattr(trip.status, "value", trip.status)),
+    )
+    last = len(points) - 1
+    rows = []
+    for i, j in sellable_legs([normalize_city(p[0]) for p in points]):
+        (from_city, from_stop, from_price, from_lat, from_lon) = points[i]
+        (to_city, to_stop, to_price, to_lat, to_lon) = points[j]
+        from_stop = from_stop if i > 0 else None
+        to_stop = to_stop if j < last else None
+        rows.append(TripSearch(
+            id=leg_id(trip.id, from_stop, to_stop),
+            from_stop_id=from_stop,
+            stop_id=to_stop,
+            departure_city=normalize_city(from_city),
+            destination_city=normalize_city(to_city),
+            price=max(to_price - from_price, 0.0),
+            available_seats=min(s.seats for s in segments[i:j]) if segments else trip.available_seats,
+            **point_columns("departure", from_lat, from_lon),
+            **point_columns("destination", to_lat, to_lon),
+            **common,
+        ))
+    return rows
+
+
+async def index_trip(db: AsyncSession, trip, preferences, stops) -> None:
+    """(Ré)écrit les lignes de recherche du trajet ; le commit reste à l'appelant."""
+    await db.execute(delete(TripSearch).where(TripSearch.trip_id == trip.id))
+    db.add_all(build_search_rows(trip, preferences, stops))
+
+
+async def sync_leg_seats(db: AsyncSession, seats_by_row: dict) -> None:
+    """Places par ligne de recherche ({trip_search.id: places}), en un UPDATE groupé par clé primaire."""
+    await db.execute(
+        update(TripSearch),
+        [{"id": row_id, "available_seats": seats} for row_id, seats in seats_by_row.items()],
+    )
+
+
+async def sync_trip_status(db: AsyncSession, trip_id, status) -> None:
+    await db.execute(
+        update(TripSearch)
+        .where(TripSearch.trip_id == trip_id)
+        .values(status=str(getattr(status, "value", status)))
+    )
+
+
+async def search_trip_ids(
+    db: AsyncSession,
+    departure_date: date,
+    status: str = "pending",
+    departure_city: Optional[str] = None,
+    destination_city: Optional[str] = None,
+    passenger_count: Optional[int] = None,
+    price_limit: Optional[float] = None,
+    max_stops: Optional[int] = None,
+    required_flags: int = 0,
+    excluded_flags: int = 0,
+    payment_method: Optional[str] = None,
+    sort: str = "earliest",
+    preferred_flags: int = 0,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[uuid.UUID]:
+    """
+    Identifiants des trajets correspondants, classés selon `sort` (SORT_MODES).
+    `preferred_flags` : préférences souhaitées (sans être exigées) pour best_match.
+    """
+    keys = sort_keys(sort, preferred_flags)
+    query = select(TripSearch.trip_id).where(
+        TripSearch.departure_date == departure_date,
+        TripSearch.status == status,
+    )
+    if departure_city:
+        query = query.where(TripSearch.departure_city == normalize_city(departure_city))
+    else:
+        # Sans ville de départ : un trajet = ses lignes montée au départ
+        query = query.where(TripSearch.from_stop_id.is_(None))
+    query = apply_filters(
+        query, destination_city, passenger_count, price_limit, max_stops,
+        required_flags, excluded_flags, payment_method,
+    )
+    # Une ligne par (trajet, ville de départ, ville d'arrivée) à l'écriture (sellable_legs) :
+    # OFFSET/LIMIT portent directement sur des trajets, dans l'ordre de l'index
+    result = await db.execute(query.order_by(*ordered(keys)).offset(skip).limit(limit))
+    return list(result.scalars().all())
+
+
+def apply_filters(
+    query,
+    destination_city: Optional[str] = None,
+    passenger_count: Optional[int] = None,
+    price_limit: Optional[float] = None,
+    max_stops: Optional[int] = None,
+    required_flags: int = 0,
+    excluded_flags: int = 0,
+    payment_method: Optional[str] = None,
+):
+    """Filtres communs aux recherches (destination, places, prix, arrêts, préférences, paiement)."""
+    if destination_city:
+        query = query.where(TripSearch.destination_city == normalize_city(destination_city))
+    else:
+        # Sans destination : un trajet = sa ligne destination finale
+        query = query.where(TripSearch.stop_id.is_(None))
+
+    if passenger_count:
+        query = query.where(TripSearch.available_seats >= passenger_count)
+    if price_limit:
+        query = query.where(TripSearch.price <= price_limit)
+    if max_stops is not None:
+        query = query.where(TripSearch.stop_count <= max_stops)
+    if required_flags:
+        query = query.where(TripSearch.preference_flags.op("&")(required_flags) == required_flags)
+    if excluded_flags:
+        query = query.where(TripSearch.preference_flags.op("&")(excluded_flags) == 0)
+    if payment_method:
+        query = query.where(TripSearch.mode_payment == payment_method)
+    return query
+
+
+def sort_keys(sort: str, preferred_flags: int = 0) -> List[Tuple]:
+    """Clés de tri de `sort` : [(expression, décroissant)]."""
+    if sort not in SORT_MODES:
+        raise ValueError(f"Tri inconnu : {sort}")
+    keys = [(column, False) for column in SORT_MODES[sort]]
+    if sort == "best_match" and preferred_flags:
+        keys.insert(0, (match_score(preferred_flags), True))
+    return keys
+
+
+def ordered(keys: List[Tuple]) -> list:
+    return [key.desc() if descending else key for key, descending in keys]
+
+
+async def search_trip_ids_by_day(
+    db: AsyncSession,
+    departure_city: str,
+    date_from: date,
+    date_to: date,
+    time_from: Optional[time] = None,
+    time_to: Optional[time] = None,
+    status: str = "pending",
+    sort: str = "earliest",
+    preferred_flags: int = 0,
+    per_day: int = 20,
+    **filters,
+) -> dict[date, tuple[int, List[uuid.UUID]]]:
+    """
+    Recherche sur une plage de dates et une fenêtre horaire, en une requête :
+    {jour: (nombre de trajets du jour, `per_day` premiers identifiants selon `sort`)}.
+    Parcours de ix_trip_search_window (ville, date, heure) ; le comptage et le
+    classement par jour sont des fonctions de fenêtre (PARTITION BY departure_date).
+    `filters` : ceux de apply_filters. Une fenêtre 22:00 → 02:00 passe minuit.
+    Une ligne par trajet et paire de villes (sellable_legs) : comptes et rangs portent sur des trajets.
+    """
+    order_by = ordered(sort_keys(sort, preferred_flags))
+    query = select(
+        TripSearch.trip_id,
+        TripSearch.departure_date,
+        func.count().over(partition_by=TripSearch.departure_date).label("day_count"),
+        func.row_number().over(partition_by=TripSearch.departure_date, order_by=order_by).label("day_rank"),
+    ).where(
+        TripSearch.departure_city == normalize_city(departure_city),
+        TripSearch.departure_date.between(date_from, date_to),
+        TripSearch.status == status,
+    )
+    if time_from and time_to and time_from > time_to:
+        query = query.where(or_(TripSearch.departure_time >= time_from, TripSearch.departure_time <= time_to))
+    else:
+        if time_from:
+            query = query.where(TripSearch.departure_time >= time_from)
+        if time_to:
+            query = query.where(TripSearch.departure_time <= time_to)
+    ranked = apply_filters(query, **filters).subquery()
+
+    result = await db.execute(
+        select(ranked.c.departure_date, ranked.c.day_count, ranked.c.trip_id)
+        .where(ranked.c.day_rank <= per_day)
+        .order_by(ranked.c.departure_date, ranked.c.day_rank)
+    )
+    days: dict[date, tuple[int, List[uuid.UUID]]] = {}
+    for day, day_count, trip_id in result.all():
+        days.setdefault(day, (day_count, []))[1].append(trip_id)
+    return days
+
+
+def match_score(preferred_flags: int):
+    """Nombre de préférences souhaitées présentes sur la ligne (popcount de flags & souhaits)."""
+    score = literal(0)
+    for bit in PREFERENCE_BITS.values():
+        if preferred_flags & bit:
+            score = score + case((TripSearch.preference_flags.op("&")(bit) != 0, 1), else_=0)
+    return score
+
+
+def flag_filters(**wanted: Optional[bool]) -> tuple[int, int]:
+    """
+    Filtres de préférences (None = indifférent) → (bits requis, bits exclus).
+    Clés : celles de PREFERENCE_BITS.
+    """
+    required = excluded = 0
+    for name, value in wanted.items():
+        if value is True:
+            required |= PREFERENCE_BITS[name]
+        elif value is False:
+            excluded |= PREFERENCE_BITS[name]
+    return required, excluded
+
+
+def preferred_bits(names: Optional[List[str]]) -> int:
+    """Préférences souhaitées (noms de PREFERENCE_BITS) → masque de bits ; ValueError si nom inconnu."""
+    flags = 0
+    for name in names or []:
+        if name not in PREFERENCE_BITS:
+            raise ValueError(f"Préférence inconnue : {name}")
+        flags |= PREFERENCE_BITS[name]
+    return flags
+
+
+async def search_trip_ids_nearby(
+    db: AsyncSession,
+    departure_date: date,
+    radius_km: float,
+    origin: Optional[Tuple[float, float]] = None,
+    destination: Optional[Tuple[float, float]] = None,
+    status: str = "pending",
+    passenger_count: Optional[int] = None,
+) -> List[Tuple[uuid.UUID, float]]:
+    """
+    Trajets partant à moins de `radius_km` de `origin` et/ou arrivant (destination finale
+    ou arrêt) à moins de `radius_km` de `destination`, du plus proche au plus éloigné :
+    [(trip_id, distance)], distance = somme des distances aux points demandés.
+
+    Parcours de ix_trip_search_departure_geo (ou _destination_geo sans origine) sur
+    les cellules geohash couvrant le cercle ; la distance exacte n'est calculée que
+    sur ce jeu candidat.
+    """
+    if origin is None and destination is None:
+        raise ValueError("Point de départ ou d'arrivée requis")
+
+    anchor, column = (origin, TripSearch.departure_geohash) if origin else (destination, TripSearch.destination_geohash)
+    query = select(
+        TripSearch.trip_id,
+        TripSearch.departure_lat,
+        TripSearch.departure_lon,
+        TripSearch.destination_lat,
+        TripSearch.destination_lon,
+    ).where(
+        TripSearch.departure_date == departure_date,
+        TripSearch.status == status,
+        or_(*(
+            and_(column >= cell, column < next_prefix(cell))
+            for cell in sorted(covering_cells(*anchor, radius_km))
+        )),
+    )
+    if destination is None:
+        # Sans point d'arrivée : un trajet = sa ligne destination finale
+        query = query.where(TripSearch.stop_id.is_(None))
+    if passenger_count:
+        query = query.where(TripSearch.available_seats >= passenger_count)
+
+    best: dict[uuid.UUID, float] = {}
+    for trip_id, dep_lat, dep_lon, dest_lat, dest_lon in (await db.execute(query)).all():
+        distance = 0.0
+        for point, lat, lon in ((origin, dep_lat, dep_lon), (destination, dest_lat, dest_lon)):
+            if point is None:
+                continue
+            if lat is None:
+                distance = None
+                break
+            leg = haversine_km(point[0], point[1], lat, lon)
+            if leg > radius_km:
+                distance = None
+                break
+            distance += leg
+        # Un même trajet peut avoir plusieurs lignes proches (arrêt + destination) : la plus proche
+        if distance is not None and distance < best.get(trip_id, float("inf")):
+            best[trip_id] = distance
+    return sorted(best.items(), key=lambda item: item[1])
+
+
+async def nearest_trip_ids(
+    db: AsyncSession,
+    departure_date: date,
+    count: int,
+    max_radius_km: float,
+    start_radius_km: float = 5.0,
+    **kwargs,
+) -> List[Tuple[uuid.UUID, float]]:
+    """
+    Les `count` trajets les plus proches : rayon doublé depuis `start_radius_km` jusqu'à
+    en trouver `count` dont la distance tient dans le rayon (tout trajet plus proche est
+    alors déjà dans le jeu), sans dépasser `max_radius_km`.
+    `kwargs` : ceux de search_trip_ids_nearby (origin, destination, status, passenger_count).
+    """
+    radius = min(start_radius_km, max_radius_km)
+    while True:
+        found = await search_trip_ids_nearby(db, departure_date, radius, **kwargs)
+        if radius >= max_radius_km or sum(1 for _, distance in found if distance <= radius) >= count:
+            return found[:count]
+        radius = min(radius * 2, max_radius_km)
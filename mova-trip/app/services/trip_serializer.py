@@ -0,0 +1,108 @@
+"""
+Sérialisation directe des trajets (sans re-validation pydantic).
+
+FastAPI valide puis sérialise chaque objet renvoyé à travers `response_model` :
+pour une liste de centaines de trajets, c'est l'essentiel du CPU de la requête.
+Les objets ORM lus ici sont déjà cohérents (colonnes typées), on les transforme
+donc en dictionnaires avec des `attrgetter` précompilés et on renvoie un JSON
+encodé par orjson (UUID, dates et heures natifs) dans une OrjsonResponse.
+
+Le format est celui de TripResponse (mêmes champs, même ordre) : les routes
+gardent `response_model` pour la documentation OpenAPI.
+"""
+import uuid
+from operator import attrgetter
+from typing import Any, Iterable, Optional
+
+import orjson
+from fastapi.responses import Response
+
+from app.db.schemas.preference import PreferenceResponse
+from app.db.schemas.stop import StopResponse
+from app.db.schemas.trip import TripResponse, TripStatus
+
+TRIP_FIELDS = (
+    "driver_id", "car_id", "departure_city", "destination_city", "departure_place",
+    "destination_place", "departure_time", "departure_date", "total_price",
+    "available_seats", "message", "status", "departure_lat", "departure_lon",
+    "destination_lat", "destination_lon", "id", "created_at", "updated_at",
+)
+PREFERENCE_FIELDS = (
+    "baggage", "pets_allowed", "smoking_allowed", "air_conditioning",
+    "bike_support", "ski_support", "mode_payment", "id",
+)
+STOP_FIELDS = ("id", "destination_city", "price", "stop_order", "destination_lat", "destination_lon")
+
+_trip_values = attrgetter(*TRIP_FIELDS)
+_preference_values = attrgetter(*PREFERENCE_FIELDS)
+_stop_values = attrgetter(*STOP_FIELDS)
+
+
+def preference_dict(preferences) -> Optional[dict]:
+    return None if preferences is None else dict(zip(PREFERENCE_FIELDS, _preference_values(preferences)))
+
+
+def stop_dict(stop) -> dict:
+    return dict(zip(STOP_FIELDS, _stop_values(stop)))
+
+
+def trip_dict(trip, preferences=None, stops=None) -> dict:
+    """
+    Trajet au format TripResponse. `preferences`/`stops` : à fournir quand les
+    relations ne sont pas chargées (trajet tout juste créé), sinon lues sur le trajet.
+    """
+    data = dict(zip(TRIP_FIELDS, _trip_values(trip)))
+    data["status"] = getattr(data["status"], "value", data["status"])
+    data["preferences"] = preference_dict(trip.preferences if preferences is None else preferences)
+    data["stops"] = [stop_dict(s) for s in (trip.stops if stops is None else stops) or []]
+    return data
+
+
+def trip_response(trip, preferences=None, stops=None) -> TripResponse:
+    """TripResponse construit sans validation (model_construct), pour les services qui renvoient un modèle."""
+    data = trip_dict(trip, preferences, stops)
+    if data["status"] is not None:
+        data["status"] = TripStatus(data["status"])
+    if data["preferences"] is not None:
+        data["preferences"] = PreferenceResponse.model_construct(**data["preferences"])
+    data["stops"] = [StopResponse.model_construct(**s) for s in data["stops"]]
+    return TripResponse.model_construct(**data)
+
+
+def _default(value: Any) -> str:
+    # UUID du pilote asyncpg : sous-classe de uuid.UUID, que orjson n'encode pas nativement
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type non sérialisable en JSON : {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+
+class OrjsonResponse(Response):
+    """Réponse JSON encodée par orjson (remplace ORJSONResponse, dépréciée par FastAPI)."""
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def json_response(content, status_code: int = 200, headers: Optional[dict] = None) -> OrjsonResponse:
+    return OrjsonResponse(content, status_code=status_code, headers=headers)
+
+
+def raw_json(payload: bytes) -> Response:
+    """JSON déjà encodé (cache de recherche) : aucune sérialisation dans la requête."""
+    return Response(payload, media_type="application/json")
+
+
+def trip_json(trip, headers: Optional[dict] = None) -> OrjsonResponse:
+    if isinstance(trip, TripResponse):
+        return json_response(trip.model_dump(), headers=headers)
+    return json_response(trip_dict(trip), headers=headers)
+
+
+def trips_json(trips: Iterable) -> OrjsonResponse:
+    return json_response([trip_dict(trip) for trip in trips])
@@ -1,117 +1,131 @@
 import logging
 import os
 import uuid
-import json
-from datetime import datetime, date
+from datetime import datetime, date, time, timedelta
 from enum import Enum
 from typing import List, Optional
 
 from dotenv import load_dotenv
 from fastapi import HTTPException
-from sqlalchemy import select, or_
+from sqlalchemy import inspect, insert, select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
-import aio_pika
+from sqlalchemy.orm import joinedload, selectinload
 
 # 🧩 Imports internes
+from app.core.amqp import amqp_client
+from app.core.config import settings
+from app.core.etag import make_etag
+from app.core.search_cache import search_cache, search_key, search_tag, trip_tags
+from app.core.trip_events import trip_event, trip_events
 from app.db.models.trip import Trip
 from app.db.models.preference import Preference
 from app.db.models.stop import Stop
+from app.db.models.trip_search import TripSearch
+from app.db.models.trip_segment import TripSegment
 from app.db.schemas.trip import (
     TripCreate,
     TripResponse,
     TripReserveSeat,
     TripCancelSeat,
+    TripRecurringCreate,
+    TripRecurringResponse,
 )
-from app.db.schemas.preference import PreferenceResponse
-from app.db.schemas.stop import StopResponse
-
-# ==============================
-# LOGGING CONFIGURATION
-# ==============================
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("trip_logs.log"), logging.StreamHandler()],
+from app.services.trip_serializer import dumps, trip_dict, trip_response
+from app.services.seat_inventory_service import available_seats_between, build_segments, change_seats
+from app.services.trip_search_service import (
+    build_search_rows,
+    flag_filters,
+    preferred_bits,
+    index_trip,
+    search_trip_ids,
+    search_trip_ids_by_day,
+    search_trip_ids_nearby,
+    nearest_trip_ids,
+    sync_trip_status,
 )
 
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
-RABBITMQ_URL = os.getenv("RABBITMQ_URL")
 QUEUE_NAME = os.getenv("QUEUE_NAME", "trip_notifications")
+MAX_RECURRING_OCCURRENCES = int(os.getenv("MAX_RECURRING_OCCURRENCES", 120))
+MAX_FLEXIBLE_SEARCH_DAYS = int(os.getenv("MAX_FLEXIBLE_SEARCH_DAYS", 14))
+MAX_NEARBY_RADIUS_KM = float(os.getenv("MAX_NEARBY_RADIUS_KM", 100))
+
+TRIP_COMPLETED_QUEUE_NAME = "trip_completed_queue"
+
+
+async def invalidate_trip_searches(trip) -> None:
+    """Recherches en cache pouvant contenir ce trajet (date, ville de départ), après commit."""
+    await search_cache.invalidate(trip_tags(trip.departure_date, trip.departure_city))
+
+
+async def publish_trip_update(trip) -> None:
+    """Places et statut aux clients abonnés (WebSocket/SSE), après commit."""
+    await trip_events.publish(trip_event(trip.id, trip.available_seats, trip.status, trip.updated_at))
+
 
 async def publish_trip_completed(trip_id: str):
     """
     Publie un événement quand un trip est complété
     Pour notifier payment_service de mettre les earnings en PAYABLE
     """
-    RABBITMQ_URL = os.getenv("RABBITMQ_URL")
-    QUEUE_NAME = "trip_completed_queue"
-    
-    if not RABBITMQ_URL:
-        logging.warning("RABBITMQ_URL non défini, skip publish trip_completed")
+    if not settings.RABBITMQ_URL:
+        logger.warning("RABBITMQ_URL non défini, skip publish trip_completed")
         return
     
     try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
-        async with connection:
-            channel = await connection.channel()
-            queue = await channel.declare_queue(QUEUE_NAME, durable=True)
-            
-            message_body = {
-                "event": "trip.completed",
-                "trip_id": trip_id,
-                "completed_at": datetime.utcnow().isoformat()
-            }
-            
-            message = aio_pika.Message(
-                body=json.dumps(message_body).encode("utf-8"),
-                content_type="application/json",
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-            )
-            
-            await channel.default_exchange.publish(message, routing_key=QUEUE_NAME)
-            logging.info(f"✅ Événement trip.completed publié pour trip {trip_id}")
+        # Connexion partagée du processus (ouverte par le lifespan)
+        await amqp_client.publish(TRIP_COMPLETED_QUEUE_NAME, {
+            "event": "trip.completed",
+            "trip_id": trip_id,
+            "completed_at": datetime.utcnow().isoformat()
+        })
+        logger.info(f"✅ Événement trip.completed publié pour trip {trip_id}")
     
     except Exception as e:
-        logging.error(f"❌ Erreur publication trip.completed: {e}")
+        logger.error(f"❌ Erreur publication trip.completed: {e}")
 
 
 # =========================================================
 # 🔧 MISE À JOUR DU NOMBRE DE PLACES DISPONIBLES
 # =========================================================
-async def update_available_seats(db: AsyncSession, trip_id: str, delta: int):
+async def update_available_seats(
+    db: AsyncSession,
+    trip_id: str,
+    delta: int,
+    stop_id: Optional[str] = None,
+    from_stop_id: Optional[str] = None,
+):
     """
     🔁 Met à jour de manière sécurisée le nombre de places disponibles pour un trajet.
-    delta peut être positif (+) ou négatif (-).
+    delta peut être positif (+) ou négatif (-). Seuls les tronçons de `from_stop_id`
+    (montée, défaut : départ) à `stop_id` (descente, défaut : destination) sont concernés.
     """
     try:
-        query = select(Trip).where(Trip.id == trip_id)
+        # Verrou sur le trajet : les mouvements de places d'un même trajet sont sérialisés
+        query = select(Trip).where(Trip.id == trip_id).with_for_update()
         result = await db.execute(query)
         trip = result.scalars().first()
 
         if not trip:
-            logging.error(f"[TripService] ❌ Trajet {trip_id} introuvable.")
+            logger.error(f"[TripService] ❌ Trajet {trip_id} introuvable.")
             raise HTTPException(status_code=404, detail="Trajet introuvable")
 
-        new_value = trip.available_seats + delta
-
-        if new_value < 0:
-            logging.warning(
-                f"[TripService] ⚠️ Tentative de retirer trop de places : {trip.available_seats} dispo, delta={delta}"
-            )
-            raise HTTPException(status_code=400, detail="Pas assez de places disponibles")
-
-        if hasattr(trip, "max_seats"):
-            new_value = min(new_value, trip.max_seats)
-
-        trip.available_seats = new_value
+        trip.available_seats = await change_seats(
+            db, trip.id, delta,
+            to_stop_id=uuid.UUID(str(stop_id)) if stop_id else None,
+            from_stop_id=uuid.UUID(str(from_stop_id)) if from_stop_id else None,
+        )
         trip.updated_at = datetime.utcnow()
 
         await db.commit()
         await db.refresh(trip)
+        await invalidate_trip_searches(trip)
+        await publish_trip_update(trip)
 
-        logging.info(
+        logger.info(
             f"[TripService] ✅ Trajet {trip_id}: places modifiées ({delta:+d}), "
             f"nouvelles disponibles: {trip.available_seats}"
         )
@@ -119,10 +133,11 @@ async def update_available_seats(db: AsyncSession, trip_id: str, delta: int):
         return trip
 
     except HTTPException:
+        await db.rollback()
         raise
     except Exception as e:
         await db.rollback()
-        logging.error(f"[TripService] ❌ Erreur lors de la mise à jour des places: {e}")
+        logger.error(f"[TripService] ❌ Erreur lors de la mise à jour des places: {e}")
         raise HTTPException(status_code=500, detail="Erreur interne lors de la mise à jour du trajet")
 
 
@@ -132,22 +147,11 @@ async def update_available_seats(db: AsyncSession, trip_id: str, delta: int):
 async def send_trip_creation_notification(trip_data: dict) -> None:
     """Envoi d'un message structuré à RabbitMQ pour la création d'un voyage."""
     try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
-        async with connection:
-            channel = await connection.channel()
-            queue = await channel.declare_queue(QUEUE_NAME, durable=True)
-
-            message_json = json.dumps(trip_data, default=str)
-            message = aio_pika.Message(
-                body=message_json.encode(),
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-            )
-
-            await channel.default_exchange.publish(message, routing_key=queue.name)
-            logging.info(f"📤 Message envoyé à RabbitMQ pour le voyage ID: {trip_data.get('id')}")
+        await amqp_client.publish(QUEUE_NAME, trip_data)
+        logger.info(f"📤 Message envoyé à RabbitMQ pour le voyage ID: {trip_data.get('id')}")
 
     except Exception as e:
-        logging.error(f"Erreur lors de l'envoi du message RabbitMQ : {str(e)}")
+        logger.error(f"Erreur lors de l'envoi du message RabbitMQ : {str(e)}")
 
 
 # =========================================================
@@ -169,6 +173,10 @@ async def create_trip_service(db: AsyncSession, trip_data: TripCreate) -> TripRe
         available_seats=trip_data.available_seats,
         message=trip_data.message,
         status=trip_data.status,
+        departure_lat=trip_data.departure_lat,
+        departure_lon=trip_data.departure_lon,
+        destination_lat=trip_data.destination_lat,
+        destination_lon=trip_data.destination_lon,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
     )
@@ -192,17 +200,27 @@ async def create_trip_service(db: AsyncSession, trip_data: TripCreate) -> TripRe
 
         stops = []
         if trip_data.stops:
-            for stop_data in trip_data.stops:
+            # Ordre de l'itinéraire : stop_order fourni, puis ordre de la liste
+            ordered = sorted(trip_data.stops, key=lambda s: s.stop_order or 0)
+            for position, stop_data in enumerate(ordered, start=1):
                 stop = Stop(
                     id=uuid.uuid4(),
                     trip_id=trip_id,
                     destination_city=stop_data.destination_city,
                     price=stop_data.price,
+                    stop_order=position,
+                    destination_lat=stop_data.destination_lat,
+                    destination_lon=stop_data.destination_lon,
                 )
                 db.add(stop)
                 stops.append(stop)
 
+        # Inventaire par tronçon et modèle de lecture de la recherche, dans la même transaction
+        db.add_all(build_segments(trip, stops))
+        await index_trip(db, trip, preferences, stops)
+
         await db.commit()
+        await invalidate_trip_searches(trip)
 
         try:
             await send_trip_creation_notification({
@@ -215,52 +233,120 @@ async def create_trip_service(db: AsyncSession, trip_data: TripCreate) -> TripRe
                 "created_at": trip.created_at.isoformat(),
             })
         except Exception as e:
-            logging.warning(f"Échec notification RabbitMQ: {e}")
-
-        return TripResponse(
-            id=trip.id,
-            driver_id=trip.driver_id,
-            car_id=trip.car_id,
-            departure_city=trip.departure_city,
-            destination_city=trip.destination_city,
-            departure_place=trip.departure_place,
-            destination_place=trip.destination_place,
-            departure_time=trip.departure_time,
-            departure_date=trip.departure_date,
-            total_price=trip.total_price,
-            available_seats=trip.available_seats,
-            message=trip.message,
-            status=trip.status,
-            created_at=trip.created_at,
-            updated_at=trip.updated_at,
-            preferences=PreferenceResponse(
-                id=preferences.id,
-                trip_id=preferences.trip_id,
-                baggage=preferences.baggage,
-                pets_allowed=preferences.pets_allowed,
-                smoking_allowed=preferences.smoking_allowed,
-                air_conditioning=preferences.air_conditioning,
-                bike_support=preferences.bike_support,
-                ski_support=preferences.ski_support,
-                mode_payment=preferences.mode_payment,
-            ),
-            stops=[
-                StopResponse(
-                    id=s.id,
-                    trip_id=s.trip_id,
-                    destination_city=s.destination_city,
-                    price=s.price,
-                )
-                for s in stops
-            ],
-        )
+            logger.warning(f"Échec notification RabbitMQ: {e}")
+
+        return trip_response(trip, preferences, stops)
 
     except Exception as e:
         await db.rollback()
-        logging.error(f"Erreur création trajet: {str(e)}")
+        logger.error(f"Erreur création trajet: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erreur lors de la création du trajet: {e}")
 
 
+# =========================================================
+# 🔁 CRÉATION EN SÉRIE (TRAJETS RÉCURRENTS)
+# =========================================================
+def recurring_dates(data: TripRecurringCreate) -> List[date]:
+    """Dates de la série : jours `weekdays` de start_date à end_date, à partir d'aujourd'hui."""
+    first = max(data.start_date, date.today())
+    weekdays = set(data.weekdays)
+    return [
+        day for day in (first + timedelta(days=n) for n in range((data.end_date - first).days + 1))
+        if day.weekday() in weekdays
+    ]
+
+
+def _column_values(obj) -> dict:
+    """Colonnes renseignées d'un objet ORM transitoire → ligne d'un INSERT multi-lignes."""
+    values = inspect(obj).dict
+    return {attr.key: values[attr.key] for attr in inspect(type(obj)).column_attrs if attr.key in values}
+
+
+async def create_recurring_trips_service(db: AsyncSession, data: TripRecurringCreate) -> TripRecurringResponse:
+    """
+    Une occurrence par date de la série, avec préférences, arrêts, tronçons et lignes
+    trip_search : un INSERT multi-lignes par table, une transaction, une notification.
+    """
+    dates = recurring_dates(data)
+    if not dates:
+        raise HTTPException(status_code=400, detail="Aucune date à venir dans cette série")
+    if len(dates) > MAX_RECURRING_OCCURRENCES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Série trop longue : {len(dates)} trajets (maximum {MAX_RECURRING_OCCURRENCES})",
+        )
+
+    now = datetime.utcnow()
+    ordered_stops = sorted(data.stops or [], key=lambda s: s.stop_order or 0)
+    rows = {Trip: [], Preference: [], Stop: [], TripSegment: [], TripSearch: []}
+    for departure_date in dates:
+        trip = Trip(
+            id=uuid.uuid4(),
+            car_id=data.car_id,
+            driver_id=data.driver_id,
+            departure_city=data.departure_city,
+            destination_city=data.destination_city,
+            departure_place=data.departure_place,
+            destination_place=data.destination_place,
+            departure_time=data.departure_time,
+            departure_date=departure_date,
+            total_price=data.total_price,
+            available_seats=data.available_seats,
+            message=data.message,
+            status="pending",
+            departure_lat=data.departure_lat,
+            departure_lon=data.departure_lon,
+            destination_lat=data.destination_lat,
+            destination_lon=data.destination_lon,
+            created_at=now,
+            updated_at=now,
+        )
+        preferences = Preference(id=uuid.uuid4(), trip_id=trip.id, **data.preferences.dict())
+        stops = [
+            Stop(
+                id=uuid.uuid4(),
+                trip_id=trip.id,
+                destination_city=stop_data.destination_city,
+                price=stop_data.price,
+                stop_order=position,
+                destination_lat=stop_data.destination_lat,
+                destination_lon=stop_data.destination_lon,
+            )
+            for position, stop_data in enumerate(ordered_stops, start=1)
+        ]
+        for obj in (trip, preferences, *stops, *build_segments(trip, stops), *build_search_rows(trip, preferences, stops)):
+            rows[type(obj)].append(_column_values(obj))
+
+    try:
+        # Ordre des clés étrangères : trips d'abord
+        for model, model_rows in rows.items():
+            if model_rows:
+                await db.execute(insert(model), model_rows)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"❌ Erreur lors de la création de la série de trajets : {e}")
+        raise HTTPException(status_code=500, detail="Erreur lors de la création des trajets récurrents")
+
+    await search_cache.invalidate(
+        [tag for departure_date in dates for tag in trip_tags(departure_date, data.departure_city)]
+    )
+
+    occurrences = [{"id": row["id"], "departure_date": row["departure_date"]} for row in rows[Trip]]
+    await send_trip_creation_notification({
+        "action": "trips_created",
+        "driver_id": str(data.driver_id),
+        "departure_city": data.departure_city,
+        "destination_city": data.destination_city,
+        "departure_time": data.departure_time.isoformat(),
+        "created_at": now.isoformat(),
+        "trips": [{"id": str(o["id"]), "departure_date": o["departure_date"].isoformat()} for o in occurrences],
+    })
+
+    logger.info(f"🔁 {len(occurrences)} trajet(s) récurrent(s) créé(s) pour le conducteur {data.driver_id}")
+    return TripRecurringResponse(count=len(occurrences), trips=occurrences)
+
+
 # =========================================================
 # 🔎 RECHERCHE ET CONSULTATION DE TRAJETS
 # =========================================================
@@ -274,11 +360,32 @@ async def get_trip_by_id_service(db: AsyncSession, trip_id: uuid.UUID) -> TripRe
     trip = result.scalars().first()
 
     if not trip:
-        logging.error(f"Voyage {trip_id} non trouvé.")
+        logger.error(f"Voyage {trip_id} non trouvé.")
         raise HTTPException(status_code=404, detail="Voyage non trouvé.")
     return trip
 
 
+async def get_trip_snapshots_service(db: AsyncSession, trip_ids: List[uuid.UUID]) -> List[dict]:
+    """État courant (places, statut) des trajets suivis, au format des événements temps réel."""
+    result = await db.execute(
+        select(Trip.id, Trip.available_seats, Trip.status, Trip.updated_at).where(Trip.id.in_(trip_ids))
+    )
+    return [trip_event(*row) for row in result.all()]
+
+
+def trip_etag(trip_id, updated_at, available_seats, status) -> str:
+    """ETag d'un trajet : toute écriture du trip service touche au moins une de ces colonnes."""
+    return make_etag(trip_id, updated_at, available_seats, getattr(status, "value", status))
+
+
+async def get_trip_etag_service(db: AsyncSession, trip_id: uuid.UUID) -> Optional[str]:
+    """Lecture étroite (clé primaire, 3 colonnes) pour If-None-Match ; None si le trajet n'existe pas."""
+    row = (await db.execute(
+        select(Trip.updated_at, Trip.available_seats, Trip.status).where(Trip.id == trip_id)
+    )).first()
+    return trip_etag(trip_id, *row) if row else None
+
+
 async def search_trips_service(
     db: AsyncSession,
     departure_city: Optional[str],
@@ -287,25 +394,225 @@ async def search_trips_service(
     status: str = "pending",
     skip: int = 0,
     limit: int = 100,
+    passenger_count: Optional[int] = None,
+    price_limit: Optional[float] = None,
+    max_two_stops: bool = False,
+    smoking_allowed: Optional[bool] = None,
+    pets_allowed: Optional[bool] = None,
+    ac_available: Optional[bool] = None,
+    bike_space: Optional[bool] = None,
+    ski_space: Optional[bool] = None,
+    payment_method: Optional[str] = None,
+    sort: str = "earliest",
+    preferred: Optional[List[str]] = None,
 ) -> List[TripResponse]:
-    query = (
+    """
+    Filtrage et classement sur le modèle de lecture trip_search (parcours de l'index),
+    puis chargement des seuls trajets retenus par clé primaire, dans l'ordre du classement.
+    La destination peut être la destination finale ou un arrêt.
+    sort : earliest | cheapest | fewest_stops | best_match (préférences `preferred` d'abord).
+    """
+    try:
+        wished_flags = preferred_bits(preferred)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    required_flags, excluded_flags = flag_filters(
+        smoking_allowed=smoking_allowed,
+        pets_allowed=pets_allowed,
+        air_conditioning=ac_available,
+        bike_support=bike_space,
+        ski_support=ski_space,
+    )
+    trip_ids = await search_trip_ids(
+        db,
+        departure_date=departure_date,
+        status=status,
+        departure_city=departure_city,
+        destination_city=destination_city,
+        passenger_count=passenger_count,
+        price_limit=price_limit,
+        max_stops=2 if max_two_stops else None,
+        required_flags=required_flags,
+        excluded_flags=excluded_flags,
+        payment_method=payment_method,
+        sort=sort,
+        preferred_flags=wished_flags,
+        skip=skip,
+        limit=limit,
+    )
+    if not trip_ids:
+        logger.info("🔍 0 trajet(s) trouvé(s)")
+        return []
+
+    result = await db.execute(
         select(Trip)
-        .options(joinedload(Trip.preferences), joinedload(Trip.stops))
-        .filter(Trip.status == status, Trip.departure_date == departure_date)
+        .options(selectinload(Trip.preferences), selectinload(Trip.stops))
+        .where(Trip.id.in_(trip_ids))
     )
+    by_id = {trip.id: trip for trip in result.scalars().all()}
+    trips = [by_id[trip_id] for trip_id in trip_ids if trip_id in by_id]
 
-    if departure_city:
-        query = query.filter(Trip.departure_city.ilike(f"%{departure_city}%"))
-    if destination_city:
-        query = query.filter(Trip.destination_city.ilike(f"%{destination_city}%"))
+    logger.info(f"🔍 {len(trips)} trajet(s) trouvé(s)")
+    return trips
 
-    result = await db.execute(query.offset(skip).limit(limit))
-    trips = result.scalars().unique().all()
 
-    logging.info(f"🔍 {len(trips)} trajet(s) trouvé(s)")
+async def search_trips_by_day_service(
+    db: AsyncSession,
+    departure_city: str,
+    date_from: date,
+    date_to: date,
+    time_from: Optional[time] = None,
+    time_to: Optional[time] = None,
+    destination_city: Optional[str] = None,
+    status: str = "pending",
+    per_day: int = 20,
+    passenger_count: Optional[int] = None,
+    price_limit: Optional[float] = None,
+    max_two_stops: bool = False,
+    smoking_allowed: Optional[bool] = None,
+    pets_allowed: Optional[bool] = None,
+    ac_available: Optional[bool] = None,
+    bike_space: Optional[bool] = None,
+    ski_space: Optional[bool] = None,
+    payment_method: Optional[str] = None,
+    sort: str = "earliest",
+    preferred: Optional[List[str]] = None,
+) -> dict:
+    """
+    Recherche flexible (plusieurs jours, créneau horaire) : une requête sur trip_search
+    pour toute la plage, groupée par jour avec le nombre de trajets de chaque jour
+    (0 compris), puis chargement des trajets retenus par clé primaire.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to doit être postérieure ou égale à date_from")
+    if (date_to - date_from).days + 1 > MAX_FLEXIBLE_SEARCH_DAYS:
+        raise HTTPException(status_code=400, detail=f"Plage limitée à {MAX_FLEXIBLE_SEARCH_DAYS} jours")
+    try:
+        wished_flags = preferred_bits(preferred)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    required_flags, excluded_flags = flag_filters(
+        smoking_allowed=smoking_allowed,
+        pets_allowed=pets_allowed,
+        air_conditioning=ac_available,
+        bike_support=bike_space,
+        ski_support=ski_space,
+    )
+    days = await search_trip_ids_by_day(
+        db,
+        departure_city=departure_city,
+        date_from=date_from,
+        date_to=date_to,
+        time_from=time_from,
+        time_to=time_to,
+        status=status,
+        sort=sort,
+        preferred_flags=wished_flags,
+        per_day=per_day,
+        destination_city=destination_city,
+        passenger_count=passenger_count,
+        price_limit=price_limit,
+        max_stops=2 if max_two_stops else None,
+        required_flags=required_flags,
+        excluded_flags=excluded_flags,
+        payment_method=payment_method,
+    )
+
+    trip_ids = [trip_id for _, ids in days.values() for trip_id in ids]
+    by_id = {}
+    if trip_ids:
+        result = await db.execute(
+            select(Trip)
+            .options(selectinload(Trip.preferences), selectinload(Trip.stops))
+            .where(Trip.id.in_(trip_ids))
+        )
+        by_id = {trip.id: trip for trip in result.scalars().all()}
+
+    calendar = []
+    for offset in range((date_to - date_from).days + 1):
+        day = date_from + timedelta(days=offset)
+        count, ids = days.get(day, (0, []))
+        calendar.append({
+            "date": day,
+            "count": count,
+            "trips": [trip_dict(by_id[trip_id]) for trip_id in ids if trip_id in by_id],
+        })
+
+    total = sum(d["count"] for d in calendar)
+    logger.info(f"🔍 {total} trajet(s) trouvé(s) du {date_from} au {date_to}")
+    return {"total": total, "days": calendar}
+
+
+async def search_trips_nearby_service(
+    db: AsyncSession,
+    departure_date: date,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    destination_lat: Optional[float] = None,
+    destination_lon: Optional[float] = None,
+    radius_km: float = 15.0,
+    nearest: Optional[int] = None,
+    status: str = "pending",
+    passenger_count: Optional[int] = None,
+    limit: int = 100,
+) -> List[dict]:
+    """
+    Trajets autour d'un point de départ et/ou d'arrivée (index geohash de trip_search) :
+    dans un rayon `radius_km`, ou les `nearest` plus proches (rayon élargi jusqu'à
+    MAX_NEARBY_RADIUS_KM). Chaque trajet porte sa distance `distance_km`.
+    """
+    origin = (lat, lon) if lat is not None and lon is not None else None
+    destination = (
+        (destination_lat, destination_lon)
+        if destination_lat is not None and destination_lon is not None else None
+    )
+    if origin is None and destination is None:
+        raise HTTPException(status_code=400, detail="lat/lon ou destination_lat/destination_lon requis")
+    if radius_km > MAX_NEARBY_RADIUS_KM:
+        raise HTTPException(status_code=400, detail=f"Rayon limité à {MAX_NEARBY_RADIUS_KM:g} km")
+
+    params = dict(origin=origin, destination=destination, status=status, passenger_count=passenger_count)
+    if nearest:
+        found = await nearest_trip_ids(db, departure_date, nearest, MAX_NEARBY_RADIUS_KM, **params)
+    else:
+        found = (await search_trip_ids_nearby(db, departure_date, radius_km, **params))[:limit]
+    if not found:
+        logger.info("📍 0 trajet(s) à proximité")
+        return []
+
+    result = await db.execute(
+        select(Trip)
+        .options(selectinload(Trip.preferences), selectinload(Trip.stops))
+        .where(Trip.id.in_([trip_id for trip_id, _ in found]))
+    )
+    by_id = {trip.id: trip for trip in result.scalars().all()}
+    trips = [
+        {**trip_dict(by_id[trip_id]), "distance_km": round(distance, 3)}
+        for trip_id, distance in found if trip_id in by_id
+    ]
+
+    logger.info(f"📍 {len(trips)} trajet(s) à proximité")
     return trips
 
 
+async def cached_search_trips_service(db: AsyncSession, **params) -> bytes:
+    """
+    search_trips_service derrière le cache de recherche (app.core.search_cache) :
+    réponse JSON encodée une fois, clé normalisée, invalidée par (date, ville de départ).
+    """
+    key = search_key(params)
+    cached = await search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    trips = await search_trips_service(db, **params)
+    payload = dumps([trip_dict(trip) for trip in trips])
+    await search_cache.set(key, search_tag(params["departure_date"], params.get("departure_city")), payload)
+    return payload
+
+
 async def search_trips_advanced_service(
     db: AsyncSession,
     departure_city: Optional[str],
@@ -333,7 +640,7 @@ async def search_trips_advanced_service(
 
     result = await db.execute(query.offset(skip).limit(limit))
     trips = result.scalars().unique().all()
-    logging.info(f"🔍 {len(trips)} trajet(s) trouvé(s)")
+    logger.info(f"🔍 {len(trips)} trajet(s) trouvé(s)")
     return trips
 
 
@@ -372,40 +679,83 @@ async def get_trip_by_driver_id_service(db: AsyncSession, driver_id: uuid.UUID)
 # 🎟️ RÉSERVATION / ANNULATION DE PLACES
 # =========================================================
 async def reserve_seat_service(db: AsyncSession, data: TripReserveSeat) -> Trip:
-    query = select(Trip).where(Trip.id == data.trip_id)
+    query = select(Trip).where(Trip.id == data.trip_id).with_for_update()
     result = await db.execute(query)
     trip = result.scalars().first()
 
     if not trip:
         raise HTTPException(status_code=404, detail="Trajet non trouvé")
 
-    if trip.available_seats <= 0 or trip.available_seats < data.seats:
+    if data.seats <= 0:
         raise HTTPException(status_code=400, detail="Aucune place disponible")
 
-    trip.available_seats -= data.seats
+    try:
+        trip.available_seats = await change_seats(
+            db, trip.id, -data.seats, to_stop_id=data.stop_id, from_stop_id=data.from_stop_id
+        )
+    except HTTPException:
+        await db.rollback()
+        raise
     trip.updated_at = datetime.utcnow()
 
     await db.commit()
     await db.refresh(trip)
+    await invalidate_trip_searches(trip)
+    await publish_trip_update(trip)
     return trip
 
 
 async def cancel_seat_reservation_service(db: AsyncSession, data: TripCancelSeat) -> Trip:
-    query = select(Trip).where(Trip.id == data.trip_id)
+    query = select(Trip).where(Trip.id == data.trip_id).with_for_update()
     result = await db.execute(query)
     trip = result.scalars().first()
 
     if not trip:
         raise HTTPException(status_code=404, detail="Trajet non trouvé")
 
-    trip.available_seats += data.seats
+    try:
+        trip.available_seats = await change_seats(
+            db, trip.id, data.seats, to_stop_id=data.stop_id, from_stop_id=data.from_stop_id
+        )
+    except HTTPException:
+        await db.rollback()
+        raise
     trip.updated_at = datetime.utcnow()
 
     await db.commit()
     await db.refresh(trip)
+    await invalidate_trip_searches(trip)
+    await publish_trip_update(trip)
     return trip
 
 
+async def get_available_seats_between_service(
+    db: AsyncSession,
+    trip_id: uuid.UUID,
+    from_city: Optional[str] = None,
+    to_city: Optional[str] = None,
+    to_stop_id: Optional[uuid.UUID] = None,
+    from_stop_id: Optional[uuid.UUID] = None,
+) -> dict:
+    """
+    Places vendables de `from_city`/`from_stop_id` (défaut : départ)
+    à `to_city`/`to_stop_id` (défaut : destination).
+    """
+    trip = await db.get(Trip, trip_id)
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trajet non trouvé")
+
+    seats = await available_seats_between(db, trip_id, from_city, to_city, to_stop_id, from_stop_id)
+    return {
+        "trip_id": trip_id,
+        "from_city": from_city or (None if from_stop_id else trip.departure_city),
+        "from_stop_id": from_stop_id,
+        "to_city": to_city or (None if to_stop_id else trip.destination_city),
+        "to_stop_id": to_stop_id,
+        "available_seats": seats,
+    }
+
+
 # =========================================================
 # 🧭 RECHERCHES AVANCÉES
 # =========================================================
@@ -439,12 +789,6 @@ def is_valid_transition(current_status: TripStatus, new_status: TripStatus) -> b
     return new_status in transitions.get(current_status, [])
 
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from app.db.schemas.trip import TripResponse, PreferenceResponse, StopResponse
-import uuid
-from fastapi import HTTPException
-
 async def update_trip_status_service(db: AsyncSession, trip_id: uuid.UUID, new_status: TripStatus) -> TripResponse:
     # 1) lire le trip sans lazy
     res = await db.execute(
@@ -462,7 +806,10 @@ async def update_trip_status_service(db: AsyncSession, trip_id: uuid.UUID, new_s
     # 2) update + commit
     trip.status = new_status
     trip.updated_at = datetime.utcnow()
+    await sync_trip_status(db, trip_id, new_status)
     await db.commit()
+    await invalidate_trip_searches(trip)
+    await publish_trip_update(trip)
 
         # 🆕 Si le trip passe en COMPLETED, publier événement
     if new_status == TripStatus.COMPLETED:
@@ -476,43 +823,9 @@ async def update_trip_status_service(db: AsyncSession, trip_id: uuid.UUID, new_s
     )
     trip = res.scalars().first()
 
-    # 4) map -> TripResponse (pas d’accès lazy ici)
-    return TripResponse(
-        id=trip.id,
-        driver_id=trip.driver_id,
-        car_id=trip.car_id,
-        departure_city=trip.departure_city,
-        destination_city=trip.destination_city,
-        departure_place=trip.departure_place,
-        destination_place=trip.destination_place,
-        departure_time=trip.departure_time,
-        departure_date=trip.departure_date,
-        total_price=trip.total_price,
-        available_seats=trip.available_seats,
-        message=trip.message,
-        status=trip.status,
-        created_at=trip.created_at,
-        updated_at=trip.updated_at,
-        preferences=PreferenceResponse(
-            id=trip.preferences.id,
-            trip_id=trip.preferences.trip_id,
-            baggage=trip.preferences.baggage,
-            pets_allowed=trip.preferences.pets_allowed,
-            smoking_allowed=trip.preferences.smoking_allowed,
-            air_conditioning=trip.preferences.air_conditioning,
-            bike_support=trip.preferences.bike_support,
-            ski_support=trip.preferences.ski_support,
-            mode_payment=trip.preferences.mode_payment,
-        ) if trip.preferences else None,
-        stops=[
-            StopResponse(
-                id=s.id,
-                trip_id=s.trip_id,
-                destination_city=s.destination_city,
-                price=s.price,
-            ) for s in trip.stops or []
-        ],
-    )
+    # 4) TripResponse sans re-validation (relations chargées ci-dessus)
+    return trip_response(trip)
+
 
 # =========================================================
 # 📅 TRAJETS PAR DATE OU CONDUCTEUR
@@ -0,0 +1,51 @@
+"""
+Coût CPU de la sérialisation des réponses, par endpoint, sans base ni HTTP.
+
+`*_response_model` reproduit ce que fait FastAPI avec `response_model` sur des objets
+ORM (validation from_attributes puis dump JSON) ; `*_orjson` est le chemin des routes
+(app.services.trip_serializer). Les trajets sont chargés une fois, relations comprises.
+"""
+from typing import List
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.db.schemas.trip import TripResponse
+from app.services.trip_serializer import trip_json, trips_json
+from app.services.trip_service import get_trip_by_id_service, search_trips_service
+
+TRIPS = TypeAdapter(List[TripResponse])
+
+
+@pytest.fixture(scope="module")
+def day_trips(call, dataset):
+    """Page de recherche la plus lourde : tous les trajets du jour le plus chargé (limite 100)."""
+    _, _, day = dataset["busiest_route"]
+    trips = call(search_trips_service, None, None, day)
+    assert trips
+    return trips
+
+
+@pytest.fixture(scope="module")
+def one_trip(call, day_trips):
+    return call(get_trip_by_id_service, day_trips[0].id)
+
+
+def bench_search_trips_response_model(benchmark, day_trips):
+    body = benchmark(lambda: TRIPS.dump_json(TRIPS.validate_python(day_trips, from_attributes=True)))
+    assert body.startswith(b"[")
+
+
+def bench_search_trips_orjson(benchmark, day_trips):
+    body = benchmark(lambda: trips_json(day_trips).body)
+    assert body.startswith(b"[")
+
+
+def bench_get_trip_by_id_response_model(benchmark, one_trip):
+    body = benchmark(lambda: TripResponse.model_validate(one_trip, from_attributes=True).model_dump_json())
+    assert body
+
+
+def bench_get_trip_by_id_orjson(benchmark, one_trip):
+    body = benchmark(lambda: trip_json(one_trip).body)
+    assert body
@@ -0,0 +1,85 @@
+"""Micro-benchmarks : recherche de trajets (base, plage de dates, proximité et cache) et mise à jour des places (voir conftest.py)."""
+from datetime import time, timedelta
+from itertools import count
+
+from app.services.trip_service import (
+    cached_search_trips_service,
+    search_trips_by_day_service,
+    search_trips_nearby_service,
+    search_trips_service,
+    update_available_seats,
+)
+
+
+def bench_search_trips_by_route(benchmark, call, dataset):
+    departure, destination, day = dataset["busiest_route"]
+    trips = benchmark(call, search_trips_service, departure, destination, day)
+    assert trips
+
+
+def bench_search_trips_cheapest(benchmark, call, dataset):
+    departure, destination, day = dataset["busiest_route"]
+    trips = benchmark(call, search_trips_service, departure, destination, day, sort="cheapest")
+    assert trips
+
+
+def bench_search_trips_best_match(benchmark, call, dataset):
+    departure, destination, day = dataset["busiest_route"]
+    trips = benchmark(
+        call, search_trips_service, departure, destination, day,
+        sort="best_match", preferred=["air_conditioning", "baggage"],
+    )
+    assert trips
+
+
+def bench_search_trips_by_date(benchmark, call, dataset):
+    _, _, day = dataset["busiest_route"]
+    trips = benchmark(call, search_trips_service, None, None, day)
+    assert trips
+
+
+def bench_search_trips_flexible(benchmark, call, dataset):
+    departure, destination, day = dataset["busiest_route"]
+    result = benchmark(
+        call, search_trips_by_day_service, departure, day - timedelta(days=3), day + timedelta(days=3),
+        time_from=time(6), time_to=time(12), destination_city=destination,
+    )
+    assert result["days"]
+
+
+def bench_search_trips_nearby(benchmark, call, dataset):
+    departure, _, day = dataset["busiest_route"]
+    lat, lon = dataset["city_coords"][departure]
+    trips = benchmark(call, search_trips_nearby_service, day, lat=lat, lon=lon, radius_km=15)
+    assert trips
+
+
+def bench_search_trips_nearest(benchmark, call, dataset):
+    departure, destination, day = dataset["busiest_route"]
+    coords = dataset["city_coords"]
+    (lat, lon), (dest_lat, dest_lon) = coords[departure], coords[destination]
+    trips = benchmark(
+        call, search_trips_nearby_service, day, lat=lat, lon=lon,
+        destination_lat=dest_lat, destination_lon=dest_lon, nearest=5,
+    )
+    assert trips
+
+
+def bench_search_trips_cached(benchmark, call, dataset):
+    departure, destination, day = dataset["busiest_route"]
+    params = dict(departure_city=departure, destination_city=destination, departure_date=day, status="pending")
+    call(cached_search_trips_service, **params)  # premier appel : remplit le cache
+    payload = benchmark(call, cached_search_trips_service, **params)
+    assert payload != b"[]"
+
+
+def bench_update_available_seats(benchmark, call, dataset):
+    trip_id = dataset["trip_ids"][0]
+    turns = count()
+
+    # Alterne -1 / +1 : le trajet garde le même nombre de places d'un round à l'autre
+    def reserve_then_release():
+        return call(update_available_seats, trip_id, -1 if next(turns) % 2 == 0 else 1)
+
+    trip = benchmark(reserve_then_release)
+    assert trip.available_seats >= 9_999
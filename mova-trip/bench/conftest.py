@@ -0,0 +1,159 @@
+"""
+Micro-benchmarks de la couche service (pytest-benchmark), sous le niveau HTTP.
+
+La base est lue dans BENCH_DATABASE_URL (défaut : fichier SQLite local via aiosqlite).
+Elle remplace DATABASE_URL avant l'import de `app` ; ses tables sont vidées puis
+ré-alimentées à chaque run. Une base PostgreSQL doit être dédiée (« bench » dans son nom)
+et reçoit les migrations Alembic, donc les mêmes index qu'en production.
+
+Depuis mova-trip/ :
+    python -m pytest bench --bench-size 5000 --benchmark-save=baseline
+    python -m pytest bench --bench-size 5000 --benchmark-compare   # échoue si régression > seuil (pytest.ini)
+"""
+import asyncio
+import os
+import random
+import uuid
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite+aiosqlite:///./bench.sqlite3")
+if not BENCH_DATABASE_URL.startswith("sqlite") and "bench" not in BENCH_DATABASE_URL.rsplit("/", 1)[-1]:
+    raise pytest.UsageError("BENCH_DATABASE_URL doit viser une base dédiée (nom contenant « bench »)")
+
+os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+os.environ["RABBITMQ_URL"] = ""  # aucune publication pendant les mesures
+
+from app.db.base import Base  # noqa: E402
+from app.db.database import async_session, dispose_engine, get_engine  # noqa: E402
+from app.db.models.preference import Preference  # noqa: E402
+from app.db.models.stop import Stop  # noqa: E402
+from app.db.models.trip import Trip  # noqa: E402
+from app.db.models.trip_search import TripSearch  # noqa: E402,F401
+from app.db.models.trip_segment import TripSegment  # noqa: E402,F401
+from app.services.seat_inventory_service import build_segments  # noqa: E402
+from app.services.trip_search_service import build_search_rows  # noqa: E402
+
+CITIES = [
+    "montreal", "quebec", "ottawa", "sherbrooke", "gatineau", "laval",
+    "trois-rivieres", "mirabel", "moncton", "fredericton",
+]
+# Centre-ville (lat, lon) : points de départ / d'arrivée tirés à quelques km autour
+CITY_COORDS = {
+    "montreal": (45.5017, -73.5673), "quebec": (46.8139, -71.2080), "ottawa": (45.4215, -75.6972),
+    "sherbrooke": (45.4042, -71.8929), "gatineau": (45.4765, -75.7013), "laval": (45.6066, -73.7124),
+    "trois-rivieres": (46.3432, -72.5477), "mirabel": (45.6501, -74.0824), "moncton": (46.0878, -64.7782),
+    "fredericton": (45.9636, -66.6431),
+}
+DAYS = 14
+BATCH = 1000
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-size", type=int, default=int(os.getenv("BENCH_SIZE", 1000)),
+        help="nombre de trajets du jeu de données",
+    )
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Exécute une coroutine sur l'unique boucle du bench (le pool SQL y est attaché)."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.run_until_complete(dispose_engine())
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def call(run, dataset):
+    """call(service_fn, *args) : une session neuve par appel, comme get_db() dans une requête."""
+
+    def call(fn, *args, **kwargs):
+        async def go():
+            async with async_session() as db:
+                return await fn(db, *args, **kwargs)
+
+        return run(go())
+
+    return call
+
+
+async def reset_schema() -> None:
+    engine = get_engine()
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        return
+
+    from app.db.migrate import upgrade
+
+    await asyncio.to_thread(upgrade, "head")
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+
+
+async def insert(rows: list) -> None:
+    for start in range(0, len(rows), BATCH):
+        async with async_session() as db:
+            db.add_all(rows[start:start + BATCH])
+            await db.commit()
+
+
+def near(prefix: str, city: str, rng: random.Random) -> dict:
+    """Point à moins d'une dizaine de km du centre de `city`."""
+    lat, lon = CITY_COORDS[city]
+    return {f"{prefix}_lat": lat + rng.uniform(-0.08, 0.08), f"{prefix}_lon": lon + rng.uniform(-0.1, 0.1)}
+
+
+@pytest.fixture(scope="session")
+def dataset(run, request) -> dict:
+    """Trajets répartis sur CITIES × DAYS jours, avec préférences, 0 à 2 arrêts, lignes trip_search et tronçons."""
+    size = request.config.getoption("--bench-size")
+    rng = random.Random(42)
+    today = date.today()
+    now = datetime.utcnow()
+
+    rows, trips = [], []
+    for _ in range(size):
+        departure, destination = rng.sample(CITIES, 2)
+        trip = Trip(
+            id=uuid.uuid4(), driver_id=uuid.uuid4(), car_id=uuid.uuid4(),
+            departure_city=departure, destination_city=destination,
+            departure_place="centre-ville", destination_place="centre-ville",
+            departure_time=time(rng.randint(6, 21), rng.choice([0, 30])),
+            departure_date=today + timedelta(days=rng.randint(1, DAYS)),
+            total_price=round(rng.uniform(15, 80), 2), available_seats=10_000,
+            status="pending", created_at=now, updated_at=now,
+            **near("departure", departure, rng), **near("destination", destination, rng),
+        )
+        preference = Preference(
+            id=uuid.uuid4(), trip_id=trip.id, baggage=True, pets_allowed=False, smoking_allowed=False,
+            air_conditioning=True, bike_support=False, ski_support=False,
+            mode_payment=rng.choice(["cash", "virement"]),
+        )
+        stops = [
+            Stop(id=uuid.uuid4(), trip_id=trip.id, destination_city=city, price=10.0, stop_order=position)
+            for position, city in enumerate(rng.sample([c for c in CITIES if c not in (departure, destination)], rng.randint(0, 2)), start=1)
+        ]
+        trips.append(trip)
+        rows += [trip, preference, *stops]
+        rows += build_search_rows(trip, preference, stops)
+        rows += build_segments(trip, stops)
+
+    async def seed():
+        await reset_schema()
+        await insert(rows)
+
+    run(seed())
+
+    # Recherche la plus fréquente : la paire (départ, destination, date) la plus chargée
+    routes = {}
+    for t in trips:
+        key = (t.departure_city, t.destination_city, t.departure_date)
+        routes[key] = routes.get(key, 0) + 1
+    busiest = max(routes, key=routes.get)
+    return {"trip_ids": [t.id for t in trips], "busiest_route": busiest, "city_coords": CITY_COORDS}
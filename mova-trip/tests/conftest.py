@@ -0,0 +1,118 @@
+"""
+Tests de comportement de la couche service (sous le niveau HTTP).
+
+Base SQLite jetable (fichier temporaire, schéma recréé pour chaque test), RabbitMQ
+désactivé : publications ignorées, événements de trajets distribués dans le processus.
+
+Depuis mova-trip/ :
+    python -m pytest tests
+"""
+import asyncio
+import os
+import tempfile
+import uuid
+from datetime import date, time, timedelta
+
+import pytest
+
+TEST_DATABASE_PATH = os.path.join(tempfile.gettempdir(), f"mova_trip_tests_{os.getpid()}.sqlite3")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{TEST_DATABASE_PATH}"
+os.environ["RABBITMQ_URL"] = ""
+os.environ["SEARCH_CACHE_BACKEND"] = "memory"
+
+from app.core.search_cache import search_cache  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.database import async_session, dispose_engine, get_engine  # noqa: E402
+from app.db.models import preference, stop, trip, trip_search, trip_segment  # noqa: E402,F401
+from app.db.schemas.preference import PreferenceCreate  # noqa: E402
+from app.db.schemas.stop import StopCreate  # noqa: E402
+from app.db.schemas.trip import TripCreate  # noqa: E402
+from app.services.trip_service import create_trip_service  # noqa: E402
+
+DAY = date.today() + timedelta(days=7)
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Exécute une coroutine sur l'unique boucle des tests (le pool SQL y est attaché)."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.run_until_complete(dispose_engine())
+    loop.close()
+    if os.path.exists(TEST_DATABASE_PATH):
+        os.remove(TEST_DATABASE_PATH)
+
+
+@pytest.fixture(autouse=True)
+def schema(run):
+    """Schéma vide et cache de recherche neuf pour chaque test."""
+
+    async def reset():
+        async with get_engine().begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        await search_cache.close()
+
+    run(reset())
+
+
+@pytest.fixture
+def day() -> date:
+    """Date de départ par défaut des trajets de test."""
+    return DAY
+
+
+@pytest.fixture
+def call(run):
+    """call(service_fn, *args) : une session neuve par appel, comme get_db() dans une requête."""
+
+    def call(fn, *args, **kwargs):
+        async def go():
+            async with async_session() as db:
+                return await fn(db, *args, **kwargs)
+
+        return run(go())
+
+    return call
+
+
+@pytest.fixture
+def make_trip(call):
+    """
+    make_trip(départ, destination, arrêts=[(ville, prix)], ...) : trajet créé par
+    create_trip_service (tronçons et lignes trip_search compris).
+    """
+
+    def make_trip(
+        departure_city="Montreal",
+        destination_city="Quebec",
+        stops=(),
+        departure_date=DAY,
+        departure_time=time(8, 0),
+        total_price=40.0,
+        available_seats=4,
+        preferences=None,
+        **coordinates,
+    ):
+        data = TripCreate(
+            driver_id=uuid.uuid4(),
+            car_id=uuid.uuid4(),
+            departure_city=departure_city,
+            destination_city=destination_city,
+            departure_place="centre-ville",
+            destination_place="centre-ville",
+            departure_time=departure_time,
+            departure_date=departure_date,
+            total_price=total_price,
+            available_seats=available_seats,
+            preferences=PreferenceCreate(mode_payment="cash", **(preferences or {})),
+            stops=[
+                StopCreate(destination_city=city, price=price, stop_order=position, **extra)
+                for position, (city, price, *rest) in enumerate(stops, start=1)
+                for extra in [rest[0] if rest else {}]
+            ],
+            **coordinates,
+        )
+        return call(create_trip_service, data)
+
+    return make_trip
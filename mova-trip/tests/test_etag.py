@@ -0,0 +1,37 @@
+"""GET conditionnel de /tp/get_trip_by_id : ETag, 304 tant que le trajet n'a pas changé."""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.trip_route import router
+from app.core.etag import etag_matches
+from app.db.schemas.trip import TripReserveSeat
+from app.services.trip_service import get_trip_etag_service, reserve_seat_service
+
+
+def test_if_none_match_returns_304_until_the_trip_changes(call, make_trip):
+    trip = make_trip(available_seats=4)
+    app = FastAPI()
+    app.include_router(router, prefix="/tp")
+    client = TestClient(app)
+    url = f"/tp/get_trip_by_id/{trip.id}"
+
+    first = client.get(url)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.json()["available_seats"] == 4
+    assert etag == call(get_trip_etag_service, trip.id)
+
+    unchanged = client.get(url, headers={"If-None-Match": f'W/{etag}, "autre"'})
+    assert unchanged.status_code == 304 and unchanged.content == b""
+    assert unchanged.headers["ETag"] == etag
+
+    call(reserve_seat_service, TripReserveSeat(trip_id=trip.id, seats=1))
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json()["available_seats"] == 3
+    assert changed.headers["ETag"] != etag
+
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
@@ -0,0 +1,29 @@
+"""Métriques HTTP : label `route` = gabarit complet, préfixe du routeur compris."""
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.metrics import PrometheusMiddleware
+
+
+def test_route_label_keeps_router_prefix():
+    router = APIRouter()
+
+    @router.get("/get_trip_by_id/{trip_id}")
+    def get_trip(trip_id: str):
+        return {"id": trip_id}
+
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+    app.include_router(router, prefix="/tp")
+
+    def count(route: str):
+        return REGISTRY.get_sample_value(
+            "http_request_duration_seconds_count", {"method": "GET", "route": route, "status": "200"}
+        ) or 0
+
+    before = count("/tp/get_trip_by_id/{trip_id}")
+    with TestClient(app) as client:
+        assert client.get("/tp/get_trip_by_id/get_trip_by_id").status_code == 200
+    assert count("/tp/get_trip_by_id/{trip_id}") == before + 1
+    assert count("/get_trip_by_id/{trip_id}") == 0
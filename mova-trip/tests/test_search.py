@@ -0,0 +1,111 @@
+"""Recherche sur trip_search : pagination, ordre des modes de tri, recherche flexible, proximité."""
+from datetime import time, timedelta
+
+import pytest
+
+from app.services.trip_search_service import search_trip_ids, search_trip_ids_by_day
+from app.services.trip_service import search_trips_nearby_service, search_trips_service
+
+
+def test_pages_count_trips_not_legs(call, day, make_trip):
+    # Chaque trajet dessert Quebec deux fois (arrêt puis destination finale)
+    trips = [
+        make_trip(stops=[("Quebec", 30.0), ("Levis", 35.0)], departure_time=time(7 + hour))
+        for hour in range(5)
+    ]
+    expected = [t.id for t in trips]
+
+    pages = [
+        call(search_trip_ids, day, departure_city="Montreal", destination_city="Quebec", skip=skip, limit=2)
+        for skip in (0, 2, 4)
+    ]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [trip_id for page in pages for trip_id in page] == expected
+
+
+def test_flexible_search_counts_trips_once(call, day, make_trip):
+    for hour in range(3):
+        make_trip(stops=[("Quebec", 30.0), ("Levis", 35.0)], departure_time=time(7 + hour))
+
+    days = call(
+        search_trip_ids_by_day, "Montreal", day, day + timedelta(days=1),
+        destination_city="Quebec", per_day=2,
+    )
+    count, trip_ids = days[day]
+    assert count == 3
+    assert len(trip_ids) == len(set(trip_ids)) == 2
+    assert day + timedelta(days=1) not in days
+
+
+@pytest.fixture
+def three_trips(make_trip):
+    """A : 8 h, 50 $, 2 arrêts, aucune préférence ; B : 9 h, 20 $, 1 arrêt, animaux ; C : 10 h, 30 $, direct, animaux + vélo."""
+    a = make_trip(stops=[("Laval", 10.0), ("Trois-Rivieres", 25.0)], departure_time=time(8), total_price=50.0)
+    b = make_trip(stops=[("Laval", 10.0)], departure_time=time(9), total_price=20.0, preferences={"pets_allowed": True})
+    c = make_trip(
+        departure_time=time(10), total_price=30.0,
+        preferences={"pets_allowed": True, "bike_support": True},
+    )
+    return a.id, b.id, c.id
+
+
+@pytest.mark.parametrize("destination_city", ["Quebec", None])
+@pytest.mark.parametrize("sort, preferred, expected", [
+    ("earliest", None, "abc"),
+    ("cheapest", None, "bca"),
+    ("fewest_stops", None, "cba"),
+    ("best_match", ["pets_allowed", "bike_support"], "cba"),
+    ("best_match", ["pets_allowed"], "bca"),
+])
+def test_sort_modes(call, day, three_trips, destination_city, sort, preferred, expected):
+    by_name = dict(zip("abc", three_trips))
+    trips = call(
+        search_trips_service, "Montreal", destination_city, day, sort=sort, preferred=preferred,
+    )
+    assert [t.id for t in trips] == [by_name[name] for name in expected]
+
+
+def test_pages_without_destination_count_trips_once(call, day, make_trip):
+    # Sans destination : une ligne par trajet (destination finale), pas une par arrêt desservi
+    trips = [
+        make_trip(stops=[("Laval", 10.0), ("Trois-Rivieres", 25.0)], departure_time=time(7 + hour))
+        for hour in range(3)
+    ]
+    pages = [call(search_trip_ids, day, departure_city="Montreal", skip=skip, limit=2) for skip in (0, 2)]
+    assert pages == [[trips[0].id, trips[1].id], [trips[2].id]]
+
+
+def test_flexible_search_ranks_each_day(call, day, make_trip):
+    next_day = day + timedelta(days=1)
+    cheap = make_trip(departure_time=time(9), total_price=15.0)
+    middle = make_trip(departure_time=time(7), total_price=25.0)
+    make_trip(departure_time=time(8), total_price=35.0)
+    late = make_trip(departure_time=time(21), total_price=5.0)  # hors créneau
+    tomorrow = make_trip(departure_date=next_day, departure_time=time(12), total_price=60.0)
+
+    days = call(
+        search_trip_ids_by_day, "Montreal", day, next_day, time_from=time(6), time_to=time(20),
+        destination_city="Quebec", sort="cheapest", per_day=2,
+    )
+    assert days[day] == (3, [cheap.id, middle.id])
+    assert days[next_day] == (1, [tomorrow.id])
+    assert late.id not in days[day][1]
+
+
+MONTREAL = (45.5017, -73.5673)
+
+
+def test_proximity_orders_by_distance_within_radius(call, day, make_trip):
+    lat, lon = MONTREAL
+    near = make_trip(departure_lat=lat + 0.018, departure_lon=lon)        # ≈ 2 km
+    farther = make_trip(departure_lat=lat - 0.072, departure_lon=lon)     # ≈ 8 km
+    make_trip(departure_lat=lat + 0.27, departure_lon=lon)                # ≈ 30 km
+    make_trip()                                                           # point non placé
+
+    found = call(search_trips_nearby_service, day, lat=lat, lon=lon, radius_km=10.0)
+    assert [t["id"] for t in found] == [near.id, farther.id]
+    assert found[0]["distance_km"] == pytest.approx(2.0, abs=0.1)
+    assert found[1]["distance_km"] == pytest.approx(8.0, abs=0.1)
+
+    nearest = call(search_trips_nearby_service, day, lat=lat, lon=lon, nearest=1)
+    assert [t["id"] for t in nearest] == [near.id]
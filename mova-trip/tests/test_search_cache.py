@@ -0,0 +1,96 @@
+"""Cache de recherche : réponses invalidées par les écritures, y compris entre processus (échange fanout)."""
+import json
+from contextlib import asynccontextmanager
+from datetime import date
+
+import orjson
+import pytest
+
+from app.core import search_cache as search_cache_module
+from app.core.search_cache import SearchCache, search_tag, trip_tags
+from app.db.schemas.trip import TripReserveSeat
+from app.services.trip_service import (
+    TripStatus,
+    cached_search_trips_service,
+    reserve_seat_service,
+    update_trip_status_service,
+)
+
+DAY = date(2030, 1, 15)
+
+
+class FanoutMessage:
+    def __init__(self, payload: dict):
+        self.body = json.dumps(payload).encode()
+
+    @asynccontextmanager
+    async def process(self):
+        yield
+
+
+@pytest.fixture
+def fanout(monkeypatch):
+    """Échange fanout en mémoire : chaque abonné reçoit toutes les diffusions, y compris les siennes."""
+    handlers = []
+
+    async def subscribe_fanout(exchange_name, handler):
+        handlers.append(handler)
+
+    async def publish_fanout(exchange_name, payload):
+        for handler in handlers:
+            await handler(FanoutMessage(payload))
+
+    monkeypatch.setattr(search_cache_module.settings, "RABBITMQ_URL", "amqp://broker")
+    monkeypatch.setattr(search_cache_module.amqp_client, "subscribe_fanout", subscribe_fanout)
+    monkeypatch.setattr(search_cache_module.amqp_client, "publish_fanout", publish_fanout)
+    return handlers
+
+
+def test_invalidation_reaches_other_processes(run, fanout):
+    api, consumer = SearchCache(), SearchCache()
+    run(api.start())
+    run(consumer.start())
+    assert len(fanout) == 2
+
+    run(api.set("montreal-quebec", search_tag(DAY, "Montreal"), b"[]"))
+    run(api.set("toutes-villes", search_tag(DAY, None), b"[]"))
+    run(api.set("ottawa", search_tag(DAY, "Ottawa"), b"[]"))
+
+    # Le worker consumer écrit des places : le cache du worker API est invalidé
+    run(consumer.invalidate(trip_tags(DAY, "Montreal")))
+    assert run(api.get("montreal-quebec")) is None
+    assert run(api.get("toutes-villes")) is None
+    assert run(api.get("ottawa")) == b"[]"
+
+    run(api.close())
+    run(consumer.close())
+
+
+def test_writer_invalidates_its_own_cache_without_broker(run):
+    cache = SearchCache()
+    run(cache.set("montreal-quebec", search_tag(DAY, "Montreal"), b"[]"))
+    run(cache.invalidate(trip_tags(DAY, "Montreal")))
+    assert run(cache.get("montreal-quebec")) is None
+    run(cache.close())
+
+
+def test_cached_search_follows_writes(call, day, make_trip):
+    def search():
+        payload = call(
+            cached_search_trips_service, departure_city="Montreal", destination_city="Quebec", departure_date=day,
+        )
+        return {t["id"]: t["available_seats"] for t in orjson.loads(payload)}
+
+    first = make_trip(available_seats=4)
+    assert search() == {str(first.id): 4}
+    assert search() == {str(first.id): 4}  # servi par le cache
+
+    # Mouvement de places, nouveau trajet, changement de statut : plus de réponse périmée
+    call(reserve_seat_service, TripReserveSeat(trip_id=first.id, seats=3))
+    assert search() == {str(first.id): 1}
+
+    second = make_trip(available_seats=2)
+    assert search() == {str(first.id): 1, str(second.id): 2}
+
+    call(update_trip_status_service, first.id, TripStatus.CANCELLED)
+    assert search() == {str(second.id): 2}
@@ -0,0 +1,100 @@
+"""Inventaire par tronçon : réservations atomiques sur plusieurs tronçons, montée à un arrêt, libération."""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.db.models.trip_search import TripSearch
+from app.db.schemas.trip import TripCancelSeat, TripReserveSeat
+from app.services.seat_inventory_service import available_seats_between
+from app.services.trip_search_service import search_trip_ids
+from app.services.trip_service import cancel_seat_reservation_service, reserve_seat_service
+
+
+@pytest.fixture
+def itinerary(make_trip):
+    """Montreal → Laval → Trois-Rivieres → Quebec, 4 places ; tronçons 0, 1, 2."""
+    trip = make_trip(stops=[("Laval", 10.0), ("Trois-Rivieres", 25.0)], total_price=40.0, available_seats=4)
+    laval, trois_rivieres = sorted(trip.stops, key=lambda s: s.stop_order)
+    return trip, laval.id, trois_rivieres.id
+
+
+def segment_seats(call, trip_id, stop_ids):
+    """Places de chaque tronçon : [départ → arrêt 1, arrêt 1 → arrêt 2, …, dernier arrêt → destination]."""
+    bounds = [None, *stop_ids, None]
+    return [
+        call(available_seats_between, trip_id, from_stop_id=bounds[i], to_stop_id=bounds[i + 1])
+        for i in range(len(bounds) - 1)
+    ]
+
+
+def test_seats_freed_after_a_stop_are_sold_from_that_stop(call, day, itinerary):
+    trip, laval, trois_rivieres = itinerary
+    call(reserve_seat_service, TripReserveSeat(trip_id=trip.id, seats=3, stop_id=laval))
+
+    assert call(available_seats_between, trip.id, from_stop_id=laval) == 4
+    # La ligne de recherche Laval → Quebec existe et porte les places revendables
+    found = call(search_trip_ids, day, departure_city="Laval", destination_city="Quebec")
+    assert found == [trip.id]
+
+    updated = call(reserve_seat_service, TripReserveSeat(trip_id=trip.id, seats=3, from_stop_id=laval))
+    assert updated.available_seats == 1
+    assert segment_seats(call, trip.id, [laval, trois_rivieres]) == [1, 1, 1]
+
+
+def test_overlapping_reservation_is_all_or_nothing(call, itinerary):
+    trip, laval, trois_rivieres = itinerary
+    call(reserve_seat_service, TripReserveSeat(trip_id=trip.id, seats=3, from_stop_id=laval))
+    assert segment_seats(call, trip.id, [laval, trois_rivieres]) == [4, 1, 1]
+
+    # Montreal → Quebec : le tronçon 0 a 4 places, les tronçons 1 et 2 n'en ont qu'une
+    with pytest.raises(HTTPException) as error:
+        call(reserve_seat_service, TripReserveSeat(trip_id=trip.id, seats=2))
+    assert error.value.status_code == 400
+    assert segment_seats(call, trip.id, [laval, trois_rivieres]) == [4, 1, 1]
+
+    # Capacité partielle : Montreal → Laval reste vendable en entier
+    updated = call(reserve_seat_service, TripReserveSeat(trip_id=trip.id, seats=4, stop_id=laval))
+    assert updated.available_seats == 0
+    assert segment_seats(call, trip.id, [laval, trois_rivieres]) == [0, 1, 1]
+
+
+def test_release_restores_segments_and_search_rows(call, itinerary):
+    trip, laval, trois_rivieres = itinerary
+    call(reserve_seat_service, TripReserveSeat(trip_id=trip.id, seats=2, from_stop_id=laval, stop_id=trois_rivieres))
+    assert segment_seats(call, trip.id, [laval, trois_rivieres]) == [4, 2, 4]
+
+    updated = call(
+        cancel_seat_reservation_service,
+        TripCancelSeat(trip_id=trip.id, seats=2, from_stop_id=laval, stop_id=trois_rivieres),
+    )
+    assert updated.available_seats == 4
+    assert segment_seats(call, trip.id, [laval, trois_rivieres]) == [4, 4, 4]
+
+    async def seats_by_leg(db):
+        rows = await db.execute(select(TripSearch.available_seats).where(TripSearch.trip_id == trip.id))
+        return rows.scalars().all()
+
+    assert set(call(seats_by_leg)) == {4}
+
+
+def test_boarding_after_alighting_stop_is_rejected(call, itinerary):
+    trip, laval, trois_rivieres = itinerary
+    with pytest.raises(HTTPException) as error:
+        call(reserve_seat_service, TripReserveSeat(trip_id=trip.id, seats=1, from_stop_id=trois_rivieres, stop_id=laval))
+    assert error.value.status_code == 400
+
+
+def test_search_rows_one_per_city_pair(call, day, make_trip):
+    # Quebec desservie deux fois : arrêt puis destination finale
+    trip = make_trip(stops=[("Quebec", 30.0), ("Levis", 35.0)], total_price=40.0)
+
+    async def legs(db):
+        rows = await db.execute(
+            select(TripSearch.departure_city, TripSearch.destination_city).where(TripSearch.trip_id == trip.id)
+        )
+        return rows.all()
+
+    pairs = call(legs)
+    assert len(pairs) == len(set(pairs))
+    assert ("montreal", "quebec") in pairs and ("levis", "quebec") in pairs
+    assert call(search_trip_ids, day, departure_city="Montreal", destination_city="Quebec") == [trip.id]
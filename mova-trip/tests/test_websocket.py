@@ -0,0 +1,26 @@
+"""WebSocket /tp/ws/trips : un message mal formé reçoit une erreur sans fermer la connexion."""
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.trip_route import router
+from app.core.config import settings
+
+
+def test_malformed_frames_get_an_error_and_keep_the_socket_open():
+    app = FastAPI()
+    app.include_router(router, prefix="/tp")
+    too_many = [str(uuid.uuid4()) for _ in range(settings.TRIP_EVENTS_MAX_SUBSCRIPTIONS + 1)]
+
+    with TestClient(app).websocket_connect("/tp/ws/trips") as ws:
+        for frame in ("{pas du json", "[1, 2]", '{"trip_ids": 5}'):
+            ws.send_text(frame)
+            assert ws.receive_json()["type"] == "error"
+        ws.send_bytes(b"\xff\xfe")
+        assert ws.receive_json()["type"] == "error"
+
+        # Toujours ouverte : un message valide est traité normalement
+        ws.send_json({"action": "subscribe", "trip_ids": too_many})
+        error = ws.receive_json()
+        assert error["type"] == "error" and str(settings.TRIP_EVENTS_MAX_SUBSCRIPTIONS) in error["detail"]
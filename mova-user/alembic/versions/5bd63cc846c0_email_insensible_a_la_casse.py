@@ -0,0 +1,47 @@
+"""email insensible à la casse
+
+Revision ID: 5bd63cc846c0
+Revises: a3fb71b51899
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5bd63cc846c0'
+down_revision: Union[str, None] = 'a3fb71b51899'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # Les doublons par casse doivent être fusionnés à la main avant la migration
+    duplicates = conn.execute(sa.text(
+        "SELECT lower(trim(email)) AS email, count(*) AS n "
+        "FROM users GROUP BY lower(trim(email)) HAVING count(*) > 1"
+    )).fetchall()
+    if duplicates:
+        listed = ", ".join(f"{row.email} ({row.n})" for row in duplicates)
+        raise RuntimeError(f"Emails en double (casse différente) à résoudre avant migration : {listed}")
+
+    # Normalisation des emails existants
+    op.execute("UPDATE users SET email = lower(trim(email)) WHERE email <> lower(trim(email))")
+    op.execute("UPDATE user_codes SET email = lower(trim(email)) WHERE email <> lower(trim(email))")
+
+    # Index fonctionnel unique : une recherche par email = une sonde d'index
+    op.create_index(
+        'uq_users_email_lower',
+        'users',
+        [sa.text('lower(email)')],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_users_email_lower', table_name='users')
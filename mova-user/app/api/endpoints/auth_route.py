@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.db.database import get_db
 
 from app.services.user_service import get_user_by_email, get_user_by_id
+from app.services.user_service import get_user_identity, get_user_identity_by_email
 from app.services.auth_service import login_user
 from fastapi import FastAPI, HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -34,8 +35,6 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 router = APIRouter()
 app = FastAPI()
 
-# Configurer le logger
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -49,7 +48,7 @@ async def login_endpoint(user: UserLogin, db: AsyncSession = Depends(get_db)):
         password = user.password
         logger.info(f"Tentative de connexion pour l'email: {email}")
         
-        token, refresh_token = await login_user(db, email, password)
+        token, refresh_token, user = await login_user(db, email, password)
         if token == "Information Invalide":
             logger.warning("Informations invalides pour l'utilisateur")
             return "Information Invalide"
@@ -61,9 +60,6 @@ async def login_endpoint(user: UserLogin, db: AsyncSession = Depends(get_db)):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        user = await get_user_by_email(db, email)
-        
-        
         logger.info(f"Connexion réussie pour l'utilisateur: {email}")
         return {
             "access_token": token,
@@ -97,15 +93,19 @@ async def refresh_access_token(refresh_token: RefreshToken, db: AsyncSession = D
                 detail="Invalid token type"
             )
         
-        user = await get_user_by_id(db, payload["user_id"])
+        # Identité minimale suffisante : pas de chargement des véhicules
+        if payload.get("user_id"):
+            user = await get_user_identity(db, payload["user_id"])
+        else:
+            user = await get_user_identity_by_email(db, payload["sub"])
         token_data = {
-            "sub": user["email"],
-            "user_id": str(user["id"]),
-            "role": user["role"]
+            "sub": user.email,
+            "user_id": str(user.id),
+            "role": user.user_role
         }
         
         new_access_token = create_access_token(data=token_data)
-        logger.info(f"Access token renouvelé pour l'utilisateur ID: {user['id']}")
+        logger.info(f"Access token renouvelé pour l'utilisateur ID: {user.id}")
         return {"access_token": new_access_token, "token_type": "bearer"}
     except JWTError:
         logger.error("Refresh token invalide ou expiré")
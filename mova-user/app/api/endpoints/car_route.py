@@ -6,8 +6,8 @@ from app.db.database import get_db
 from app.db.schemas.user import UserResponse, UserResponseFind, UserUpdate, UsersType
 from typing import List
 from app.db.models.user import User
-from app.services.car_service import create_car_service,get_car_by_id_service,update_car_service
-from app.db.schemas.car import CarCreate  ,CarResponse  ,CarUpdate
+from app.services.car_service import create_car_service,get_car_by_id_service,update_car_service,get_cars_by_ids
+from app.db.schemas.car import CarCreate  ,CarResponse  ,CarUpdate, CarIdsRequest
 
 
 from fastapi import FastAPI, HTTPException, Depends, Request
@@ -25,8 +25,6 @@ RABBITMQ_URL = os.getenv("RABBITMQ_URL")
 router = APIRouter()
 app = FastAPI()
 
-# Configurer le logger
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 @router.post("/create_cars", response_model=CarResponse, status_code=201)
@@ -42,6 +40,13 @@ async def get_car_by_id(car_id:UUID,db:AsyncSession=Depends(get_db)):
     car =await get_car_by_id_service(db,car_id)
     return car
 
+@router.post("/get_cars_by_ids",response_model=List[CarResponse])
+async def get_cars_by_ids_endpoint(data:CarIdsRequest,db:AsyncSession=Depends(get_db)):
+    """
+    Récupère plusieurs voitures en une requête (ids inconnus ignorés).
+    """
+    return await get_cars_by_ids(db,data.ids)
+
 @router.put("/update_car",response_model=CarResponse) 
 async def update_car_endpoint(data:CarUpdate, db:AsyncSession=Depends(get_db)):
     car = await update_car_service(db,data)
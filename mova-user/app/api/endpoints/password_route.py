@@ -20,8 +20,6 @@ import os
 router = APIRouter()
 app = FastAPI()
 
-# Configurer le logger
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -46,8 +44,7 @@ async def reset_password_endpoint(
     """
     EndPoint pour Verifier le code 
     """
-    
-    db_user = await get_user_by_email(db, email=user.email)
+    # Le code n'existe que pour un utilisateur existant (étape 1) : pas de relecture de User
     result = await verify_code(db, user.email, user.code)
     logger.info(f"Code de réinitialisation vérifié avec succès pour: {user.email}")
     return result
@@ -59,10 +56,8 @@ async def reset_password_endpoint(
     """
     EndPoint pour Reset le nouveau passé 
     """
-    
-    db_user = await get_user_by_email(db,user.email)
-
-    result = await update_user_password(db, db_user.email, user.new_password)
+    # update_user_password fait l'unique recherche (404 si l'email est inconnu)
+    result = await update_user_password(db, user.email, user.new_password)
         
     # result =  ResetPasswordRequest(email =user.email)
     logger.info(f"Mot de passe réinitialisé avec succès pour: {user.email}")
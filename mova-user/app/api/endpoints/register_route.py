@@ -21,8 +21,6 @@ REWARD_THRESHOLD = 50000
 router = APIRouter()
 app = FastAPI()
 
-# Configurer le logger
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
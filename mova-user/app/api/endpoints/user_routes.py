@@ -3,13 +3,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 
 from app.db.database import get_db
-from app.db.schemas.user import UserResponse, UserResponseFind, UserUpdate, UsersType
+from app.db.schemas.user import UserResponse, UserResponseFind, UserUpdate, UsersType, UserProfile
+from app.db.schemas.user import UserDisplay, UserIdsRequest
 from typing import List
 from app.db.models.user import User
 from app.services.user_service import get_user_by_email, get_user_by_id,get_users, update_user, delete_user
+from app.services.user_service import get_user_profile_with_cars, get_user_profile_with_cars_by_email, USERS_PAGE_MAX_LIMIT
+from app.services.user_service import get_users_by_ids
 
 
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Request, Query
 from starlette.responses import JSONResponse
 from uuid import UUID
 import logging
@@ -23,8 +26,6 @@ RABBITMQ_URL = os.getenv("RABBITMQ_URL")
 router = APIRouter()
 app = FastAPI()
 
-# Configurer le logger
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -35,7 +36,7 @@ async def user_by_email(email: str, db: AsyncSession = Depends(get_db)):
     Récupère un utilisateur par son email.
     """
     logger.info(f"Requête reçue pour récupérer les points de l'utilisateur avec l'email: {email}")
-    user = await get_user_by_email(db, email)
+    user = await get_user_profile_with_cars_by_email(db, email)
     return user
 
 
@@ -45,15 +46,28 @@ async def user_by_id(id: UUID, db: AsyncSession = Depends(get_db)):
     Récupère un utilisateur par son ID.
     """
     logger.info(f"Requête reçue pour récupérer l'utilisateur avec l'id: {id}")
-    user = await get_user_by_id(db, id)
+    user = await get_user_profile_with_cars(db, id)
     return user
 
-@router.get("/users", response_model=List)
-async def users(db: AsyncSession = Depends(get_db)):
+@router.get("/users", response_model=List[UserProfile])
+async def users(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=USERS_PAGE_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Endpoint pour récupérer tous les utilisateurs.
+    Endpoint pour récupérer une page d'utilisateurs (profil sans véhicules).
     """
-    return await get_users(db)
+    return await get_users(db, skip=skip, limit=limit)
+
+
+@router.post("/users/batch", response_model=List[UserDisplay])
+async def users_batch(data: UserIdsRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Endpoint pour récupérer les données d'affichage de plusieurs utilisateurs en une requête
+    (listes de passagers, paiements). Les ids inconnus sont ignorés.
+    """
+    return await get_users_by_ids(db, data.ids)
 
 
 
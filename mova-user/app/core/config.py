@@ -2,15 +2,62 @@ from pydantic_settings import BaseSettings
 
 from dotenv import load_dotenv
 import os
+from typing import Optional
 
 load_dotenv()
 
 class Settings(BaseSettings):
+    SERVICE_NAME: str = "mova-user"  # traces et logs (modules communs de app/core)
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     SECRET_KEY: str = "supersecretkey"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    
+    RABBITMQ_URL: Optional[str] = None  # optionnel : sans broker, publications ignorées
+
+    # Publication des notifications (emails, vérification d'identité)
+    RABBITMQ_CHANNEL_POOL_SIZE: int = 4
+    NOTIFICATION_BUFFER_SIZE: int = 1000
+    NOTIFICATION_RETRY_MAX_DELAY: float = 30.0
+    NOTIFICATION_SHUTDOWN_TIMEOUT: float = 5.0
+
+    # Cache des véhicules (par processus)
+    CAR_CACHE_TTL_SECONDS: float = 60.0
+    CAR_CACHE_MAX_SIZE: int = 2048
+    CAR_BATCH_MAX_IDS: int = 100
+
+    # Récupération groupée des utilisateurs (enrichissement inter-services)
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_SIZE: int = 4096
+    USER_BATCH_MAX_IDS: int = 100
+
+    # Démarrage : vérifie la révision Alembic (les migrations sont appliquées
+    # une fois par déploiement avec `python -m app.db.migrate`)
+    SCHEMA_CHECK_ON_STARTUP: bool = True
+
+    # Cycle de vie (lifespan) : préchauffage au démarrage, drain à l'arrêt
+    DB_POOL_WARM_SIZE: int = 5
+    SHUTDOWN_TIMEOUT: float = 10.0
+
+    # Instrumentation SQL (app/core/sql_instrumentation.py) : en-têtes X-DB-* en dev
+    SQL_INSTRUMENTATION: bool = False
+    SQL_STATS_HEADERS: bool = False
+    SQL_SLOW_QUERY_MS: float = 100.0
+    SQL_QUERY_BUDGET: int = 10
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 5
+
+    # Traces distribuées OpenTelemetry (app/core/tracing.py) : otlp ou file
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "otlp"
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACE_FILE: str = "user_traces.jsonl"
+
+    # Logs JSON non bloquants (app/core/logging_config.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_FILE: str = ""
+    # Loggers bavards (clients réseau) échantillonnables ; 1.0 = tous les logs conservés
+    LOG_SAMPLED_LOGGERS: str = "aiormq,aio_pika"
+    LOG_SAMPLE_RATE: float = 1.0
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,47 @@
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.notification_publisher import notification_publisher
+from app.core.tracing import shutdown_tracing
+from app.db.database import dispose_engine, get_engine, warm_engine
+from app.db.migrate import ensure_schema_is_current
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Prêt uniquement entre la fin du préchauffage et le début de l'arrêt."""
+
+    def __init__(self):
+        self.ready = False
+
+
+readiness = Readiness()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 🚀 Démarrage : schéma, pool SQL, publisher RabbitMQ des notifications
+    if settings.SCHEMA_CHECK_ON_STARTUP:
+        await ensure_schema_is_current(get_engine())
+    await warm_engine(settings.DB_POOL_WARM_SIZE)
+
+    if settings.RABBITMQ_URL:
+        notification_publisher.start()
+    else:
+        logger.warning("RABBITMQ_URL non défini : notifications désactivées")
+
+    readiness.ready = True
+    logger.info("✅ User service prêt")
+    try:
+        yield
+    finally:
+        # 🛑 Arrêt : envoie les messages encore en buffer puis ferme les pools
+        readiness.ready = False
+        await notification_publisher.close(timeout=settings.NOTIFICATION_SHUTDOWN_TIMEOUT)
+        await dispose_engine()
+        shutdown_tracing()
+        logger.info("🔴 User service arrêté")
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+import aio_pika
+from aio_pika.pool import Pool
+from opentelemetry.trace import SpanKind
+
+from app.core.config import settings
+from app.core.metrics import AMQP_PUBLISH_SECONDS
+from app.core.tracing import inject_headers, tracer
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationPublisher:
+    """
+    Publie les notifications (emails, vérification d'identité, codes) vers RabbitMQ.
+
+    - une seule connexion robuste et un pool de canaux, ouverts à la demande ;
+    - publication "fire-and-forget" : les messages sont déposés dans un buffer
+      en mémoire et envoyés par des workers en arrière-plan ;
+    - si RabbitMQ est indisponible, les workers réessaient avec un backoff
+      exponentiel sans perdre le message (dans la limite du buffer).
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        channel_pool_size: int = 4,
+        buffer_size: int = 1000,
+        retry_max_delay: float = 30.0,
+    ):
+        self.url = url
+        self.channel_pool_size = channel_pool_size
+        self.retry_max_delay = retry_max_delay
+        self._buffer_size = buffer_size
+        self._buffer: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._connection_pool: Optional[Pool] = None
+        self._channel_pool: Optional[Pool] = None
+        self._declared_queues: set[str] = set()
+
+    # ------------------------------------------------------------
+    # Connexion / canaux
+    # ------------------------------------------------------------
+    async def _get_connection(self) -> aio_pika.abc.AbstractRobustConnection:
+        return await aio_pika.connect_robust(self.url)
+
+    async def _get_channel(self) -> aio_pika.abc.AbstractChannel:
+        async with self._connection_pool.acquire() as connection:
+            return await connection.channel()
+
+    async def _publish(self, queue_name: str, body: bytes, headers: dict) -> None:
+        start = time.perf_counter()
+        async with self._channel_pool.acquire() as channel:
+            if queue_name not in self._declared_queues:
+                await channel.declare_queue(queue_name, durable=True)
+                self._declared_queues.add(queue_name)
+
+            message = aio_pika.Message(
+                body=body,
+                content_type="application/json",
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                timestamp=datetime.now(timezone.utc),
+                headers=headers,
+            )
+            await channel.default_exchange.publish(message, routing_key=queue_name)
+        AMQP_PUBLISH_SECONDS.labels(queue_name).observe(time.perf_counter() - start)
+
+    # ------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------
+    def start(self) -> None:
+        """Crée le buffer, les pools et lance les workers (idempotent)."""
+        if self._workers:
+            return
+
+        self._buffer = asyncio.Queue(maxsize=self._buffer_size)
+        self._connection_pool = Pool(self._get_connection, max_size=1)
+        self._channel_pool = Pool(self._get_channel, max_size=self.channel_pool_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"notification-publisher-{i}")
+            for i in range(self.channel_pool_size)
+        ]
+        logger.info(f"[Notifications] 🟢 Publisher démarré ({self.channel_pool_size} canaux)")
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Vide le buffer (dans la limite du timeout) puis ferme canaux et connexion."""
+        if not self._workers:
+            return
+
+        try:
+            await asyncio.wait_for(self._buffer.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"[Notifications] ⚠️ {self._buffer.qsize()} message(s) non envoyés à l'arrêt"
+            )
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        await self._channel_pool.close()
+        await self._connection_pool.close()
+        self._declared_queues.clear()
+        logger.info("[Notifications] 🔴 Publisher arrêté")
+
+    # ------------------------------------------------------------
+    # Publication
+    # ------------------------------------------------------------
+    def publish(self, queue_name: str, payload: dict) -> bool:
+        """
+        Dépose un message dans le buffer et rend la main immédiatement.
+        Retourne False si le message a été abandonné (pas d'URL ou buffer plein).
+        """
+        if not self.url:
+            logger.warning(f"[Notifications] RABBITMQ_URL non défini, skip publish ({queue_name})")
+            return False
+
+        self.start()
+        try:
+            # Le span "publish" est créé ici (contexte de la requête HTTP), l'envoi réel se fait plus tard
+            with tracer.start_as_current_span(f"publish {queue_name}", kind=SpanKind.PRODUCER):
+                headers = inject_headers()
+            self._buffer.put_nowait((queue_name, json.dumps(payload, default=str).encode(), headers))
+            return True
+        except asyncio.QueueFull:
+            logger.error(f"[Notifications] ❌ Buffer plein, message abandonné ({queue_name})")
+            return False
+
+    async def _worker(self) -> None:
+        while True:
+            queue_name, body, headers = await self._buffer.get()
+            delay = 0.5
+            try:
+                while True:
+                    try:
+                        await self._publish(queue_name, body, headers)
+                        break
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        logger.warning(
+                            f"[Notifications] ⚠️ Publication échouée ({queue_name}), "
+                            f"nouvel essai dans {delay:.1f}s : {e}"
+                        )
+                        await asyncio.sleep(delay)
+                        delay = min(delay * 2, self.retry_max_delay)
+            finally:
+                self._buffer.task_done()
+
+
+notification_publisher = NotificationPublisher(
+    settings.RABBITMQ_URL,
+    channel_pool_size=settings.RABBITMQ_CHANNEL_POOL_SIZE,
+    buffer_size=settings.NOTIFICATION_BUFFER_SIZE,
+    retry_max_delay=settings.NOTIFICATION_RETRY_MAX_DELAY,
+)
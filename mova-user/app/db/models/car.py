@@ -1,23 +1,13 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, Float, Date, Time, DateTime
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.orm import relationship
 from datetime import date, time
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import create_engine, inspect
-from dotenv import load_dotenv
 from datetime import datetime
 import uuid
-import os
 from app.db.base import Base
 from enum import Enum
-load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
 
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL doit être défini dans le fichier .env")
-engine = create_engine(DATABASE_URL)
-
-Session = sessionmaker(bind=engine)
 
 class Car(Base) :
     __tablename__ = "cars"
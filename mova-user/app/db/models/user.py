@@ -6,40 +6,20 @@ from sqlalchemy import (
     DateTime,
     
     Boolean,
-
+    Index,
+    func,
    
 )
 from enum import Enum
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import sessionmaker,relationship
+from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import create_engine, inspect
 import uuid
 from datetime import datetime
 
 from app.db.base import Base
-from dotenv import load_dotenv
-
-
-import os
-
-# Charger les variables d'environnement
-load_dotenv()
-
-# Base de SQLAlchemy
 
 
-# Configurer le moteur de base de données
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL doit être défini dans le fichier .env")
-
-engine = create_engine(DATABASE_URL)
-
-# Configurer la session
-Session = sessionmaker(bind=engine)
-
 class UserRole(Enum):
     passenger = "passenger"
     driver = "driver"
@@ -65,3 +45,9 @@ class User(Base):
    
     cars = relationship("Car", back_populates="user", cascade="all, delete-orphan")
 
+    # Unicité insensible à la casse : les emails sont stockés normalisés (minuscules)
+    # et toutes les recherches passent par lower(email) pour sonder cet index.
+    __table_args__ = (
+        Index("uq_users_email_lower", func.lower(email), unique=True),
+    )
+
@@ -11,34 +11,12 @@ from sqlalchemy import (
 )
 from enum import Enum
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import sessionmaker,relationship
+from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import create_engine, inspect
 import uuid
 from datetime import datetime,date
 from sqlalchemy.sql import func
 from app.db.base import Base
-from dotenv import load_dotenv
-
-
-import os
-
-# Charger les variables d'environnement
-load_dotenv()
-
-# Base de SQLAlchemy
-
-
-# Configurer le moteur de base de données
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-if not DATABASE_URL:
-    raise ValueError("DATABASE_URL doit être défini dans le fichier .env")
-
-engine = create_engine(DATABASE_URL)
-
-# Configurer la session
-Session = sessionmaker(bind=engine)
 
 
 class UserCode(Base):
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime,date 
 from uuid import UUID
-from typing import Optional
+from typing import Optional, List
 from enum import Enum
 
 
@@ -65,4 +65,9 @@ class CarResponse(CarBase):
     updated_at: datetime = Field(default_factory=lambda: datetime.now().replace(microsecond=0), description="Date de la dernière mise à jour de l'enregistrement")
 
     class Config : 
-        from_attributes=True
\ No newline at end of file
+        from_attributes=True
+
+
+# Schéma pour la récupération groupée de véhicules (autres microservices)
+class CarIdsRequest(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, description="Identifiants des voitures à récupérer")
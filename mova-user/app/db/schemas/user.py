@@ -139,3 +139,57 @@ class UserInternal(UserBase):
 
     class Config:
         orm_mode = True
+
+
+# ------------------------------------------------------------
+# Projections (lectures colonne par colonne, sans charger l'ORM complet)
+# ------------------------------------------------------------
+
+# Identité minimale : refresh token, contrôles d'accès, enrichissement inter-services
+class UserIdentity(BaseModel):
+    id: UUID
+    email: EmailStr
+    user_role: Optional[str] = None
+    is_active: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+# Profil sans les véhicules : listes admin, affichage
+class UserProfile(BaseModel):
+    id: UUID
+    first_name: str
+    last_name: str
+    email: EmailStr
+    town: Optional[str] = None
+    phone_number: Optional[str] = None
+    date_of_birth: Optional[str] = None
+    user_role: Optional[str] = None
+    is_active: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+# Profil complet avec les véhicules de l'utilisateur
+class UserProfileWithCars(UserProfile):
+    cars: List[CarResponse] = []
+
+
+# Données d'affichage d'un utilisateur pour les autres microservices (passagers, paiements)
+class UserDisplay(BaseModel):
+    id: UUID
+    first_name: str
+    last_name: str
+    town: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+# Requête de récupération groupée par ids
+class UserIdsRequest(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, description="Identifiants des utilisateurs à récupérer")
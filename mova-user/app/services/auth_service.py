@@ -5,7 +5,7 @@ from app.db.models.user import User
 import uuid
 from datetime import datetime
 from app.core.security import verify_password, create_access_token, create_refresh_token
-from app.services.user_service import get_user_by_email
+from app.services.user_service import get_user_by_email, find_user_by_email
 import logging
 from sqlalchemy.orm import Session
 import os
@@ -29,8 +29,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # Exemple d'authentification après réinitialisation
 async def login_user(db: AsyncSession, email: str, password: str):
     
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
+    # Une seule sonde de l'index lower(email) : l'utilisateur est renvoyé à l'appelant
+    user = await find_user_by_email(db, email)
     if not user:
         raise HTTPException(status_code=400, detail="Mot de passe ou Identifiant incorrect.")
     
@@ -42,10 +42,10 @@ async def login_user(db: AsyncSession, email: str, password: str):
     
     # Génération du token après la validation
     token = create_access_token({
-    "sub": email,
+    "sub": user.email,
     "user_id": str(user.id),
     "userRole": user.user_role
 })
-    refresh_token = create_refresh_token(data={"sub": email})
+    refresh_token = create_refresh_token(data={"sub": user.email, "user_id": str(user.id)})
     
-    return token, refresh_token
+    return token, refresh_token, user
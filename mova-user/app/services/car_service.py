@@ -7,16 +7,14 @@ from app.db.models.user import User
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from typing import List
 from app.db.schemas.car import CarResponse, CarCreate,CarUpdate
 from app.db.models.car import Car
+from app.core.cache import TTLCache
+from app.core.config import settings
 import traceback
 
-# Configuration du logger
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-        logging.FileHandler("user_logs.log"),  # Nom du fichier de log
-        logging.StreamHandler()  # Envoie également les logs à la console
-    ])
+logger = logging.getLogger(__name__)
 
 
  
@@ -28,6 +26,9 @@ RABBITMQ_URL = os.getenv("RABBITMQ_URL")
 QUEUE_NAME = "activate_email_queue"
 QUEUE_NAME_VERIFICATION = "id_verification_queue"
 
+# Cache read-through des véhicules (CarResponse, clé = car_id)
+# Invalidé par update_car_service et del_car_by_id ; le TTL couvre les autres workers.
+car_cache = TTLCache(maxsize=settings.CAR_CACHE_MAX_SIZE, ttl=settings.CAR_CACHE_TTL_SECONDS)
 
 
 
@@ -41,7 +42,7 @@ async def create_car_service(db: AsyncSession, user_id: uuid.UUID, car_data: Car
         result = await db.execute(select(User).where(User.id ==user_id))
         user = result.scalar_one_or_none()
         if not user:
-            logging.error(f"Utilisateur introuvable avec l'id {user_id}")
+            logger.error(f"Utilisateur introuvable avec l'id {user_id}")
             raise HTTPException(status_code=404, detail="Utilisateur introuvable.")
 
         # Vérifier si le véhicule existe déjà pour l'utilisateur (plaque unique par user)
@@ -50,7 +51,7 @@ async def create_car_service(db: AsyncSession, user_id: uuid.UUID, car_data: Car
         )
         existing_car = result.scalar_one_or_none()
         if existing_car:
-            logging.warning(f"Le véhicule existe déjà pour cet utilisateur.")
+            logger.warning(f"Le véhicule existe déjà pour cet utilisateur.")
             raise HTTPException(status_code=400, detail="Ce véhicule existe déjà pour cet utilisateur.")
 
         # Créer le nouveau véhicule
@@ -78,8 +79,8 @@ async def create_car_service(db: AsyncSession, user_id: uuid.UUID, car_data: Car
    
     except Exception as e:
     
-        logging.error("Traceback complet:\n" + traceback.format_exc())
-        logging.error(f"Erreur lors de la création du véhicule : {str(e)}")
+        logger.error("Traceback complet:\n" + traceback.format_exc())
+        logger.error(f"Erreur lors de la création du véhicule : {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur interne lors de la création du véhicule.")
     
 
@@ -94,7 +95,7 @@ async def update_car_service(db: AsyncSession, data: CarUpdate) -> CarResponse:
         car = result.scalar_one_or_none()
 
         if not car:
-            logging.error(f"[CarService] ❌ Voiture inexistante ID: {data.id}")
+            logger.error(f"[CarService] ❌ Voiture inexistante ID: {data.id}")
             raise HTTPException(status_code=404, detail=f"Voiture inexistante ID: {data.id}")
 
         # 2️⃣ Met à jour seulement les champs fournis
@@ -108,30 +109,69 @@ async def update_car_service(db: AsyncSession, data: CarUpdate) -> CarResponse:
         await db.commit()
         await db.refresh(car)
 
-        logging.info(f"[CarService] ✅ Voiture mise à jour : {car.id}")
+        car_cache.invalidate(car.id)
+        logger.info(f"[CarService] ✅ Voiture mise à jour : {car.id}")
         return CarResponse.from_orm(car)
 
     except HTTPException:
         raise  # Laisse FastAPI gérer les erreurs HTTP
     except Exception as e:
         await db.rollback()
-        logging.error(f"[CarService] ❌ Erreur interne : {e}")
+        logger.error(f"[CarService] ❌ Erreur interne : {e}")
         raise HTTPException(status_code=500, detail=f"Erreur interne : {e}")
     
     
 async def get_car_by_id_service(db:AsyncSession,car_id:uuid.UUID)-> CarResponse :
+    cached = car_cache.get(car_id)
+    if cached is not None:
+        return cached
+
     try:
 
         result = await db.execute(select(Car).where(Car.id==car_id))
         car_selected =  result.scalar_one_or_none()
         
         if not car_selected:
-            logging.error(f"car introuvable avec l'id {car_id}")
+            logger.error(f"car introuvable avec l'id {car_id}")
             raise HTTPException(status_code=404, detail="Utilisateur introuvable.")
-        return car_selected
+
+        car = CarResponse.model_validate(car_selected)
+        car_cache.set(car_id, car)
+        return car
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Erreur lors de la recherche du vehicule : {str(e)}")
+        logger.error(f"Erreur lors de la recherche du vehicule : {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur interne lors de la recherche de vehicule")
+
+
+async def get_cars_by_ids(db: AsyncSession, car_ids: List[uuid.UUID]) -> List[CarResponse]:
+    """
+    Récupère plusieurs véhicules en un seul aller-retour : cache d'abord,
+    puis une requête IN pour les manquants. Les ids inconnus sont ignorés.
+    """
+    car_ids = list(dict.fromkeys(car_ids))  # dédoublonne en gardant l'ordre
+    if len(car_ids) > settings.CAR_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.CAR_BATCH_MAX_IDS} véhicules par requête.",
+        )
+
+    found = car_cache.get_many(car_ids)
+    missing = [car_id for car_id in car_ids if car_id not in found]
+
+    if missing:
+        try:
+            result = await db.execute(select(Car).where(Car.id.in_(missing)))
+            for car_selected in result.scalars().all():
+                car = CarResponse.model_validate(car_selected)
+                car_cache.set(car.id, car)
+                found[car.id] = car
+        except Exception as e:
+            logger.error(f"Erreur lors de la recherche des vehicules : {str(e)}")
+            raise HTTPException(status_code=500, detail="Erreur interne lors de la recherche de vehicules")
+
+    return [found[car_id] for car_id in car_ids if car_id in found]
     
 
 async def del_car_by_id(db:AsyncSession,car_id:uuid.UUID):
@@ -140,16 +180,15 @@ async def del_car_by_id(db:AsyncSession,car_id:uuid.UUID):
         res = await db.execute(select(Car).where(Car.id==car_id))
         query = res.scalar_one_or_none()
         if not query:
-                logging.warning(f"Le véhicule existe pas .")
+                logger.warning(f"Le véhicule existe pas .")
                 raise HTTPException(status_code=400, detail="Ce véhicule n existe pas.")
-        await db.delete()
-        await db.flush()
-        await db.refresh()
+        await db.delete(query)
+        await db.commit()
+        car_cache.invalidate(car_id)
+    except HTTPException:
+        raise
     except Exception as e :
 
-        
-        logging.error(f"Erreur lors de la suppression du vehicule : {str(e)}")
+        await db.rollback()
+        logger.error(f"Erreur lors de la suppression du vehicule : {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur interne lors de la suppresion de vehicule")
-    
-
-
@@ -7,14 +7,16 @@ from dotenv import load_dotenv
 from fastapi import HTTPException
 from app.db.models.user import User
 from app.db.models.user_code import UserCode
+from app.services.user_service import find_user_by_email, normalize_email
 from app.core.security import get_password_hash
 from app.db.schemas.password import UpdatePasswordRequest
-import aio_pika
-import json
+from app.core.notification_publisher import notification_publisher
 from sqlalchemy import select
 
 from sqlalchemy.orm import selectinload
 
+logger = logging.getLogger(__name__)
+
 import random
 from datetime import datetime, timedelta
 
@@ -29,58 +31,20 @@ RABBITMQ_URL = os.getenv("RABBITMQ_URL")
 QUEUE_NAME = "activate_email_queue"
 
 async def send_activation_email(user_dict: dict) -> None:
-    """Envoi d'un message structuré à RabbitMQ pour activer le compte utilisateur."""
-    try:
-        # Connexion à RabbitMQ
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
-        channel = await connection.channel()  
-        queue = await channel.declare_queue(QUEUE_NAME, durable=True)
-
-        # Sérialiser le message en JSON
-        message_json = json.dumps(user_dict)
-        
-        # Création du message RabbitMQ
-        message = aio_pika.Message(body=message_json.encode())
-
-        # Envoi du message à RabbitMQ
-        await channel.default_exchange.publish(message, routing_key=queue.name)
-        logging.info(f"Message envoyé à RabbitMQ pour activer l'email : {user_dict['email']}")
-
-    except Exception as e:
-        logging.error(f"Erreur lors de l'envoi du message RabbitMQ : {str(e)}")
+    """Dépose un message structuré dans le buffer RabbitMQ pour activer le compte utilisateur."""
+    if notification_publisher.publish(QUEUE_NAME, user_dict):
+        logger.info(f"Message mis en file pour activer l'email : {user_dict['email']}")
 
 
 async def send_reset_code_to_user(db: AsyncSession, email: str):
     """
-    Envoie le code à l'utilisateur via mail et sauvegarde
+    Sauvegarde le code puis l'envoie à l'utilisateur via mail (sans attendre RabbitMQ)
     """
     reset_code = random.randint(100000, 999999)  # ✅ laisse-le en int !
-
+    email = normalize_email(email)
 
     try:
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
-        async with connection:
-            # Création d'un canal
-            channel = await connection.channel()
-
-            # Déclarer la queue
-            await channel.declare_queue(QUEUE_NAME, durable=True)
-
-            # Publier le message
-            message = aio_pika.Message(
-                body=json.dumps({"email": email, "reset_code": reset_code}).encode(),
-                content_type="application/json",
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
-            )
-            await channel.default_exchange.publish(message, routing_key=QUEUE_NAME)
-
-            logging.info(f"Code de réinitialisation envoyé à {email} : {reset_code}")
-    except Exception as e:
-        logging.error(f"Erreur lors de l'envoi du message RabbitMQ pour {email}: {e}")
-        raise HTTPException(status_code=500, detail="Erreur interne lors de l'envoi du code.")
-
-    try:
-        # Sauvegarder le code une fois envoyé
+        # Sauvegarder le code avant l'envoi : le mail ne référence jamais un code absent
         user = await db.execute(select(UserCode).where(UserCode.email == email))
         db_user = user.scalar_one_or_none()
         if db_user:
@@ -94,11 +58,17 @@ async def send_reset_code_to_user(db: AsyncSession, email: str):
             await db.commit()
             await db.refresh(db_user)
 
-        logging.info(f"Code {reset_code} sauvegardé pour {email}")
+        logger.info(f"Code {reset_code} sauvegardé pour {email}")
     except Exception as e:
-        logging.error(f"Erreur lors de la sauvegarde du code pour {email}: {e}")
+        logger.error(f"Erreur lors de la sauvegarde du code pour {email}: {e}")
         raise HTTPException(status_code=500, detail="Erreur interne lors de la sauvegarde du code.")
 
+    # Publier le message (buffer en mémoire, réessayé si RabbitMQ est indisponible)
+    if not notification_publisher.publish(QUEUE_NAME, {"email": email, "reset_code": reset_code}):
+        logger.error(f"Erreur lors de la mise en file du message RabbitMQ pour {email}")
+        raise HTTPException(status_code=500, detail="Erreur interne lors de l'envoi du code.")
+
+    logger.info(f"Code de réinitialisation mis en file pour {email}")
     return {"message": "Code envoyé avec succès."}
 
 from datetime import datetime, timedelta
@@ -112,6 +82,7 @@ async def verify_code(db: AsyncSession, email: str, code: str):
     Vérifie le code de confirmation : valide, correct, non expiré (< 5 min),
     puis le supprime s'il est OK.
     """
+    email = normalize_email(email)
     try:
         result = await db.execute(select(UserCode).where(UserCode.email == email))
         user_code = result.scalar_one_or_none()
@@ -128,14 +99,14 @@ async def verify_code(db: AsyncSession, email: str, code: str):
         await db.delete(user_code)
         await db.commit()
 
-        logging.info(f"Code validé avec succès pour {email}")
+        logger.info(f"Code validé avec succès pour {email}")
         return {"message": "Code validé avec succès."}
 
     except HTTPException as e:
-        logging.warning(f"Échec vérification code pour {email} : {e.detail}")
+        logger.warning(f"Échec vérification code pour {email} : {e.detail}")
         raise
     except Exception as e:
-        logging.error(f"Erreur interne lors de la vérification du code pour {email}: {e}")
+        logger.error(f"Erreur interne lors de la vérification du code pour {email}: {e}")
         raise HTTPException(status_code=500, detail="Erreur interne lors de la vérification du code.")
 
 
@@ -145,10 +116,10 @@ async def get_code_by_email(db: AsyncSession, email: str) :
     """
     try:
         # return db.query(UserCode).filter(UserCode.email == email).first()
-        return await db.execute(select(UserCode).where(UserCode.email==email))
+        return await db.execute(select(UserCode).where(UserCode.email == normalize_email(email)))
     
     except Exception as e:  
-        logging.error(f"Erreur lors de la recherche du code : {str(e)}")
+        logger.error(f"Erreur lors de la recherche du code : {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur interne lors de la recherche du code")
 
 async def create_user_code(db:AsyncSession , email:str, code:int):
@@ -157,11 +128,11 @@ async def create_user_code(db:AsyncSession , email:str, code:int):
     Crée un code pour un utilisateur
     """
     try:
-        new_code =await  UserCode(email=email, code=code)
+        new_code =await  UserCode(email=normalize_email(email), code=code)
         await db.add(new_code)
         await db.commit()
     except Exception as e:
-        logging.error(f"Erreur lors de la création du code : {str(e)}")
+        logger.error(f"Erreur lors de la création du code : {str(e)}")
         await db.rollback()
         raise HTTPException(status_code=500, detail="Erreur interne lors de la création du code")
     
@@ -173,7 +144,7 @@ async def update_user_code(db:AsyncSession , email:str, code:int):
     
     try:
         # result = db.query(UserCode).filter(UserCode.email == email).first()
-        result =await db.execute(select(UserCode).where(UserCode.email ==email))
+        result =await db.execute(select(UserCode).where(UserCode.email == normalize_email(email)))
         user_code = result.scalar_one_or_none()
         # user_code = result.scalars().first()
         db.refresh(user_code)
@@ -189,7 +160,7 @@ async def update_user_code(db:AsyncSession , email:str, code:int):
             raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
         
     except Exception as e:
-        logging.error(f"Erreur lors de la mise à jour du code : {str(e)}")
+        logger.error(f"Erreur lors de la mise à jour du code : {str(e)}")
         await db.rollback()
         raise HTTPException(status_code=500, detail="Erreur interne lors de la mise à jour du code")
     
@@ -200,7 +171,7 @@ async def delete_user_code(db:AsyncSession , email:str):
     """
     try:
         # user_code = db.query(UserCode).filter(UserCode.email == email).first()
-        result =await db.execute(select(UserCode).where(UserCode.email==email))
+        result =await db.execute(select(UserCode).where(UserCode.email == normalize_email(email)))
         user_code = result.scalar_one_or_none()
         if user_code:
             await db.delete(user_code)
@@ -208,7 +179,7 @@ async def delete_user_code(db:AsyncSession , email:str):
         else:
             raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
     except Exception as e:
-        logging.error(f"Erreur lors de la suppression du code : {str(e)}")
+        logger.error(f"Erreur lors de la suppression du code : {str(e)}")
         await db.rollback()
         raise HTTPException(status_code=500, detail="Erreur interne lors de la suppression du code")
     
@@ -218,12 +189,10 @@ async def update_user_password(db: AsyncSession, email: str, new_password: str):
     Fonction pour mettre à jour le mot de passe d'un utilisateur.
     """
     try:
-        # user = db.query(User).filter(User.email == email).first()
-        result = await db.execute(select(User).where(User.email ==email))
-        user= result.scalar_one_or_none()
+        user = await find_user_by_email(db, email)
         if not user:
-            logging.warning("Password update failed for user ID: %s", email)
-            raise RuntimeError("User not found.")
+            logger.warning("Password update failed for user ID: %s", email)
+            raise HTTPException(status_code=404, detail="Utilisateur introuvable.")
         
         # Mise à jour du mot de passe
         user.password_hash = pwd_context.hash(new_password)
@@ -232,10 +201,12 @@ async def update_user_password(db: AsyncSession, email: str, new_password: str):
         await db.commit()
         await db.refresh(user)  # Rafraîchir l'objet utilisateur
         
-        logging.info("Password updated successfully for user ID: %s", email)
+        logger.info("Password updated successfully for user ID: %s", email)
         return {"id": str(user.id)}
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error("Error updating password for user ID %s: %s", email, str(e))
+        logger.error("Error updating password for user ID %s: %s", email, str(e))
         await db.rollback()
         raise RuntimeError(f"Error updating password: {e}")
\ No newline at end of file
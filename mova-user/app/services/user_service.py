@@ -5,29 +5,30 @@ from dotenv import load_dotenv
 from fastapi import HTTPException
 from app.db.models.user import User
 from app.core.security import get_password_hash, hash_password
-import aio_pika
-import json
+from app.core.notification_publisher import notification_publisher
 from sqlalchemy.orm import selectinload
 import uuid
 import os
 import traceback
-from typing import List
+from typing import List, Optional
 import bcrypt
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 
 
 
-from app.db.schemas.user import UserCreate, UserResponse,UserResponseFind,UserUpdate, UsersType
+from app.db.schemas.user import (
+    UserCreate, UserResponse, UserResponseFind, UserUpdate, UsersType,
+    UserIdentity, UserProfile, UserProfileWithCars, UserDisplay,
+)
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.schemas.car import CarResponse
+from app.db.models.car import Car
 from app.db.schemas.password import UpdatePasswordRequest
 
-# Configuration du logger
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-        logging.FileHandler("user_logs.log"),  # Nom du fichier de log
-        logging.StreamHandler()  # Envoie également les logs à la console
-    ])
+logger = logging.getLogger(__name__)
 
 
 load_dotenv()
@@ -40,55 +41,45 @@ QUEUE_NAME_VERIFICATION = "id_verification_queue"
 
 
 async def send_activation_email(user_dict: dict) -> None:
-    """Envoi d'un message structuré à RabbitMQ pour activer le compte utilisateur."""
-    try:
-        # Connexion à RabbitMQ
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
-        channel = await connection.channel()  
-        queue = await channel.declare_queue(QUEUE_NAME, durable=True)
+    """Dépose un message structuré dans le buffer RabbitMQ pour activer le compte utilisateur."""
+    if notification_publisher.publish(QUEUE_NAME, user_dict):
+        logger.info(f"Message mis en file pour activer l'email : {user_dict['email']}")
 
-        # Sérialiser le message en JSON
-        message_json = json.dumps(user_dict)
-        
-        # Création du message RabbitMQ
-        message = aio_pika.Message(body=message_json.encode())
+async def send_id_verfication(user_dict: dict) -> None:
+    """Dépose un message structuré dans le buffer RabbitMQ pour passer id dans le microservice de
+     verification ."""
+    if notification_publisher.publish(QUEUE_NAME, user_dict):
+        logger.info(f"Message mis en file pour PASSER ID   : {user_dict['email']}")
 
-        # Envoi du message à RabbitMQ
-        await channel.default_exchange.publish(message, routing_key=queue.name)
-        logging.info(f"Message envoyé à RabbitMQ pour activer l'email : {user_dict['email']}")
 
-    except Exception as e:
-        logging.error(f"Erreur lors de l'envoi du message RabbitMQ : {str(e)}")
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select
 
-async def send_id_verfication(user_dict: dict) -> None:
-    """Envoi d'un message structuré à RabbitMQ pour passer id  dans le microservice de 
-     verification ."""
-    try:
-        # Connexion à RabbitMQ
-        connection = await aio_pika.connect_robust(RABBITMQ_URL)
-        channel = await connection.channel()  
-        queue = await channel.declare_queue(QUEUE_NAME, durable=True)
 
-        # Sérialiser le message en JSON
-        message_json = json.dumps(user_dict)
-        
-        # Création du message RabbitMQ
-        message = aio_pika.Message(body=message_json.encode())
+# ------------------------------------------------------------
+# Emails : normalisés à l'écriture, recherchés via l'index lower(email)
+# ------------------------------------------------------------
+def normalize_email(email: str) -> str:
+    """Forme canonique d'un email (sans espaces, en minuscules)."""
+    return email.strip().lower()
 
-        # Envoi du message à RabbitMQ
-        await channel.default_exchange.publish(message, routing_key=queue.name)
-        logging.info(f"Message envoyé à RabbitMQ pour PASSER ID   : {user_dict['email']}")
 
-    except Exception as e:
-        logging.error(f"Erreur lors de l'envoi du message RabbitMQ : {str(e)}")
+def user_email_matches(email: str):
+    """Critère SQL sur lower(email) : une seule sonde de l'index uq_users_email_lower."""
+    return func.lower(User.email) == normalize_email(email)
 
 
-from sqlalchemy.orm import selectinload
-from sqlalchemy import select
+async def find_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    """
+    Recherche unique d'un utilisateur par email, utilisée par l'inscription,
+    la connexion et la réinitialisation du mot de passe.
+    """
+    result = await db.execute(select(User).where(user_email_matches(email)))
+    return result.scalar_one_or_none()
+
 
 async def create_user(db: AsyncSession, user: UserCreate) -> UserResponse:
-    result = await db.execute(select(User).where(User.email == user.email))
-    existing_user = result.scalar_one_or_none()
+    existing_user = await find_user_by_email(db, user.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Un utilisateur avec cet email existe déjà.")
 
@@ -97,7 +88,7 @@ async def create_user(db: AsyncSession, user: UserCreate) -> UserResponse:
     new_user = User(
         first_name=user.first_name,
         last_name=user.last_name,
-        email=user.email,
+        email=normalize_email(user.email),
         town=user.town,
         user_role="passenger",
         phone_number=user.phone_number,
@@ -121,13 +112,11 @@ async def create_user(db: AsyncSession, user: UserCreate) -> UserResponse:
         await send_activation_email(user_dict)
         await send_id_verfication(user_dict)
 
-        # ⚠️ Recharge AVEC `cars` préchargés (sinon boom avec Pydantic)
-        result = await db.execute(
-            select(User).options(selectinload(User.cars)).where(User.id == new_user.id)
+        # Un nouvel utilisateur n'a pas encore de véhicule : pas besoin de recharger `cars`
+        return UserResponse(
+            **{column.key: getattr(new_user, column.key) for column in PROFILE_COLUMNS},
+            cars=[],
         )
-        user_with_cars = result.scalar_one()
-
-        return UserResponse.model_validate(user_with_cars)
 
     except Exception as e:
         await db.rollback()
@@ -138,15 +127,15 @@ async def get_user_by_email(db: AsyncSession, email: str) -> UserResponseFind:
     Récupère un utilisateur par son email.
     """
     try:
-        
-        result = await db.execute(select(User).where(User.email == email))
-        user = result.scalar_one_or_none()
+        user = await find_user_by_email(db, email)
         if not user:
-            logging.error(f"Utilisateur introuvable avec l'email {email}")
+            logger.error(f"Utilisateur introuvable avec l'email {email}")
             raise HTTPException(status_code=404, detail="Utilisateur introuvable.")
         return user
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Erreur lors de la recherche de l'utilisateur : {str(e)}")
+        logger.error(f"Erreur lors de la recherche de l'utilisateur : {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="Erreur interne lors de la recherche de l utilisateur")
                             
@@ -157,48 +146,180 @@ async def get_user_by_id(db: AsyncSession, user_id: uuid) -> UserResponse:
         
         
         if not user:
-            logging.error(f"Utilisateur introuvable avec l'id {user_id}")
+            logger.error(f"Utilisateur introuvable avec l'id {user_id}")
             raise HTTPException(status_code=404, detail="Utilisateur introuvable.")
         return user
     except Exception as e:
-        logging.error(f"Erreur lors de la recherche de l'utilisateur : {str(e)}")
+        logger.error(f"Erreur lors de la recherche de l'utilisateur : {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur interne lors de la recherche de l'utilisateur")
     
    
    
 
-async def get_users_by_user_type(db: AsyncSession, user_type: UsersType) -> List[UserResponseFind]:
+# ------------------------------------------------------------
+# Projections : SELECT colonne par colonne, sans relation chargée
+# ------------------------------------------------------------
+IDENTITY_COLUMNS = (User.id, User.email, User.user_role, User.is_active)
+
+PROFILE_COLUMNS = (
+    User.id,
+    User.first_name,
+    User.last_name,
+    User.email,
+    User.town,
+    User.phone_number,
+    User.date_of_birth,
+    User.user_role,
+    User.is_active,
+    User.created_at,
+    User.updated_at,
+)
+
+USERS_PAGE_MAX_LIMIT = 200
+
+
+async def get_user_identity(db: AsyncSession, user_id: uuid.UUID) -> UserIdentity:
+    """
+    Récupère l'identité minimale d'un utilisateur (id, email, rôle, statut).
+    """
+    result = await db.execute(select(*IDENTITY_COLUMNS).where(User.id == user_id))
+    row = result.mappings().one_or_none()
+    if not row:
+        logger.error(f"Utilisateur introuvable avec l'id {user_id}")
+        raise HTTPException(status_code=404, detail="Utilisateur introuvable.")
+    return UserIdentity.model_validate(row)
+
+
+async def get_user_identity_by_email(db: AsyncSession, email: str) -> UserIdentity:
+    """
+    Récupère l'identité minimale d'un utilisateur par son email.
+    """
+    result = await db.execute(select(*IDENTITY_COLUMNS).where(user_email_matches(email)))
+    row = result.mappings().one_or_none()
+    if not row:
+        logger.error(f"Utilisateur introuvable avec l'email {email}")
+        raise HTTPException(status_code=404, detail="Utilisateur introuvable.")
+    return UserIdentity.model_validate(row)
+
+
+async def _get_user_profile_where(db: AsyncSession, criterion, label: str) -> UserProfile:
+    result = await db.execute(select(*PROFILE_COLUMNS).where(criterion))
+    row = result.mappings().one_or_none()
+    if not row:
+        logger.error(f"Utilisateur introuvable avec {label}")
+        raise HTTPException(status_code=404, detail="Utilisateur introuvable.")
+    return UserProfile.model_validate(row)
+
+
+async def _with_cars(db: AsyncSession, profile: UserProfile) -> UserProfileWithCars:
+    result = await db.execute(select(Car).where(Car.user_id == profile.id))
+    cars = [CarResponse.model_validate(car) for car in result.scalars().all()]
+    return UserProfileWithCars(**profile.model_dump(), cars=cars)
+
+
+async def get_user_profile(db: AsyncSession, user_id: uuid.UUID) -> UserProfile:
+    """
+    Récupère le profil d'un utilisateur sans ses véhicules.
     """
-    Récupère tous les utilisateurs d'un type spécifique.
+    return await _get_user_profile_where(db, User.id == user_id, f"l'id {user_id}")
+
+
+async def get_user_profile_with_cars(db: AsyncSession, user_id: uuid.UUID) -> UserProfileWithCars:
+    """
+    Récupère le profil d'un utilisateur et ses véhicules (2 requêtes, aucune entité User hydratée).
+    """
+    return await _with_cars(db, await _get_user_profile_where(db, User.id == user_id, f"l'id {user_id}"))
+
+
+async def get_user_profile_with_cars_by_email(db: AsyncSession, email: str) -> UserProfileWithCars:
+    """
+    Récupère le profil d'un utilisateur et ses véhicules à partir de son email.
+    """
+    return await _with_cars(db, await _get_user_profile_where(db, user_email_matches(email), f"l'email {email}"))
+
+
+# Cache des données d'affichage (UserDisplay, clé = user id)
+# Invalidé par update_user et delete_user ; le TTL couvre les autres workers.
+DISPLAY_COLUMNS = (User.id, User.first_name, User.last_name, User.town)
+user_display_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+
+async def get_users_by_ids(db: AsyncSession, user_ids: List[uuid.UUID]) -> List[UserDisplay]:
+    """
+    Récupère les données d'affichage de plusieurs utilisateurs en un aller-retour :
+    cache d'abord, puis une seule requête IN pour les manquants. Les ids inconnus sont ignorés.
+    """
+    user_ids = list(dict.fromkeys(user_ids))  # dédoublonne en gardant l'ordre
+    if len(user_ids) > settings.USER_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.USER_BATCH_MAX_IDS} utilisateurs par requête.",
+        )
+
+    found = user_display_cache.get_many(user_ids)
+    missing = [user_id for user_id in user_ids if user_id not in found]
+
+    if missing:
+        try:
+            result = await db.execute(select(*DISPLAY_COLUMNS).where(User.id.in_(missing)))
+            for row in result.mappings().all():
+                user = UserDisplay.model_validate(row)
+                user_display_cache.set(user.id, user)
+                found[user.id] = user
+        except Exception as e:
+            logger.error(f"Erreur lors de la recherche des utilisateurs : {str(e)}")
+            raise HTTPException(status_code=500, detail="Erreur interne lors de la recherche des utilisateurs.")
+
+    return [found[user_id] for user_id in user_ids if user_id in found]
+
+
+async def get_users_by_user_type(
+    db: AsyncSession, user_type: UsersType, skip: int = 0, limit: int = 50
+) -> List[UserProfile]:
+    """
+    Récupère une page d'utilisateurs d'un type (rôle) spécifique.
     """
     try:
-        # users = db.query(User).filter(User.user_type == user_type.value).all()
-        result = await db.execute(select(User).where(User.user_type==user_type.value))
-        users = result.all
-        if not users:
-            logging.warning(f"Aucun utilisateur trouvé avec le type {user_type.value}.")
+        limit = min(limit, USERS_PAGE_MAX_LIMIT)
+        result = await db.execute(
+            select(*PROFILE_COLUMNS)
+            .where(User.user_role == user_type.value)
+            .order_by(User.created_at.desc(), User.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        users = [UserProfile.model_validate(row) for row in result.mappings().all()]
+        if not users and skip == 0:
+            logger.warning(f"Aucun utilisateur trouvé avec le type {user_type.value}.")
             raise HTTPException(status_code=404, detail="Aucun utilisateur trouvé.")
         return users
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Erreur lors de la recherche des utilisateurs : {str(e)}")
+        logger.error(f"Erreur lors de la recherche des utilisateurs : {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur interne lors de la recherche des utilisateurs.")
 
-async def get_users(db: AsyncSession) -> List[UserResponseFind]:
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 50) -> List[UserProfile]:
     """
-    Récupère tous les utilisateurs.
+    Récupère une page d'utilisateurs (profil sans véhicules).
     """
     try:
-        # users = db.query(User).all()
-        result = await db.execute(select(User))
-        users = result.all()
-        if not users:
-            logging.error("Aucun utilisateur trouvé.")
+        limit = min(limit, USERS_PAGE_MAX_LIMIT)
+        result = await db.execute(
+            select(*PROFILE_COLUMNS)
+            .order_by(User.created_at.desc(), User.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        users = [UserProfile.model_validate(row) for row in result.mappings().all()]
+        if not users and skip == 0:
+            logger.error("Aucun utilisateur trouvé.")
             raise HTTPException(status_code=404, detail="Aucun utilisateur trouvé.")
-        
-        # Convert SQLAlchemy models to Pydantic models
-        return [UserResponseFind.from_orm(user) for user in users]
+        return users
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Erreur lors de la recherche des utilisateurs : {str(e)}")
+        logger.error(f"Erreur lors de la recherche des utilisateurs : {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur interne lors de la recherche des utilisateurs.")
 
 
@@ -212,11 +333,12 @@ async def update_user(db: AsyncSession, user_id: uuid, user: UserUpdate) -> User
         result = await db.execute(select(User).where(User.id ==user_id))
         existing_user = result.scalar_one_or_none()
         if not existing_user:
-            logging.error(f"Utilisateur introuvable avec l'id {user_id}")
+            logger.error(f"Utilisateur introuvable avec l'id {user_id}")
             raise HTTPException(status_code=404, detail="Utilisateur introuvable.")
         
         # Vérification si l'email ou le numéro de téléphone a changé
-        email_changed = existing_user.email != user.email and user.email is not None
+        new_email = normalize_email(user.email) if user.email is not None else None
+        email_changed = new_email is not None and existing_user.email != new_email
         phone_changed = existing_user.phone_number != user.phone_number and user.phone_number is not None
 
         # Mise à jour des informations générales
@@ -228,7 +350,7 @@ async def update_user(db: AsyncSession, user_id: uuid, user: UserUpdate) -> User
 
         # Mise à jour de l'email uniquement s'il a changé
         if email_changed:
-            existing_user.email = user.email
+            existing_user.email = new_email
             existing_user.is_email_verified = False
             await send_activation_email({"email": existing_user.email, "id": str(existing_user.id)})
 
@@ -242,14 +364,15 @@ async def update_user(db: AsyncSession, user_id: uuid, user: UserUpdate) -> User
         # Enregistrement des modifications
         await db.commit()
         await db.refresh(existing_user)
+        user_display_cache.invalidate(existing_user.id)
 
-        logging.info(f"Utilisateur mis à jour avec succès : {existing_user.email}")
+        logger.info(f"Utilisateur mis à jour avec succès : {existing_user.email}")
 
         return existing_user  # Doit correspondre au modèle `UserResponse`
 
     except Exception as e:
         await db.rollback()
-        logging.error(f"Erreur lors de la mise à jour de l'utilisateur : {str(e)}")
+        logger.error(f"Erreur lors de la mise à jour de l'utilisateur : {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur interne lors de la mise à jour de l'utilisateur.")
 
 async def delete_user(db: AsyncSession, user_id: uuid) -> None:
@@ -262,29 +385,28 @@ async def delete_user(db: AsyncSession, user_id: uuid) -> None:
         result = await db.execute(select(User).where(User.id ==user_id))
         existing_user = result.scalar_one_or_none()
         if not existing_user:
-            logging.error(f"Utilisateur introuvable avec l'id {user_id}")
+            logger.error(f"Utilisateur introuvable avec l'id {user_id}")
             raise HTTPException(status_code=404, detail="Utilisateur introuvable.")
         
         # Suppression de l'utilisateur
         await db.delete(existing_user)
         await db.commit()
-        logging.info(f"Utilisateur supprimé avec succès : {existing_user.email}")
+        user_display_cache.invalidate(existing_user.id)
+        logger.info(f"Utilisateur supprimé avec succès : {existing_user.email}")
         return True
 
     except Exception as e:
         await db.rollback()
-        logging.error(f"Erreur lors de la suppression de l'utilisateur : {str(e)}")
+        logger.error(f"Erreur lors de la suppression de l'utilisateur : {str(e)}")
         raise HTTPException(status_code=500, detail="Erreur interne lors de la suppression de l utisateur.")
     
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 async def update_user_password(db: AsyncSession, user_email: str, new_password: str):
     try:
-        # user = db.query(User).filter(User.email == user_email).one_or_none()
-        result = await db.execute(select(User).where(User.email==user_email))
-        user = result.scalar_one_or_none()
+        user = await find_user_by_email(db, user_email)
         if not user:
-            logging.warning("Password update failed: User with email %s not found", user_email)
+            logger.warning("Password update failed: User with email %s not found", user_email)
             raise RuntimeError("User not found.")
 
         # Génération d'un nouveau salt et hachage du mot de passe
@@ -298,33 +420,31 @@ async def update_user_password(db: AsyncSession, user_email: str, new_password:
         await db.commit()
         await db.refresh(user)
 
-        logging.info("Password updated successfully for user email: %s", user_email)
+        logger.info("Password updated successfully for user email: %s", user_email)
         return {"email": user.email}
 
     except Exception as e:
         await db.rollback()
-        logging.error("Database error while updating password for %s: %s", user_email, str(e))
+        logger.error("Database error while updating password for %s: %s", user_email, str(e))
         raise RuntimeError(f"Database error: {e}")
 
     except Exception as e:
-        logging.error("Unexpected error updating password for %s: %s", user_email, str(e))
+        logger.error("Unexpected error updating password for %s: %s", user_email, str(e))
         raise RuntimeError(f"Error updating password: {e}")
 
 async def reset_password_request(db: AsyncSession, user: UpdatePasswordRequest):
     try:
-        # user_record = db.query(User).filter(User.email == user.email).first()
-        result = await db.execute(select(User).where(User.email ==user.email))
-        user_record = result.scalar_one_or_none()
+        user_record = await find_user_by_email(db, user.email)
         if not user_record:
-            logging.warning("User not found for password reset: %s", user.email)
+            logger.warning("User not found for password reset: %s", user.email)
             raise HTTPException(status_code=404, detail="User not found")
 
         hashed_password, salt_password = get_password_hash(user.new_password)
         return update_user_password(db, user_id=user_record.id, new_password=hashed_password, salt=salt_password)
 
     except HTTPException as http_error:
-        logging.error("HTTP error during password reset request: %s", http_error.detail)
+        logger.error("HTTP error during password reset request: %s", http_error.detail)
         raise
     except Exception as e:
-        logging.error("Unexpected error during password reset request: %s", str(e))
+        logger.error("Unexpected error during password reset request: %s", str(e))
         raise RuntimeError(f"Error during password reset request: {e}")
\ No newline at end of file
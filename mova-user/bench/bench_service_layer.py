@@ -0,0 +1,21 @@
+"""Micro-benchmarks : connexion (voir conftest.py)."""
+import pytest
+from fastapi import HTTPException
+
+from app.services.auth_service import login_user
+
+
+def bench_login_user(benchmark, call, dataset):
+    # Coût dominé par bcrypt.verify : mesure aussi le facteur de coût configuré
+    email = dataset["emails"][len(dataset["emails"]) // 2]
+    token, refresh_token, user = benchmark(call, login_user, email.upper(), dataset["password"])
+    assert user.email == email
+
+
+def bench_login_user_unknown_email(benchmark, call, dataset):
+    # Chemin sans bcrypt : uniquement la sonde lower(email)
+    def login_unknown():
+        with pytest.raises(HTTPException):
+            call(login_user, "nobody@bench.mova", dataset["password"])
+
+    benchmark(login_unknown)
@@ -0,0 +1,161 @@
+"""
+Benchmark : lectures utilisateur complètes (ORM + selectinload(User.cars)) vs projections.
+
+Mesure, pour chaque scénario, le nombre de requêtes SQL, les octets de données
+remontés par ligne et le temps moyen. Les données sont créées puis supprimées.
+
+Lancement (depuis mova-user/, avec DATABASE_URL défini) :
+    python -m bench.bench_user_projections --users 500 --cars 2 --iterations 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import selectinload
+
+from app.db.database import async_session, dispose_engine, get_engine
+from app.db.models.car import Car
+from app.db.models.user import User
+from app.services.user_service import get_user_identity, get_user_profile, get_users
+
+EMAIL_PREFIX = "bench-proj-"
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def _value_bytes(value) -> int:
+    return 0 if value is None else len(str(value).encode())
+
+
+def _orm_bytes(obj) -> int:
+    total = sum(_value_bytes(getattr(obj, c.key)) for c in obj.__table__.columns)
+    for car in obj.__dict__.get("cars") or []:
+        total += _orm_bytes(car)
+    return total
+
+
+def _schema_bytes(model) -> int:
+    return sum(_value_bytes(v) for v in model.model_dump().values())
+
+
+async def seed(n_users: int, n_cars: int) -> list[uuid.UUID]:
+    ids = []
+    async with async_session() as db:
+        for i in range(n_users):
+            user_id = uuid.uuid4()
+            ids.append(user_id)
+            db.add(User(
+                id=user_id,
+                first_name=f"Bench{i}",
+                last_name="Projection",
+                email=f"{EMAIL_PREFIX}{i}@example.com",
+                town="Montreal",
+                phone_number="5140000000",
+                date_of_birth="1990-01-01",
+                password_hash="x" * 60,
+                user_role="passenger",
+                is_active="active",
+                created_at=datetime.utcnow(),
+                updated_at=datetime.utcnow(),
+            ))
+            for j in range(n_cars):
+                db.add(Car(
+                    user_id=user_id,
+                    brand="Toyota",
+                    model="Corolla",
+                    color="gris",
+                    license_plate=f"BP{i:05d}{j}",
+                    seats=4,
+                    type_of_car="berline",
+                    date_of_car=2020,
+                    created_at=datetime.utcnow(),
+                    updated_at=datetime.utcnow(),
+                ))
+        await db.commit()
+    return ids
+
+
+async def cleanup(ids: list[uuid.UUID]) -> None:
+    async with async_session() as db:
+        await db.execute(delete(Car).where(Car.user_id.in_(ids)))
+        await db.execute(delete(User).where(User.id.in_(ids)))
+        await db.commit()
+
+
+async def run_scenario(name: str, fn, iterations: int, counter: QueryCounter) -> dict:
+    queries, row_bytes, rows = 0, 0, 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        async with async_session() as db:
+            before = counter.count
+            result = await fn(db)
+            queries += counter.count - before
+            items = result if isinstance(result, list) else [result]
+            rows += len(items)
+            row_bytes += sum(
+                _schema_bytes(item) if hasattr(item, "model_dump") else _orm_bytes(item)
+                for item in items
+            )
+    elapsed = (time.perf_counter() - start) / iterations
+    return {
+        "scénario": name,
+        "requêtes/appel": queries / iterations,
+        "octets/ligne": row_bytes / max(rows, 1),
+        "lignes/appel": rows / iterations,
+        "ms/appel": elapsed * 1000,
+    }
+
+
+async def main(args) -> None:
+    ids = await seed(args.users, args.cars)
+    target = ids[len(ids) // 2]
+    counter = QueryCounter()
+    engine = get_engine()
+    event.listen(engine.sync_engine, "after_cursor_execute", counter)
+
+    async def full_user_with_cars(db):
+        res = await db.execute(select(User).options(selectinload(User.cars)).where(User.id == target))
+        return res.scalar_one()
+
+    async def full_user_list(db):
+        res = await db.execute(select(User).where(User.email.like(f"{EMAIL_PREFIX}%")))
+        return list(res.scalars().all())
+
+    scenarios = [
+        ("avant  refresh : User + cars", full_user_with_cars),
+        ("après  refresh : identité", lambda db: get_user_identity(db, target)),
+        ("après  profil sans cars", lambda db: get_user_profile(db, target)),
+        ("avant  liste admin : table entière", full_user_list),
+        ("après  liste admin : page de 50", lambda db: get_users(db, skip=0, limit=50)),
+    ]
+
+    try:
+        results = [await run_scenario(name, fn, args.iterations, counter) for name, fn in scenarios]
+    finally:
+        event.remove(engine.sync_engine, "after_cursor_execute", counter)
+        await cleanup(ids)
+        await dispose_engine()
+
+    print(f"{'scénario':40} {'requêtes':>9} {'octets/ligne':>13} {'lignes':>8} {'ms':>8}")
+    for r in results:
+        print(
+            f"{r['scénario']:40} {r['requêtes/appel']:9.1f} {r['octets/ligne']:13.0f} "
+            f"{r['lignes/appel']:8.0f} {r['ms/appel']:8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--cars", type=int, default=2)
+    parser.add_argument("--iterations", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,112 @@
+"""
+Micro-benchmarks de la couche service (pytest-benchmark), sous le niveau HTTP.
+
+La base est lue dans BENCH_DATABASE_URL (défaut : fichier SQLite local via aiosqlite).
+Elle remplace DATABASE_URL avant l'import de `app` ; ses tables sont vidées puis
+ré-alimentées à chaque run. Une base PostgreSQL doit être dédiée (« bench » dans son nom)
+et reçoit les migrations Alembic, donc les mêmes index qu'en production.
+
+Depuis mova-user/ :
+    python -m pytest bench --bench-size 5000 --benchmark-save=baseline
+    python -m pytest bench --bench-size 5000 --benchmark-compare   # échoue si régression > seuil (pytest.ini)
+"""
+import asyncio
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite+aiosqlite:///./bench.sqlite3")
+if not BENCH_DATABASE_URL.startswith("sqlite") and "bench" not in BENCH_DATABASE_URL.rsplit("/", 1)[-1]:
+    raise pytest.UsageError("BENCH_DATABASE_URL doit viser une base dédiée (nom contenant « bench »)")
+
+os.environ["DATABASE_URL"] = BENCH_DATABASE_URL
+os.environ["RABBITMQ_URL"] = ""  # aucune publication pendant les mesures
+
+from app.core.security import pwd_context  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.database import async_session, dispose_engine, get_engine  # noqa: E402
+from app.db.models.car import Car  # noqa: E402,F401  (table liée par FK)
+from app.db.models.user import User  # noqa: E402
+
+PASSWORD = "Bench!2025"
+BATCH = 1000
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-size", type=int, default=int(os.getenv("BENCH_SIZE", 1000)),
+        help="nombre d'utilisateurs du jeu de données",
+    )
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Exécute une coroutine sur l'unique boucle du bench (le pool SQL y est attaché)."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.run_until_complete(dispose_engine())
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def call(run, dataset):
+    """call(service_fn, *args) : une session neuve par appel, comme get_db() dans une requête."""
+
+    def call(fn, *args, **kwargs):
+        async def go():
+            async with async_session() as db:
+                return await fn(db, *args, **kwargs)
+
+        return run(go())
+
+    return call
+
+
+async def reset_schema() -> None:
+    engine = get_engine()
+    if engine.dialect.name == "sqlite":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        return
+
+    from app.db.migrate import upgrade
+
+    await asyncio.to_thread(upgrade, "head")
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+
+
+async def insert(rows: list) -> None:
+    for start in range(0, len(rows), BATCH):
+        async with async_session() as db:
+            db.add_all(rows[start:start + BATCH])
+            await db.commit()
+
+
+@pytest.fixture(scope="session")
+def dataset(run, request) -> dict:
+    """Utilisateurs actifs partageant un même hash bcrypt (un seul hachage au seed)."""
+    size = request.config.getoption("--bench-size")
+    password_hash = pwd_context.hash(PASSWORD)
+    now = datetime.utcnow()
+
+    rows = [
+        User(
+            id=uuid.uuid4(), first_name=f"Bench{i}", last_name="User", email=f"bench-{i}@bench.mova",
+            town="montreal", phone_number="5140000000", password_hash=password_hash,
+            user_role="passenger", is_active="active", date_of_birth="1990-01-01",
+            created_at=now, updated_at=now,
+        )
+        for i in range(size)
+    ]
+
+    async def seed():
+        await reset_schema()
+        await insert(rows)
+
+    run(seed())
+    return {"emails": [u.email for u in rows], "password": PASSWORD}
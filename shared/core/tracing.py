@@ -0,0 +1,125 @@
+"""
+Traces distribuées (OpenTelemetry), activées avec TRACING_ENABLED=true.
+
+Le contexte W3C (`traceparent`) circule :
+- dans les en-têtes HTTP (middleware serveur ci-dessous, `inject_headers()` côté client) ;
+- dans les en-têtes des messages RabbitMQ (publication/consommation : app.core.amqp).
+
+Les spans sont exportés vers un collecteur OTLP (TRACING_EXPORTER=otlp, endpoint
+OTEL_EXPORTER_OTLP_ENDPOINT) ou écrits en JSON lignes dans TRACE_FILE
+(TRACING_EXPORTER=file). Désactivé, l'API OpenTelemetry reste un no-op.
+
+Module commun aux services : original dans shared/core/tracing.py, recopié dans
+chaque app/core/ par `python shared/sync_core.py` (ne pas modifier une copie).
+"""
+import logging
+from typing import Optional
+
+from opentelemetry import propagate, trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from app.core.config import settings
+from app.core.metrics import route_template
+
+SERVICE_NAME = settings.SERVICE_NAME
+
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer(SERVICE_NAME)
+
+_provider = None
+
+
+def setup_tracing(app=None) -> None:
+    """
+    Installe le TracerProvider et l'exporteur (une fois par processus) et, si `app`
+    est fourni, le middleware HTTP. Sans effet si TRACING_ENABLED est faux.
+    """
+    global _provider
+    if not settings.TRACING_ENABLED:
+        return
+    if app is not None:
+        app.add_middleware(TracingMiddleware)
+    if _provider is not None:
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+    if settings.TRACING_EXPORTER == "file":
+        exporter = ConsoleSpanExporter(
+            out=open(settings.TRACE_FILE, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    else:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        exporter = OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT)
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+    logger.info(f"🔭 Traces activées ({settings.TRACING_EXPORTER})")
+
+
+def shutdown_tracing() -> None:
+    """Envoie les spans en attente (arrêt du service)."""
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+def inject_headers(headers: Optional[dict] = None) -> dict:
+    """Ajoute le contexte de trace courant à des en-têtes HTTP ou AMQP."""
+    headers = {} if headers is None else headers
+    propagate.inject(headers)
+    return headers
+
+
+def extract_context(headers: Optional[dict]):
+    """Contexte parent lu dans des en-têtes HTTP ou AMQP (valeurs bytes acceptées)."""
+    carrier = {
+        k: (v.decode() if isinstance(v, bytes) else str(v))
+        for k, v in (headers or {}).items()
+    }
+    return propagate.extract(carrier)
+
+
+class TracingMiddleware:
+    """Middleware ASGI : un span SERVER par requête, rattaché au `traceparent` reçu."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=extract_context(headers),
+            kind=SpanKind.SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        ) as span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = route_template(scope)
+                if route != "unmatched":
+                    span.update_name(f"{scope['method']} {route}")
+                    span.set_attribute("http.route", route)
+                span.set_attribute("http.status_code", status)
+                if status >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
@@ -0,0 +1,56 @@
+"""
+Modules communs de app/core (métriques, instrumentation SQL, traces, logs, client RabbitMQ).
+
+Les services sont déployés séparément, chacun avec son propre package `app` : les
+modules communs y sont recopiés plutôt qu'importés. L'original est dans shared/core/ ;
+ce script le recopie dans chaque service, ou vérifie (--check, en CI) qu'aucune copie
+n'a divergé. Ce qui varie d'un service à l'autre passe par settings (SERVICE_NAME…).
+
+    python shared/sync_core.py           # recopie
+    python shared/sync_core.py --check   # échoue si une copie diffère de l'original
+"""
+import argparse
+import filecmp
+import shutil
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SOURCE = ROOT / "shared" / "core"
+SERVICES = ("mova-trip", "mova-booking", "mova-payment", "mova-user")
+
+# Module → services qui l'utilisent (mova-user publie via app.core.notification_publisher)
+SHARED_MODULES = {
+    "metrics.py": SERVICES,
+    "sql_instrumentation.py": SERVICES,
+    "tracing.py": SERVICES,
+    "logging_config.py": SERVICES,
+    "amqp.py": ("mova-trip", "mova-booking", "mova-payment"),
+}
+
+
+def copies():
+    for name, services in SHARED_MODULES.items():
+        for service in services:
+            yield SOURCE / name, ROOT / service / "app" / "core" / name
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--check", action="store_true", help="vérifie sans recopier")
+    args = parser.parse_args(argv)
+
+    stale = [target for source, target in copies() if not target.exists() or not filecmp.cmp(source, target, shallow=False)]
+    if args.check:
+        for target in stale:
+            print(f"❌ {target.relative_to(ROOT)} diffère de shared/core/{target.name}", file=sys.stderr)
+        return 1 if stale else 0
+
+    for target in stale:
+        shutil.copyfile(SOURCE / target.name, target)
+        print(f"🔄 {target.relative_to(ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,163 @@
+"""
+Benchmark : latence HTTP du trip service pendant une rafale de mises à jour de places.
+
+Deux modes comparés, chacun dans des processus neufs (cwd = mova-trip, .env du service) :
+- inline : consumer RabbitMQ dans le process uvicorn (RUN_CONSUMERS_IN_API=true) ;
+- split  : API seule (RUN_CONSUMERS_IN_API=false) + `python -m app.consumers.rabbitmq_consumer`.
+
+Pendant la charge HTTP (GET /tp/get_trip_by_id/<trip>), `--messages` messages
+increase/decrease_available_seats (1 place, alternés) sont publiés sur la file
+du trip service. Le solde est nul, mais un trajet complet ou plein peut dériver
+d'une place : utiliser un trajet de test.
+
+    python test/bench_consumer_isolation.py --trip-id <uuid> --messages 5000 --requests 3000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import aio_pika
+import httpx
+from dotenv import dotenv_values
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_DIR = os.path.join(ROOT, "mova-trip")
+
+
+def _env(run_consumers_in_api: bool) -> dict:
+    env = {**os.environ, **{k: v for k, v in dotenv_values(os.path.join(SERVICE_DIR, ".env")).items() if v}}
+    env["RUN_CONSUMERS_IN_API"] = "true" if run_consumers_in_api else "false"
+    return env
+
+
+def start_processes(mode: str, port: int) -> list[subprocess.Popen]:
+    env = _env(run_consumers_in_api=(mode == "inline"))
+    procs = [subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVICE_DIR, env=env,
+    )]
+    if mode == "split":
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "app.consumers.rabbitmq_consumer"], cwd=SERVICE_DIR, env=env,
+        ))
+    return procs
+
+
+def stop_processes(procs: list[subprocess.Popen]) -> None:
+    for p in procs:
+        p.terminate()
+    for p in procs:
+        try:
+            p.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            p.kill()
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Le trip service n'est pas prêt")
+
+
+async def publish_burst(url: str, queue_name: str, trip_id: str, count: int) -> float:
+    """Publie la rafale puis attend que la file soit vide ; retourne la durée de drain (s)."""
+    connection = await aio_pika.connect_robust(url)
+    async with connection:
+        channel = await connection.channel()
+        queue = await channel.declare_queue(queue_name, durable=True)
+        start = time.perf_counter()
+        for i in range(count):
+            body = {
+                "action": "decrease_available_seats" if i % 2 else "increase_available_seats",
+                "trip_id": trip_id,
+                "booking_id": f"bench-{i}",
+                "number_of_seats": 1,
+            }
+            await channel.default_exchange.publish(
+                aio_pika.Message(body=json.dumps(body).encode(), content_type="application/json"),
+                routing_key=queue_name,
+            )
+        while True:
+            declared = await channel.declare_queue(queue_name, durable=True, passive=True)
+            if declared.declaration_result.message_count == 0:
+                return time.perf_counter() - start
+            await asyncio.sleep(0.1)
+
+
+async def http_load(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> list[float]:
+    latencies: list[float] = []
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            t0 = time.perf_counter()
+            resp = await client.get(path)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            resp.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_mode(mode: str, args) -> dict:
+    procs = start_processes(mode, args.port)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=30.0) as client:
+            await wait_ready(client)
+            path = f"/tp/get_trip_by_id/{args.trip_id}"
+            await http_load(client, path, 200, args.concurrency)  # échauffement
+
+            burst = asyncio.create_task(
+                publish_burst(args.rabbitmq_url, args.queue, args.trip_id, args.messages)
+            )
+            latencies = await http_load(client, path, args.requests, args.concurrency)
+            drain_s = await burst
+    finally:
+        stop_processes(procs)
+
+    return {
+        "mode": mode,
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "drain_s": drain_s,
+    }
+
+
+async def main(args) -> None:
+    results = [await run_mode(mode, args) for mode in args.mode]
+    print(f"{'mode':8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'drain file s':>13}")
+    for r in results:
+        print(f"{r['mode']:8} {r['p50']:8.1f} {r['p95']:8.1f} {r['p99']:8.1f} {r['drain_s']:13.1f}")
+
+
+if __name__ == "__main__":
+    env = dotenv_values(os.path.join(SERVICE_DIR, ".env"))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trip-id", required=True)
+    parser.add_argument("--mode", action="append", choices=["inline", "split"], help="répétable (défaut : les deux)")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--port", type=int, default=7102)
+    parser.add_argument("--queue", default=env.get("TRIP_QUEUE_NAME") or "trip_update_queue")
+    parser.add_argument("--rabbitmq-url", default=os.getenv("RABBITMQ_URL") or env.get("RABBITMQ_URL"))
+    args = parser.parse_args()
+    args.mode = args.mode or ["inline", "split"]
+    asyncio.run(main(args))
@@ -0,0 +1,118 @@
+"""
+Benchmark : latence des requêtes HTTP selon la configuration des logs.
+
+Chaque mode démarre le service dans un processus uvicorn neuf (cwd = dossier du
+service, .env du service), puis envoie `--requests` requêtes GET sur `--path` :
+- off     : LOG_LEVEL=CRITICAL (aucun log émis) ;
+- sampled : LOG_SAMPLE_RATE=0.1 (loggers bavards échantillonnés) ;
+- full    : configuration par défaut (tous les logs INFO) ;
+- file    : comme full, avec LOG_FILE (écriture disque dans le thread d'écriture).
+
+Pour comparer avec l'ancienne configuration (basicConfig + FileHandler synchrone),
+relancer le script sur le commit précédent.
+
+    python test/bench_logging.py --service mova-trip --path "/tp/search_trips?departure_city=montreal&destination_city=mirabel"
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from dotenv import dotenv_values
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    "off": {"LOG_LEVEL": "CRITICAL"},
+    "sampled": {"LOG_SAMPLE_RATE": "0.1"},
+    "full": {},
+    "file": {"LOG_SAMPLE_RATE": "1", "LOG_FILE": os.path.join(tempfile.gettempdir(), "bench_logging.log")},
+}
+
+
+def start_service(service: str, mode: str, port: int) -> subprocess.Popen:
+    service_dir = os.path.join(ROOT, service)
+    env = {**os.environ, **{k: v for k, v in dotenv_values(os.path.join(service_dir, ".env")).items() if v}}
+    env.update(MODES[mode])
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=service_dir, env=env, stdout=subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Le service n'est pas prêt")
+
+
+async def http_load(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> list[float]:
+    latencies: list[float] = []
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            t0 = time.perf_counter()
+            resp = await client.get(path)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            resp.raise_for_status()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_mode(mode: str, args) -> dict:
+    proc = start_service(args.service, mode, args.port)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=30.0) as client:
+            await wait_ready(client)
+            await http_load(client, args.path, 200, args.concurrency)  # échauffement
+            start = time.perf_counter()
+            latencies = await http_load(client, args.path, args.requests, args.concurrency)
+            elapsed = time.perf_counter() - start
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    return {
+        "mode": mode,
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 99),
+        "rps": len(latencies) / elapsed,
+    }
+
+
+async def main(args) -> None:
+    results = [await run_mode(mode, args) for mode in args.mode]
+    print(f"{'mode':8} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for r in results:
+        print(f"{r['mode']:8} {r['p50']:8.1f} {r['p99']:8.1f} {r['rps']:8.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--service", default="mova-trip")
+    parser.add_argument("--path", required=True, help="ex: /tp/get_trip_by_id/<uuid>")
+    parser.add_argument("--mode", action="append", choices=list(MODES), help="répétable (défaut : tous)")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--port", type=int, default=7103)
+    args = parser.parse_args()
+    args.mode = args.mode or list(MODES)
+    asyncio.run(main(args))
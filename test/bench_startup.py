@@ -0,0 +1,95 @@
+"""
+Benchmark de démarrage des microservices : temps d'import de app.main,
+nombre de moteurs SQLAlchemy (pools) créés et connexions ouvertes après
+une première requête SQL.
+
+Chaque mesure tourne dans un processus neuf (cwd = dossier du service,
+DATABASE_URL lu depuis son .env). Comparer deux commits en relançant le script.
+
+    python test/bench_startup.py --service mova-trip --service mova-user --repeat 5 --warm
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import asyncio, gc, json, time
+
+t0 = time.perf_counter()
+import app.main  # noqa: F401
+import_ms = (time.perf_counter() - t0) * 1000
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+
+def engines():
+    # Un AsyncEngine enveloppe un Engine synchrone : on compte les Engine.
+    return [o for o in gc.get_objects() if isinstance(o, Engine)]
+
+
+def held_connections():
+    total = 0
+    for e in engines():
+        pool = e.pool
+        total += pool.checkedin() + pool.checkedout() if hasattr(pool, "checkedin") else 0
+    return total
+
+
+result = {"import_ms": import_ms, "engines_after_import": len(engines())}
+
+if WARM:
+    from app.db import database
+
+    async def warm():
+        async with database.async_session() as db:
+            await db.execute(text("SELECT 1"))
+
+    t0 = time.perf_counter()
+    asyncio.run(warm())
+    result["first_query_ms"] = (time.perf_counter() - t0) * 1000
+    result["engines_after_query"] = len(engines())
+    result["connections_held"] = held_connections()
+
+print(json.dumps(result))
+"""
+
+
+def probe(service: str, warm: bool) -> dict:
+    code = PROBE.replace("WARM", "True" if warm else "False")
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.join(ROOT, service),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--service", action="append", required=True, help="ex: mova-trip (répétable)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warm", action="store_true", help="exécuter SELECT 1 après l'import")
+    args = parser.parse_args()
+
+    print(f"{'service':14} {'import ms (médiane)':>20} {'moteurs':>8} {'1re requête ms':>15} {'connexions':>11}")
+    for service in args.service:
+        runs = [probe(service, args.warm) for _ in range(args.repeat)]
+        import_ms = statistics.median(r["import_ms"] for r in runs)
+        first_query = statistics.median(r.get("first_query_ms", 0.0) for r in runs)
+        last = runs[-1]
+        print(
+            f"{service:14} {import_ms:20.1f} {last['engines_after_import']:8d} "
+            f"{first_query:15.1f} {last.get('connections_held', 0):11d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare deux rapports Locust (test/load/results/*.json) : débit et latences p95/p99.
+
+    python test/load/compare_results.py results/base.json results/candidate.json --threshold 10
+
+Code de sortie 1 si une régression dépasse le seuil (en %), pour la CI de release.
+"""
+import argparse
+import json
+import sys
+
+# (métrique, sens : +1 = plus grand est mieux, -1 = plus petit est mieux)
+METRICS = [("rps", 1), ("p95_ms", -1), ("p99_ms", -1)]
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def delta_pct(base: float, candidate: float) -> float:
+    if not base:
+        return 0.0
+    return (candidate - base) / base * 100
+
+
+def compare(base: dict, candidate: dict, threshold: float) -> list:
+    """Liste des régressions (endpoint, métrique, base, candidat, écart %)."""
+    regressions = []
+    rows = [("TOTAL", base["total"], candidate["total"])]
+    rows += [
+        (name, base["endpoints"][name], candidate["endpoints"][name])
+        for name in sorted(base["endpoints"].keys() & candidate["endpoints"].keys())
+    ]
+
+    print(f"{'endpoint':<32}" + "".join(f"{m:>24}" for m, _ in METRICS))
+    for name, b, c in rows:
+        cells = []
+        for metric, direction in METRICS:
+            delta = delta_pct(b[metric], c[metric])
+            regressed = -direction * delta > threshold
+            if regressed:
+                regressions.append((name, metric, b[metric], c[metric], delta))
+            cells.append(f"{b[metric]:>8} → {c[metric]:<8}{delta:+6.1f}%{'❌' if regressed else '  '}")
+        print(f"{name:<32}" + "".join(f"{cell:>24}" for cell in cells))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="écart toléré en %% (défaut 10)")
+    args = parser.parse_args()
+
+    base, candidate = load(args.base), load(args.candidate)
+    print(f"📊 {base['label']} → {candidate['label']} (seuil {args.threshold:.0f} %)\n")
+    regressions = compare(base, candidate, args.threshold)
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} régression(s) au-delà de {args.threshold:.0f} %")
+        sys.exit(1)
+    print("\n✅ Aucune régression")
+
+
+if __name__ == "__main__":
+    main()
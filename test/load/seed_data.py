@@ -0,0 +1,328 @@
+"""
+Jeu de données pour les tests de charge (Locust).
+
+1. `plan` génère un plan déterministe (--seed) dans test/load/dataset.json :
+   utilisateurs (passagers/chauffeurs), trajets avec arrêts et préférences,
+   réservations confirmées, paiements Stripe et gains chauffeur.
+2. `seed` insère chaque partie dans la base de son service : le script se relance
+   dans le dossier de chaque microservice (son .env, ses modèles `app.db.models`).
+3. `cleanup` supprime exactement les lignes du plan.
+
+    python test/load/seed_data.py all --users 500 --trips 2000 --bookings 3000
+    python test/load/seed_data.py cleanup
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+DATASET = os.path.join(HERE, "dataset.json")
+
+SERVICES = ["mova-user", "mova-trip", "mova-booking", "mova-payment"]
+PASSWORD = "LoadTest!2025"
+EMAIL_DOMAIN = "loadtest.mova"
+BATCH = 500
+
+CITIES = [
+    "montreal", "quebec", "ottawa", "sherbrooke", "gatineau", "laval",
+    "trois-rivieres", "mirabel", "moncton", "fredericton", "saint-john", "halifax",
+]
+
+
+# ------------------------------------------------------------
+# Plan (sans base de données)
+# ------------------------------------------------------------
+def build_plan(args) -> dict:
+    rng = random.Random(args.seed)
+    today = date.today()
+
+    users = []
+    for i in range(args.users):
+        users.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "email": f"loadtest-{i}@{EMAIL_DOMAIN}",
+            "first_name": f"Load{i}",
+            "last_name": "Test",
+            "role": "driver" if i < max(1, args.users * args.driver_ratio) else "passenger",
+        })
+    drivers = [u for u in users if u["role"] == "driver"]
+    passengers = [u for u in users if u["role"] == "passenger"] or users
+
+    trips = []
+    for _ in range(args.trips):
+        departure, destination = rng.sample(CITIES, 2)
+        driver = rng.choice(drivers)
+        trip_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        price = round(rng.uniform(15, 80), 2)
+        stops = [
+            {"id": str(uuid.UUID(int=rng.getrandbits(128))), "destination_city": city, "price": round(price * rng.uniform(0.3, 0.8), 2)}
+            for city in rng.sample([c for c in CITIES if c not in (departure, destination)], rng.randint(0, 2))
+        ]
+        trips.append({
+            "id": trip_id,
+            "driver_id": driver["id"],
+            "car_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "departure_city": departure,
+            "destination_city": destination,
+            "departure_date": (today + timedelta(days=rng.randint(1, args.days))).isoformat(),
+            "departure_time": time(rng.randint(6, 21), rng.choice([0, 15, 30, 45])).isoformat(),
+            "total_price": price,
+            "available_seats": args.seats,
+            "stops": stops,
+            "preference": {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "smoking_allowed": rng.random() < 0.1,
+                "pets_allowed": rng.random() < 0.3,
+                "air_conditioning": rng.random() < 0.7,
+                "bike_support": rng.random() < 0.2,
+                "ski_support": rng.random() < 0.2,
+                "mode_payment": rng.choice(["cash", "virement"]),
+            },
+        })
+
+    bookings, booked = [], set()
+    while len(bookings) < min(args.bookings, len(passengers) * len(trips)):
+        passenger, trip = rng.choice(passengers), rng.choice(trips)
+        if (passenger["id"], trip["id"]) in booked or passenger["id"] == trip["driver_id"]:
+            continue
+        booked.add((passenger["id"], trip["id"]))
+        n = len(bookings)
+        bookings.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "user_id": passenger["id"],
+            "trip_id": trip["id"],
+            "driver_id": trip["driver_id"],
+            "seats": 1,
+            "price_per_seat": trip["total_price"],
+            "method": rng.choice(["cash", "virement"]),
+            "payment_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "payment_intent": f"pi_loadtest_{args.seed}_{n}",
+            "earning_id": str(uuid.UUID(int=rng.getrandbits(128))),
+        })
+
+    return {
+        "seed": args.seed,
+        "password": PASSWORD,
+        "users": users,
+        "trips": trips,
+        "bookings": bookings,
+    }
+
+
+def amounts(price_per_seat: float, seats: int, method: str) -> dict:
+    """Même calcul que booking_service._compute_amounts (frais 2.50/place, taxe 15 %)."""
+    q = lambda v: v.quantize(Decimal("0.01"))
+    base = q(Decimal(str(price_per_seat)) * seats)
+    fee = q(Decimal("2.50") * seats)
+    charged = fee if method == "cash" else base + fee
+    tax = q(charged * Decimal("0.15"))
+    return {
+        "base": base, "fee": fee, "tax": tax, "total": q(charged + tax),
+        "driver_payable": Decimal("0.00") if method == "cash" else base,
+        "driver_cash": base if method == "cash" else Decimal("0.00"),
+    }
+
+
+# ------------------------------------------------------------
+# Insertion (exécuté dans le dossier du service)
+# ------------------------------------------------------------
+async def _insert(rows) -> None:
+    from app.db.database import async_session, dispose_engine
+
+    try:
+        for start in range(0, len(rows), BATCH):
+            async with async_session() as db:
+                db.add_all(rows[start:start + BATCH])
+                await db.commit()
+    finally:
+        await dispose_engine()
+
+
+def rows_for(service: str, plan: dict) -> list:
+    now = datetime.utcnow()
+    trips = {t["id"]: t for t in plan["trips"]}
+
+    if service == "mova-user":
+        from app.core.security import pwd_context
+        from app.db.models.user import User
+
+        password_hash = pwd_context.hash(plan["password"])
+        return [
+            User(
+                id=uuid.UUID(u["id"]), first_name=u["first_name"], last_name=u["last_name"],
+                email=u["email"], town="montreal", phone_number="5140000000",
+                password_hash=password_hash, user_role=u["role"], is_active="active",
+                date_of_birth="1990-01-01", created_at=now, updated_at=now,
+            )
+            for u in plan["users"]
+        ]
+
+    if service == "mova-trip":
+        from app.db.models.preference import Preference
+        from app.db.models.stop import Stop
+        from app.db.models.trip import Trip
+        from app.services.seat_inventory_service import build_segments
+        from app.services.trip_search_service import build_search_rows
+
+        rows = []
+        for t in plan["trips"]:
+            trip = Trip(
+                id=uuid.UUID(t["id"]), driver_id=t["driver_id"], car_id=t["car_id"],
+                departure_city=t["departure_city"], destination_city=t["destination_city"],
+                departure_place="centre-ville", destination_place="centre-ville",
+                departure_time=time.fromisoformat(t["departure_time"]),
+                departure_date=date.fromisoformat(t["departure_date"]),
+                total_price=t["total_price"], available_seats=t["available_seats"],
+                status="pending", created_at=now, updated_at=now,
+            )
+            preference = Preference(id=uuid.UUID(t["preference"]["id"]), trip_id=trip.id, baggage=True,
+                                    **{k: v for k, v in t["preference"].items() if k != "id"})
+            stops = [Stop(id=uuid.UUID(s["id"]), trip_id=trip.id, destination_city=s["destination_city"],
+                          price=s["price"], stop_order=position)
+                     for position, s in enumerate(t["stops"], start=1)]
+            # Lignes du modèle de lecture de la recherche (trip_search) et inventaire par tronçon
+            rows += [trip, preference, *stops, *build_search_rows(trip, preference, stops),
+                     *build_segments(trip, stops)]
+        return rows
+
+    if service == "mova-booking":
+        from app.db.models.booking import Booking, BookingStatus
+
+        rows = []
+        for b in plan["bookings"]:
+            a = amounts(b["price_per_seat"], b["seats"], b["method"])
+            rows.append(Booking(
+                id=uuid.UUID(b["id"]), id_user=uuid.UUID(b["user_id"]), id_trip=uuid.UUID(b["trip_id"]),
+                id_driver=uuid.UUID(b["driver_id"]), number_of_seats=b["seats"],
+                price_per_seat=Decimal(str(b["price_per_seat"])), reservation_fee_per_seat=Decimal("2.50"),
+                currency="CAD", tax_rate=Decimal("0.15"), tax_region="HST-NB",
+                base_total=a["base"], fee_total=a["fee"], tax_total=a["tax"], charged_now_total=a["total"],
+                driver_payable=a["driver_payable"], driver_collected_cash=a["driver_cash"],
+                free_cancellation_until=datetime.fromisoformat(trips[b["trip_id"]]["departure_date"]).replace(tzinfo=timezone.utc),
+                chauffeur_payment_method=b["method"], payment_method_used="card",
+                status=BookingStatus.confirmed,
+            ))
+        return rows
+
+    if service == "mova-payment":
+        from app.db.models.driver_earning import DriverEarning, EarningStatus
+        from app.db.models.payment import Payment, PaymentStatus
+
+        rows = []
+        for i, b in enumerate(plan["bookings"]):
+            trip = trips[b["trip_id"]]
+            a = amounts(b["price_per_seat"], b["seats"], b["method"])
+            trip_date = datetime.fromisoformat(trip["departure_date"])
+            rows.append(Payment(
+                id=uuid.UUID(b["payment_id"]), user_id=uuid.UUID(b["user_id"]), driver_id=uuid.UUID(b["driver_id"]),
+                trip_id=uuid.UUID(b["trip_id"]), booking_id=uuid.UUID(b["id"]),
+                amount=a["total"], currency="CAD", fee=a["fee"], tax_rate=Decimal("0.15"), tax_region="HST-NB",
+                stripe_payment_intent_id=b["payment_intent"], status=PaymentStatus.SUCCEEDED, payment_method="card",
+                chauffeur_payment_method=b["method"], driver_payable=a["driver_payable"],
+                trip_departure_city=trip["departure_city"], trip_destination_city=trip["destination_city"],
+                trip_departure_date=trip_date, passenger_name=f"Load Test {i}",
+                created_at=now, updated_at=now,
+            ))
+            if b["method"] == "virement":
+                rows.append(DriverEarning(
+                    id=uuid.UUID(b["earning_id"]), driver_id=uuid.UUID(b["driver_id"]), booking_id=uuid.UUID(b["id"]),
+                    trip_id=uuid.UUID(b["trip_id"]), amount=a["driver_payable"], currency="CAD",
+                    status=EarningStatus.PAYABLE if i % 2 else EarningStatus.PENDING_TRIP,
+                    trip_date=trip_date, created_at=now, passenger_name=f"Load Test {i}",
+                    route=f"{trip['departure_city']} → {trip['destination_city']}",
+                ))
+        return rows
+
+    raise ValueError(service)
+
+
+async def _cleanup(service: str, plan: dict) -> None:
+    from sqlalchemy import delete
+
+    from app.db.database import async_session, dispose_engine
+
+    ids = lambda key: [uuid.UUID(x["id"]) for x in plan[key]]
+    try:
+        async with async_session() as db:
+            if service == "mova-user":
+                from app.db.models.user import User
+                await db.execute(delete(User).where(User.id.in_(ids("users"))))
+            elif service == "mova-trip":
+                from app.db.models.trip import Trip
+                # stops et préférences suivent (ON DELETE CASCADE)
+                await db.execute(delete(Trip).where(Trip.id.in_(ids("trips"))))
+            elif service == "mova-booking":
+                from app.db.models.booking import Booking
+                # inclut les réservations créées pendant les tests (passagers du plan)
+                await db.execute(delete(Booking).where(Booking.id_user.in_(ids("users"))))
+            elif service == "mova-payment":
+                from app.db.models.driver_earning import DriverEarning
+                from app.db.models.payment import Payment
+                booking_ids = ids("bookings")
+                await db.execute(delete(DriverEarning).where(DriverEarning.booking_id.in_(booking_ids)))
+                await db.execute(delete(Payment).where(Payment.booking_id.in_(booking_ids)))
+            await db.commit()
+    finally:
+        await dispose_engine()
+
+
+def run_in_service(action: str, service: str) -> None:
+    """Relance ce script dans le dossier du service (son .env et son package `app`)."""
+    subprocess.run(
+        [sys.executable, os.path.abspath(__file__), action, "--service", service],
+        cwd=os.path.join(ROOT, service),
+        check=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("action", choices=["plan", "seed", "all", "cleanup", "seed-service", "cleanup-service"])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--driver-ratio", type=float, default=0.3)
+    parser.add_argument("--trips", type=int, default=2000)
+    parser.add_argument("--bookings", type=int, default=3000)
+    parser.add_argument("--seats", type=int, default=40, help="places par trajet (les scénarios en réservent)")
+    parser.add_argument("--days", type=int, default=14, help="trajets répartis sur les N prochains jours")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--service", choices=SERVICES, action="append")
+    args = parser.parse_args()
+
+    if args.action in ("seed-service", "cleanup-service"):
+        sys.path.insert(0, os.getcwd())
+        with open(DATASET) as f:
+            plan = json.load(f)
+        service = args.service[0]
+        if args.action == "seed-service":
+            rows = rows_for(service, plan)
+            asyncio.run(_insert(rows))
+            print(f"✅ {service} : {len(rows)} lignes")
+        else:
+            asyncio.run(_cleanup(service, plan))
+            print(f"🧹 {service} nettoyé")
+        return
+
+    if args.action in ("plan", "all"):
+        plan = build_plan(args)
+        with open(DATASET, "w") as f:
+            json.dump(plan, f)
+        print(f"📝 Plan : {len(plan['users'])} utilisateurs, {len(plan['trips'])} trajets, "
+              f"{len(plan['bookings'])} réservations → {DATASET}")
+
+    for service in args.service or SERVICES:
+        if args.action in ("seed", "all"):
+            run_in_service("seed-service", service)
+        elif args.action == "cleanup":
+            run_in_service("cleanup-service", service)
+
+
+if __name__ == "__main__":
+    main()
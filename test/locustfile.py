@@ -1,45 +1,189 @@
-from locust import HttpUser, task, between
+"""
+Tests de charge MOVA : scénarios mixtes pondérés sur les quatre services.
 
-# # 🔐 Test du login POST
-# class LoginUserTest(HttpUser):
-#     wait_time = between(1, 2)
+Prérequis : le jeu de données de test/load/seed_data.py (dataset.json).
 
-#     @task
-#     def login(self):        
-#         self.client.post("/identity/login", json={
-#             "email": "jean@gmail.com",
-#             "password": "1234"}
-#         )
+    python test/load/seed_data.py all
+    LOAD_LABEL=v1.4.0 locust -f test/locustfile.py --headless -u 200 -r 20 -t 5m
 
-# 🔓 Test GET d’un utilisateur par ID
-# class GetUserByIdTest(HttpUser):
-#     wait_time = between(1, 2)
+URLs des services : USER_URL, TRIP_URL, BOOKING_URL, PAYMENT_URL (défaut localhost:8000-8003).
+À la fin du run, un rapport JSON est écrit dans test/load/results/ ; comparer deux
+versions avec test/load/compare_results.py.
+"""
+import hashlib
+import hmac
+import json
+import os
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
 
-#     @task
-#     def get_user(self):        
-#         self.client.get("/identity/get_user_by_id/" + "5b9009cc-00c6-4b17-8e1f-3115dd63d765")
+from dotenv import dotenv_values
+from locust import HttpUser, between, events, task
 
-# class GetUserByEmailTest(HttpUser):
-#     wait_time = between(1, 2)
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+DATASET = os.path.join(HERE, "load", "dataset.json")
+RESULTS_DIR = os.path.join(HERE, "load", "results")
 
-#     @task
-#     def get_user(self):        
-#         self.client.get("/identity/get_user_by_email/" + "test@gmail.com")
+USER_URL = os.getenv("USER_URL", "http://localhost:8000")
+TRIP_URL = os.getenv("TRIP_URL", "http://localhost:8001")
+BOOKING_URL = os.getenv("BOOKING_URL", "http://localhost:8002")
+PAYMENT_URL = os.getenv("PAYMENT_URL", "http://localhost:8003")
 
+WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET") or dotenv_values(
+    os.path.join(ROOT, "mova-payment", ".env")
+).get("STRIPE_WEBHOOK_SECRET", "")
 
-# class GetTripByIdTest(HttpUser):
-#     wait_time = between(1, 2)
+with open(DATASET) as f:
+    DATA = json.load(f)
 
-#     @task
-#     def get_user(self):        
-#         self.client.get("/tp/get_trip_by_id/" + "01394624-e082-4db9-be15-ab111191ada3")
+PASSENGERS = [u for u in DATA["users"] if u["role"] == "passenger"]
+DRIVERS = [u for u in DATA["users"] if u["role"] == "driver"]
+TRIPS = DATA["trips"]
+# Rejeu idempotent : paiements cash (le webhook ne recrée pas de gain chauffeur)
+REPLAYABLE = [b for b in DATA["bookings"] if b["method"] == "cash"] or DATA["bookings"]
 
 
-class GetTRIP(HttpUser):
-    wait_time=between(1,2)
+def stripe_signature(payload: str) -> str:
+    """En-tête Stripe-Signature (schéma v1 : HMAC-SHA256 de '<timestamp>.<payload>')."""
+    timestamp = int(time.time())
+    digest = hmac.new(WEBHOOK_SECRET.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
 
-    @task
-    def get_user(self):
-        self.client.get("/tp/search_trips?departure_city=montreal&destination_city=mirabel&departure_date=2025-08-10&status=pending")
 
+class MovaUser(HttpUser):
+    """Un visiteur : surtout de la recherche, parfois une réservation complète."""
 
+    host = TRIP_URL
+    wait_time = between(1, 3)
+
+    # 🔎 Recherche de trajets
+    @task(40)
+    def search_trips(self):
+        trip = random.choice(TRIPS)
+        params = {"departure_date": trip["departure_date"], "status": "pending"}
+        if random.random() < 0.8:
+            params["departure_city"] = trip["departure_city"]
+            params["destination_city"] = trip["destination_city"]
+        self.client.get(f"{TRIP_URL}/tp/search_trips", params=params, name="trip: search_trips")
+
+    # 📄 Détail d'un trajet
+    @task(25)
+    def trip_detail(self):
+        trip = random.choice(TRIPS)
+        self.client.get(f"{TRIP_URL}/tp/get_trip_by_id/{trip['id']}", name="trip: get_trip_by_id")
+
+    # 🔐 Connexion
+    @task(10)
+    def login(self):
+        user = random.choice(DATA["users"])
+        self.client.post(
+            f"{USER_URL}/identity/login",
+            json={"email": user["email"], "password": DATA["password"]},
+            name="user: login",
+        )
+
+    # 🎫 Réservation : création (pending) → confirmation → annulation
+    @task(10)
+    def booking_flow(self):
+        passenger, trip = random.choice(PASSENGERS), random.choice(TRIPS)
+        body = {
+            "id_user": passenger["id"],
+            "id_trip": trip["id"],
+            "id_driver": trip["driver_id"],
+            "number_of_seats": 1,
+            "price_per_seat": str(trip["total_price"]),
+            "reservation_fee_per_seat": "2.50",
+            "chauffeur_payment_method": random.choice(["cash", "virement"]),
+            "free_cancellation_until": f"{trip['departure_date']}T00:00:00+00:00",
+        }
+        with self.client.post(
+            f"{BOOKING_URL}/bk/create-pending", json=body, name="booking: create-pending", catch_response=True
+        ) as response:
+            if response.status_code in (400, 409):
+                # doublon passager/trajet ou plus de places : réponse métier attendue
+                response.success()
+                return
+            if response.status_code != 200:
+                return
+            booking_id = response.json()["id"]
+
+        self.client.post(f"{BOOKING_URL}/bk/{booking_id}/confirm-after-payment", name="booking: confirm")
+        self.client.patch(
+            f"{BOOKING_URL}/bk/{booking_id}/cancel",
+            json={"cancelled_at": datetime.now(timezone.utc).isoformat(), "reason": "load test"},
+            name="booking: cancel",
+        )
+
+    # 💰 Résumé des gains chauffeur
+    @task(10)
+    def earnings_summary(self):
+        driver = random.choice(DRIVERS)
+        self.client.get(f"{PAYMENT_URL}/driver/{driver['id']}/summary", name="payment: earnings summary")
+
+    # 🔔 Rejeu d'un webhook Stripe signé
+    @task(5)
+    def webhook_replay(self):
+        booking = random.choice(REPLAYABLE)
+        payload = json.dumps({
+            "id": f"evt_loadtest_{booking['payment_intent']}",
+            "object": "event",
+            "type": "payment_intent.succeeded",
+            "data": {"object": {"id": booking["payment_intent"], "object": "payment_intent", "charges": {"data": []}}},
+        })
+        self.client.post(
+            f"{PAYMENT_URL}/payments/webhook",
+            data=payload,
+            headers={"Content-Type": "application/json", "Stripe-Signature": stripe_signature(payload)},
+            name="payment: webhook replay",
+        )
+
+
+# ------------------------------------------------------------
+# Rapport de fin de run
+# ------------------------------------------------------------
+def _run_label() -> str:
+    label = os.getenv("LOAD_LABEL")
+    if label:
+        return label
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unlabelled"
+
+
+def _entry_report(entry) -> dict:
+    return {
+        "requests": entry.num_requests,
+        "failures": entry.num_failures,
+        "rps": round(entry.total_rps, 2),
+        "avg_ms": round(entry.avg_response_time, 1),
+        "p50_ms": entry.get_response_time_percentile(0.50),
+        "p95_ms": entry.get_response_time_percentile(0.95),
+        "p99_ms": entry.get_response_time_percentile(0.99),
+    }
+
+
+@events.quitting.add_listener
+def save_report(environment, **kwargs):
+    stats = environment.stats
+    if not stats.total.num_requests:
+        return
+
+    label = _run_label()
+    report = {
+        "label": label,
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "users": environment.runner.user_count if environment.runner else None,
+        "dataset": {k: len(DATA[k]) for k in ("users", "trips", "bookings")},
+        "total": _entry_report(stats.total),
+        "endpoints": {name: _entry_report(entry) for (name, _method), entry in sorted(stats.entries.items())},
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}_{label}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Rapport écrit : {path}")